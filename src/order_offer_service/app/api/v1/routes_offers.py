@@ -1,9 +1,17 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from order_offer_service.app.core.db import get_db_session
 from order_offer_service.app.dependencies import get_offer_service
-from order_offer_service.app.schemas.offers import OfferCreateRequest, OfferCreateResponse
+from order_offer_service.app.schemas.offers import (
+    NearbyScooterQuote,
+    OfferCreateRequest,
+    OfferCreateResponse,
+    OfferNearbyResponse,
+    OfferQuoteRequest,
+    OfferQuoteResponse,
+    ScooterQuote,
+)
 
 router = APIRouter()
 
@@ -24,3 +32,45 @@ async def create_offer(
         deposit=offer.deposit,
     )
 
+
+@router.put("/quote", response_model=OfferQuoteResponse)
+async def quote_offers(payload: OfferQuoteRequest, service=Depends(get_offer_service)):
+    quotes, unavailable = await service.quote(payload)
+    return OfferQuoteResponse(
+        quotes=[
+            ScooterQuote(
+                scooter_id=quote.scooter_id,
+                zone_id=quote.zone_id,
+                price_per_minute=quote.price_per_minute,
+                price_unlock=quote.price_unlock,
+                deposit=quote.deposit,
+            )
+            for quote in quotes
+        ],
+        unavailable=unavailable,
+    )
+
+
+@router.get("/nearby", response_model=OfferNearbyResponse)
+async def nearby_offers(
+    user_id: int,
+    lat: float = Query(..., ge=-90, le=90),
+    lon: float = Query(..., ge=-180, le=180),
+    k: int = Query(10, ge=1, le=100),
+    service=Depends(get_offer_service),
+):
+    nearby = await service.nearby(user_id, lat, lon, k)
+    return OfferNearbyResponse(
+        quotes=[
+            NearbyScooterQuote(
+                scooter_id=quote.scooter_id,
+                zone_id=quote.zone_id,
+                price_per_minute=quote.price_per_minute,
+                price_unlock=quote.price_unlock,
+                deposit=quote.deposit,
+                distance_meters=round(distance, 1),
+            )
+            for quote, distance in nearby
+        ]
+    )
+
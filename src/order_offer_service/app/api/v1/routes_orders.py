@@ -1,7 +1,9 @@
 from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.background import BackgroundTask
 
-from order_offer_service.app.core.db import get_db_session
+from order_offer_service.app.core.db import get_db_session, get_read_session
 from order_offer_service.app.dependencies import get_order_service
 from order_offer_service.app.schemas.orders import (
     OrderInfoResponse,
@@ -28,7 +30,7 @@ async def start_order(
 async def get_order(
     user_id: int = Query(...),
     order_id: int = Query(...),
-    session: AsyncSession = Depends(get_db_session),
+    session: AsyncSession = Depends(get_read_session),
     service=Depends(get_order_service),
 ):
     order, total_price = await service.describe_order(session, order_id, user_id)
@@ -42,6 +44,26 @@ async def get_order(
     )
 
 
+@router.get("/stream")
+async def stream_order(
+    user_id: int = Query(...),
+    order_id: int = Query(...),
+    session: AsyncSession = Depends(get_read_session),
+    service=Depends(get_order_service),
+):
+    order, _ = await service.describe_order(session, order_id, user_id)
+    await session.close()
+    stream = service.open_stream(order)
+    # The generator's own cleanup never runs if the client leaves before the body starts;
+    # the background task runs after the response either way and closing twice is a no-op.
+    return StreamingResponse(
+        service.stream_prices(order, stream),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        background=BackgroundTask(service.close_stream, stream),
+    )
+
+
 @router.put("/stop", response_model=OrderStopResponse)
 async def stop_order(
     payload: OrderStopRequest,
@@ -1,25 +1,244 @@
+import asyncio
+import time
+
 from cachetools import TTLCache
-from typing import Any, Callable, Optional
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+from typing import Any, Awaitable, Callable, NamedTuple, Optional
+
+from order_offer_service.app.core.metrics import metrics
+from order_offer_service.app.core.redis import cached_get, cached_mget, cached_set
+from order_offer_service.app.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class CacheEntry(NamedTuple):
+    value: Any
+    fetched_at: float
 
 
 class ServiceCache():
-    def __init__(self, ttl: int, maxsize: int = 1000):
-        self.cache = TTLCache(maxsize=maxsize, ttl=ttl)
+    """Two-tier TTL cache with single-flight fetches and soft/hard expiry.
+
+    L1 is an in-process TTL/LRU cache; L2 is an optional Redis tier shared by
+    all workers. Up to ``ttl`` seconds an entry is fresh. For the next
+    ``stale_ttl`` seconds (the hard TTL) it is still served, while a background
+    task refreshes it. If a fetch fails, the last good value is served for a
+    further ``stale_if_error_ttl`` seconds before the error reaches the caller.
+
+    Listeners added with ``add_listener`` are called with ``(key, value)``
+    whenever a key gets a value different from the one cached; storing an
+    equal value keeps the cached object, so refreshes of unchanged data are
+    silent.
+    """
+
+    def __init__(
+        self,
+        ttl: int,
+        maxsize: int = 1000,
+        name: str = "default",
+        stale_ttl: int = 0,
+        stale_if_error_ttl: int = 0,
+        redis: Redis | None = None,
+        timer: Callable[[], float] = time.monotonic,
+    ):
+        self.ttl = ttl
+        self.hard_ttl = ttl + stale_ttl
+        self.max_age = self.hard_ttl + stale_if_error_ttl
+        self.cache = TTLCache(maxsize=maxsize, ttl=self.max_age, timer=timer)
+        self.name = name
+        self.redis = redis
+        self.timer = timer
+        self.coalesced_waiters = 0
+        self._inflight: dict[str, asyncio.Future] = {}
+        self._background: set[asyncio.Task] = set()
+        self._listeners: list[Callable[[str, Any], None]] = []
+
+    def _age(self, entry: CacheEntry) -> float:
+        return self.timer() - entry.fetched_at
+
+    def _count(self, event: str, value: int = 1) -> None:
+        metrics.inc(f"cache.{self.name}.{event}", value)
 
     def get(self, key: str) -> Optional[Any]:
-        return self.cache.get(key)
+        entry = self.cache.get(key)
+        if entry is None or self._age(entry) >= self.hard_ttl:
+            return None
+        return entry.value
 
-    def set(self, key: str, value: Any):
-        self.cache[key] = value
+    def add_listener(self, listener: Callable[[str, Any], None]) -> None:
+        self._listeners.append(listener)
+
+    def set(self, key: str, value: Any, age: float = 0.0):
+        previous = self.cache.get(key)
+        changed = previous is None or previous.value != value
+        if not changed:
+            value = previous.value
+        self.cache[key] = CacheEntry(value, self.timer() - age)
+        if changed:
+            for listener in self._listeners:
+                try:
+                    listener(key, value)
+                except Exception as error:
+                    logger.warning("cache.listener.failed", cache=self.name, key=key, error=str(error))
+
+    def keys(self) -> list[str]:
+        return list(self.cache.keys())
 
     async def get_or_set(self, key: str, fetcher: Callable, *args, **kvargs):
-        cached = self.get(key)
-        if cached is not None:
-            return cached
+        entry = self.cache.get(key)
+        if entry is not None:
+            age = self._age(entry)
+            if age < self.ttl:
+                self._count("l1_hits")
+                return entry.value
+            if age < self.hard_ttl:
+                self._count("l1_hits")
+                self._count("stale_served")
+                self._refresh_in_background(key, fetcher, *args, **kvargs)
+                return entry.value
+        self._count("l1_misses")
 
         try:
-            value = await fetcher(*args, **kvargs)
-            self.set(key, value)
-            return value
+            return await self._fetch(key, fetcher, *args, max_l2_age=self.hard_ttl, **kvargs)
         except Exception as error:
-            raise error
+            if entry is None or self._age(entry) >= self.max_age:
+                raise
+            self._count("stale_if_error")
+            logger.warning("cache.stale_if_error", cache=self.name, key=key, error=str(error))
+            return entry.value
+
+    async def get_many(self, keys: list[str], fetcher: Callable[[str], Awaitable[Any]]) -> dict[str, Any]:
+        """Resolve several keys: L1 first, then one Redis MGET, then ``fetcher(key)`` per remaining miss."""
+        result: dict[str, Any] = {}
+        missing = []
+        for key in keys:
+            value = self.get(key)
+            if value is None:
+                missing.append(key)
+            else:
+                self._count("l1_hits")
+                result[key] = value
+        if not missing:
+            return result
+        self._count("l1_misses", len(missing))
+
+        for key, entry in zip(missing, await self._l2_get_many(missing)):
+            if entry is not None and entry[1] < self.hard_ttl:
+                self.set(key, entry[0], age=entry[1])
+                result[key] = entry[0]
+        remaining = [key for key in missing if key not in result]
+        values = await asyncio.gather(*(self._fetch(key, fetcher, key, max_l2_age=None) for key in remaining))
+        result.update(zip(remaining, values))
+        return result
+
+    async def refresh(self, key: str, fetcher: Callable, *args, **kvargs):
+        """Fetch ``key`` now, accepting only an L2 copy another worker refreshed recently."""
+        return await self._fetch(key, fetcher, *args, max_l2_age=self.ttl / 2, **kvargs)
+
+    def _refresh_in_background(self, key: str, fetcher: Callable, *args, **kvargs) -> None:
+        if key in self._inflight:
+            return
+
+        async def _refresh() -> None:
+            try:
+                await self.refresh(key, fetcher, *args, **kvargs)
+            except Exception as error:
+                logger.warning("cache.refresh.failed", cache=self.name, key=key, error=str(error))
+
+        task = asyncio.create_task(_refresh())
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def _fetch(self, key: str, fetcher: Callable, *args, max_l2_age: float | None, **kvargs):
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            # Another caller is already fetching this key: share its outcome.
+            self.coalesced_waiters += 1
+            self._count("coalesced_waiters")
+            try:
+                return await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                if not inflight.cancelled():
+                    raise
+                # The fetching caller was cancelled, not us: take over the fetch.
+                return await self._fetch(key, fetcher, *args, max_l2_age=max_l2_age, **kvargs)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await self._load(key, fetcher, *args, max_l2_age=max_l2_age, **kvargs)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as error:
+            future.set_exception(error)
+            # Mark retrieved so an exception nobody waited for is not reported as lost.
+            future.exception()
+            raise
+        else:
+            future.set_result(value)
+            return value
+        finally:
+            self._inflight.pop(key, None)
+
+    async def _load(self, key: str, fetcher: Callable, *args, max_l2_age: float | None, **kvargs):
+        shared = None
+        if max_l2_age is not None:
+            shared = await self._l2_get(key)
+            if shared is not None and shared[1] < max_l2_age:
+                self.set(key, shared[0], age=shared[1])
+                return shared[0]
+
+        try:
+            value = await fetcher(*args, **kvargs)
+        except Exception:
+            if shared is None or shared[1] >= self.max_age:
+                raise
+            self._count("stale_if_error")
+            return shared[0]
+        self.set(key, value)
+        await self._l2_set(key, value)
+        return value
+
+    def _l2_key(self, key: str) -> str:
+        return f"cache:{key}"
+
+    def _l2_entry(self, payload: Any) -> tuple[Any, float] | None:
+        if not isinstance(payload, dict) or "v" not in payload:
+            self._count("l2_misses")
+            return None
+        self._count("l2_hits")
+        return payload["v"], max(time.time() - payload.get("t", 0), 0.0)
+
+    async def _l2_get(self, key: str) -> tuple[Any, float] | None:
+        if self.redis is None:
+            return None
+        try:
+            payload = await cached_get(self.redis, self._l2_key(key))
+        except (RedisError, OSError) as error:
+            self._count("l2_errors")
+            logger.warning("cache.l2.get_failed", cache=self.name, key=key, error=str(error))
+            return None
+        return self._l2_entry(payload)
+
+    async def _l2_get_many(self, keys: list[str]) -> list[tuple[Any, float] | None]:
+        if self.redis is None:
+            return [None] * len(keys)
+        try:
+            payloads = await cached_mget(self.redis, [self._l2_key(key) for key in keys])
+        except (RedisError, OSError) as error:
+            self._count("l2_errors")
+            logger.warning("cache.l2.mget_failed", cache=self.name, keys=keys, error=str(error))
+            return [None] * len(keys)
+        return [self._l2_entry(payload) for payload in payloads]
+
+    async def _l2_set(self, key: str, value: Any) -> None:
+        if self.redis is None:
+            return
+        try:
+            await cached_set(self.redis, self._l2_key(key), {"v": value, "t": time.time()}, int(self.max_age) or 1)
+        except (RedisError, OSError) as error:
+            self._count("l2_errors")
+            logger.warning("cache.l2.set_failed", cache=self.name, key=key, error=str(error))
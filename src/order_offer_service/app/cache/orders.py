@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import Any
+
+import orjson
+from cachetools import TTLCache
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from order_offer_service.app.core.events import OrderEventBus
+from order_offer_service.app.core.metrics import metrics
+from order_offer_service.app.logging_config import get_logger
+from order_offer_service.app.models.records import OrderRecord
+
+logger = get_logger(__name__)
+
+# Written in place of a stopped order so a lagging replica read cannot re-cache it as active.
+TOMBSTONE = "stopped"
+
+
+def _to_ms(value: datetime | None) -> int | None:
+    return None if value is None else int(value.timestamp() * 1000)
+
+
+def _from_ms(value: int | None) -> datetime | None:
+    return None if value is None else datetime.fromtimestamp(value / 1000, tz=timezone.utc)
+
+
+class ActiveOrderCache:
+    """Write-through cache of active orders: in-process LRU in front of Redis.
+
+    Entries are compact tuples of the fields ``describe_order`` needs. Every
+    invalidation is broadcast on the order event bus, so other workers drop
+    their L1 copy as well. Stopping an order leaves a short-lived tombstone,
+    and puts from the read path only fill an empty key, so a replica that
+    has not yet seen the stop cannot bring the order back.
+    """
+
+    def __init__(
+        self,
+        redis: Redis,
+        events: OrderEventBus,
+        maxsize: int = 100_000,
+        l1_ttl: int = 60,
+        redis_ttl: int = 600,
+        tombstone_ttl: int = 60,
+        prefix: str = "orders:active",
+    ) -> None:
+        self.redis = redis
+        self.events = events
+        self.local: TTLCache = TTLCache(maxsize=maxsize, ttl=l1_ttl)
+        self.redis_ttl = redis_ttl
+        self.tombstone_ttl = tombstone_ttl
+        self.prefix = prefix
+        events.add_listener(self._on_event)
+
+    def _key(self, order_id: int) -> str:
+        return f"{self.prefix}:{order_id}"
+
+    @staticmethod
+    def _pack(record: OrderRecord) -> tuple:
+        return (
+            record.order_id,
+            record.user_id,
+            record.scooter_id,
+            _to_ms(record.time_start),
+            _to_ms(record.time_finish),
+            record.price_per_minute,
+            record.price_unlock,
+            record.deposit,
+            record.ttl,
+        )
+
+    @staticmethod
+    def _unpack(packed: Any) -> OrderRecord:
+        order_id, user_id, scooter_id, start_ms, finish_ms, price_per_minute, price_unlock, deposit, ttl = packed
+        return OrderRecord(
+            order_id=order_id,
+            user_id=user_id,
+            scooter_id=scooter_id,
+            time_start=_from_ms(start_ms),
+            time_finish=_from_ms(finish_ms),
+            price_per_minute=price_per_minute,
+            price_unlock=price_unlock,
+            deposit=deposit,
+            ttl=ttl,
+        )
+
+    def _on_event(self, event: dict[str, Any]) -> None:
+        if event.get("event") in ("invalidated", "stopped"):
+            self.local.pop(event.get("order_id"), None)
+
+    async def get(self, order_id: int) -> OrderRecord | None:
+        packed = self.local.get(order_id)
+        if packed is not None:
+            metrics.inc("cache.orders.l1_hits")
+            return self._unpack(packed)
+        metrics.inc("cache.orders.l1_misses")
+
+        try:
+            raw = await self.redis.get(self._key(order_id))
+        except (RedisError, OSError) as error:
+            logger.warning("cache.orders.get_failed", order_id=order_id, error=str(error))
+            return None
+        if raw is None or raw == TOMBSTONE:
+            metrics.inc("cache.orders.l2_misses")
+            return None
+        metrics.inc("cache.orders.l2_hits")
+        packed = tuple(orjson.loads(raw))
+        self.local[order_id] = packed
+        return self._unpack(packed)
+
+    async def put(self, order: Any, *, if_absent: bool = False) -> None:
+        """Caches ``order``; with ``if_absent`` (reads that may come from a replica) only an empty key is filled."""
+        record = order if isinstance(order, OrderRecord) else OrderRecord.from_order(order)
+        packed = self._pack(record)
+        if not if_absent:
+            self.local[record.order_id] = packed
+        try:
+            stored = await self.redis.set(
+                self._key(record.order_id), orjson.dumps(packed), ex=self.redis_ttl, nx=if_absent
+            )
+        except (RedisError, OSError) as error:
+            logger.warning("cache.orders.put_failed", order_id=record.order_id, error=str(error))
+            return
+        if if_absent and stored:
+            self.local[record.order_id] = packed
+
+    async def retire(self, order_id: int) -> None:
+        """Replaces a stopped order with a tombstone on this worker and in Redis."""
+        self.local.pop(order_id, None)
+        try:
+            await self.redis.set(self._key(order_id), TOMBSTONE, ex=self.tombstone_ttl)
+        except (RedisError, OSError) as error:
+            logger.warning("cache.orders.retire_failed", order_id=order_id, error=str(error))
+
+    async def discard(self, order_id: int) -> None:
+        """Drops the entry from this worker and Redis; other workers follow on the next bus event."""
+        self.local.pop(order_id, None)
+        try:
+            await self.redis.delete(self._key(order_id))
+        except (RedisError, OSError) as error:
+            logger.warning("cache.orders.invalidate_failed", order_id=order_id, error=str(error))
+
+    async def invalidate(self, order_id: int) -> None:
+        await self.discard(order_id)
+        await self.events.publish("invalidated", order_id)
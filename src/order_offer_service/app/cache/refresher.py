@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any
+
+from order_offer_service.app.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class CacheRefresher:
+    """Periodically refreshes cached integration data so requests never see a miss."""
+
+    def __init__(self, clients: list[Any], interval_seconds: float) -> None:
+        self.clients = clients
+        self.interval_seconds = interval_seconds
+        self._task: asyncio.Task | None = None
+
+    async def refresh_once(self) -> None:
+        for client in self.clients:
+            try:
+                await client.refresh()
+            except Exception as error:
+                logger.warning("cache.refresher.failed", segment=client.segment, error=str(error))
+
+    async def _run(self) -> None:
+        while True:
+            await self.refresh_once()
+            await asyncio.sleep(self.interval_seconds)
+
+    def start(self) -> None:
+        if self._task is None:
+            logger.info("cache.refresher.start", interval=self.interval_seconds)
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
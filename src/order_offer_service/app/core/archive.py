@@ -0,0 +1,302 @@
+from __future__ import annotations
+
+import asyncio
+import fcntl
+import gzip
+import io
+import os
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, NamedTuple
+
+import orjson
+
+from order_offer_service.app.config import get_settings
+from order_offer_service.app.core.metrics import metrics
+from order_offer_service.app.core.s3 import S3Storage, finished_at, s3_storage
+from order_offer_service.app.logging_config import get_logger
+
+settings = get_settings()
+logger = get_logger(__name__)
+
+LOCK_NAME = ".lock"
+
+
+class SegmentKey(NamedTuple):
+    zone: str
+    ttl_days: int
+    hour: str  # YYYY-MM-DDTHH, UTC
+
+    @property
+    def prefix(self) -> str:
+        date, hour = self.hour.split("T")
+        return f"orders/zone={self.zone}/ttl={self.ttl_days}/date={date}/hour={hour}"
+
+
+@dataclass
+class Segment:
+    key: SegmentKey
+    segment_id: str
+    spill_path: Path
+    opened_at: float = field(default_factory=time.monotonic)
+    lines: list[bytes] = field(default_factory=list)
+    order_ids: list[Any] = field(default_factory=list)
+    size: int = 0
+
+
+class OrderArchiveWriter:
+    """Batches finished orders into compressed segments instead of one S3 object per order.
+
+    Every order is appended to a local spill file before ``store_order``
+    returns, so a crash loses nothing: spill files left behind are reloaded on
+    start. A segment per (zone, TTL bucket, hour) is sealed once it reaches
+    ``max_bytes`` or ``max_age_seconds`` and uploaded together with a manifest
+    listing its order ids.
+
+    Each worker process spills into its own ``worker-*`` subdirectory and
+    holds an exclusive ``flock`` on it while alive. On start a worker adopts
+    only the directories whose lock it can take, i.e. whose owner is gone,
+    so it never touches files a sibling on the same host is appending to.
+    """
+
+    def __init__(
+        self,
+        storage: S3Storage,
+        spill_dir: str | Path,
+        max_bytes: int,
+        max_age_seconds: float,
+        fmt: str = "ndjson",
+        fsync: bool = True,
+    ) -> None:
+        self.storage = storage
+        self.spill_dir = Path(spill_dir)
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.fmt = fmt
+        self.fsync = fsync
+        self._open: dict[SegmentKey, Segment] = {}
+        self._sealed: list[Segment] = []
+        self._lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+        self._flushing: asyncio.Task | None = None
+        self._own_dir: Path | None = None
+        self._lock_file = None
+
+    def _claim_dir(self) -> Path:
+        """This worker's spill directory, created and locked on first use."""
+        if self._own_dir is None:
+            self.spill_dir.mkdir(parents=True, exist_ok=True)
+            name = uuid.uuid4().hex
+            # Locked under a name recovery ignores, then renamed: no one sees it unlocked.
+            claiming = self.spill_dir / f".claiming-{name}"
+            claiming.mkdir()
+            lock_file = open(claiming / LOCK_NAME, "w")
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            own_dir = self.spill_dir / f"worker-{name}"
+            claiming.rename(own_dir)
+            self._own_dir, self._lock_file = own_dir, lock_file
+        return self._own_dir
+
+    def release(self) -> None:
+        """Gives up this worker's spill directory so another worker may adopt what is left in it."""
+        if self._lock_file is None:
+            return
+        own_dir = self._own_dir
+        if not any(own_dir.glob("*.ndjson")):
+            (own_dir / LOCK_NAME).unlink(missing_ok=True)
+            own_dir.rmdir()
+        self._lock_file.close()
+        self._own_dir = self._lock_file = None
+
+    def _adopt(self, directory: Path, own_dir: Path) -> int:
+        """Moves the spill files of a dead worker's directory into ours; 0 if its owner is alive."""
+        try:
+            lock_file = open(directory / LOCK_NAME, "a")
+        except FileNotFoundError:
+            return 0
+        with lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return 0
+            moved = 0
+            for path in directory.glob("*.ndjson"):
+                path.rename(own_dir / path.name)
+                moved += 1
+            (directory / LOCK_NAME).unlink(missing_ok=True)
+            directory.rmdir()
+        return moved
+
+    def segment_key(self, payload: dict[str, Any], ttl_days: int) -> SegmentKey:
+        return SegmentKey(
+            zone=str(payload.get("zone_id") or "all"),
+            ttl_days=self.storage._round_zone_ttl(ttl_days),
+            hour=finished_at(payload).strftime("%Y-%m-%dT%H"),
+        )
+
+    def archive_key(self, payload: dict[str, Any], ttl_days: int) -> str:
+        """Partition prefix the order lands under; the segment manifests there list it by id."""
+        return self.segment_key(payload, ttl_days).prefix
+
+    def _new_segment(self, key: SegmentKey) -> Segment:
+        segment_id = uuid.uuid4().hex
+        spill_name = f"{key.zone}__{key.ttl_days}__{key.hour}__{segment_id}.ndjson"
+        return Segment(key=key, segment_id=segment_id, spill_path=self._claim_dir() / spill_name)
+
+    def _spill(self, path: Path, line: bytes) -> None:
+        with open(path, "ab") as spill:
+            spill.write(line)
+            spill.flush()
+            if self.fsync:
+                os.fsync(spill.fileno())
+
+    async def store_order(self, payload: dict[str, Any], ttl_days: int) -> str:
+        key = self.segment_key(payload, ttl_days)
+        line = orjson.dumps(payload, option=orjson.OPT_APPEND_NEWLINE)
+        async with self._lock:
+            segment = self._open.get(key)
+            if segment is None:
+                segment = self._open[key] = self._new_segment(key)
+            await asyncio.to_thread(self._spill, segment.spill_path, line)
+            segment.lines.append(line)
+            segment.order_ids.append(payload.get("order_id"))
+            segment.size += len(line)
+            if segment.size >= self.max_bytes:
+                self._sealed.append(self._open.pop(key))
+        metrics.inc("archive.orders.buffered")
+        if self._sealed and (self._flushing is None or self._flushing.done()):
+            # Upload off the request path; the spill file already makes the order durable.
+            self._flushing = asyncio.create_task(self.flush_sealed())
+        return key.prefix
+
+    def _encode(self, segment: Segment) -> tuple[bytes, str, str]:
+        if self.fmt == "parquet":
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            rows = [orjson.loads(line) for line in segment.lines]
+            buffer = io.BytesIO()
+            pq.write_table(pa.Table.from_pylist(rows), buffer, compression="zstd")
+            return buffer.getvalue(), "parquet", "application/vnd.apache.parquet"
+        return gzip.compress(b"".join(segment.lines)), "ndjson.gz", "application/x-ndjson"
+
+    async def _upload(self, segment: Segment) -> None:
+        body, extension, content_type = await asyncio.to_thread(self._encode, segment)
+        object_key = f"{segment.key.prefix}/{segment.segment_id}.{extension}"
+        await self.storage.upload_segment(object_key, body, content_type, segment.key.ttl_days)
+        manifest = {
+            "segment": object_key,
+            "format": self.fmt,
+            "orders": len(segment.order_ids),
+            "order_ids": segment.order_ids,
+            "bytes": len(body),
+            "created_at": datetime.now(timezone.utc),
+        }
+        await self.storage.upload_segment(
+            f"{segment.key.prefix}/{segment.segment_id}.manifest.json",
+            orjson.dumps(manifest),
+            "application/json",
+            segment.key.ttl_days,
+        )
+        metrics.inc("archive.segments.uploaded")
+        metrics.inc("archive.orders.uploaded", len(segment.order_ids))
+        metrics.observe("archive.segment.bytes", len(body))
+        logger.info("archive.segment.uploaded", key=object_key, orders=len(segment.order_ids), bytes=len(body))
+
+    async def flush_sealed(self) -> None:
+        async with self._lock:
+            sealed, self._sealed = self._sealed, []
+        for index, segment in enumerate(sealed):
+            try:
+                await self._upload(segment)
+            except Exception as error:
+                metrics.inc("archive.segments.failed")
+                logger.warning("archive.segment.upload_failed", segment=segment.segment_id, error=str(error))
+                # Keep the spill files and retry on the next tick.
+                async with self._lock:
+                    self._sealed.extend(sealed[index:])
+                return
+            segment.spill_path.unlink(missing_ok=True)
+
+    async def seal_due(self, force: bool = False) -> None:
+        now = time.monotonic()
+        async with self._lock:
+            for key, segment in list(self._open.items()):
+                if force or now - segment.opened_at >= self.max_age_seconds:
+                    self._sealed.append(self._open.pop(key))
+        await self.flush_sealed()
+
+    def recover(self) -> None:
+        """Re-queues spill files left by dead worker processes as sealed segments."""
+        own_dir = self._claim_dir()
+        for directory in sorted(self.spill_dir.glob("worker-*")):
+            if directory != own_dir:
+                self._adopt(directory, own_dir)
+        in_use = {segment.spill_path for segment in [*self._open.values(), *self._sealed]}
+        # files directly in spill_dir predate per-worker directories
+        spilled = [*self.spill_dir.glob("*.ndjson"), *own_dir.glob("*.ndjson")]
+        for path in sorted(path for path in spilled if path not in in_use):
+            try:
+                zone, ttl_days, hour, segment_id = path.stem.split("__")
+            except ValueError:
+                logger.warning("archive.spill.unknown_file", path=str(path))
+                continue
+            segment = Segment(
+                key=SegmentKey(zone, int(ttl_days), hour), segment_id=segment_id, spill_path=path
+            )
+            for line in path.read_bytes().splitlines(keepends=True):
+                if not line.endswith(b"\n"):
+                    # torn write from the crash: the order was never acknowledged
+                    continue
+                segment.lines.append(line)
+                segment.order_ids.append(orjson.loads(line).get("order_id"))
+                segment.size += len(line)
+            if segment.lines:
+                self._sealed.append(segment)
+            else:
+                path.unlink(missing_ok=True)
+        if self._sealed:
+            logger.info("archive.spill.recovered", segments=len(self._sealed))
+
+    async def _run(self, interval_seconds: float) -> None:
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                await self.seal_due()
+            except Exception as error:
+                logger.warning("archive.flush.failed", error=str(error))
+
+    async def start(self, interval_seconds: float) -> None:
+        if self.fmt == "parquet":
+            import pyarrow  # noqa: F401  fail at startup rather than on the first flush
+        self.recover()
+        await self.flush_sealed()
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(interval_seconds))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._flushing is not None:
+            await self._flushing
+        await self.seal_due(force=True)
+        self.release()
+
+
+archive_writer = OrderArchiveWriter(
+    s3_storage,
+    settings.archive_spill_dir,
+    max_bytes=settings.archive_segment_max_bytes,
+    max_age_seconds=settings.archive_segment_max_age_seconds,
+    fmt=settings.archive_format,
+    fsync=settings.archive_spill_fsync,
+)
+order_archiver = archive_writer if settings.archive_mode == "segment" else s3_storage
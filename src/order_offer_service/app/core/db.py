@@ -1,10 +1,21 @@
 from __future__ import annotations
 
+import asyncio
+import itertools
+import time
 from collections.abc import AsyncGenerator
 
+from cachetools import TTLCache
+from fastapi import Request
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+from sqlalchemy import text
+from sqlalchemy.exc import InterfaceError, OperationalError
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 
 from order_offer_service.app.config import get_settings
+from order_offer_service.app.core.metrics import metrics
+from order_offer_service.app.core.redis import redis_client
 from order_offer_service.app.logging_config import get_logger
 from order_offer_service.app.models.base import Base
 
@@ -15,14 +26,163 @@ engine = create_async_engine(settings.postgres_dsn, pool_pre_ping=True, future=T
 async_session_factory = async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
 
 
+class Replica:
+    def __init__(self, index: int, dsn: str) -> None:
+        self.index = index
+        self.engine = create_async_engine(dsn, pool_pre_ping=True, future=True)
+        self.session_factory = async_sessionmaker(self.engine, expire_on_commit=False, class_=AsyncSession)
+        self.in_flight = 0
+        self.ejected_until = 0.0
+
+    @property
+    def healthy(self) -> bool:
+        return self.ejected_until <= time.monotonic()
+
+
+class ReadRouter:
+    """Routes read-only sessions to async replicas, falling back to the primary.
+
+    Replicas that fail a connection are ejected for ``ejection_seconds`` and
+    re-admitted by the health check. Users who have just written are pinned
+    to the primary for ``read_your_writes_seconds``: the pin is kept in
+    Redis so that the user's next request sees it on any worker or host,
+    with a local copy in front. If Redis cannot be read the user is treated
+    as pinned.
+    """
+
+    def __init__(
+        self,
+        dsns: list[str],
+        strategy: str = "round_robin",
+        ejection_seconds: float = 30,
+        read_your_writes_seconds: float = 0,
+        redis: Redis | None = None,
+        prefix: str = "db:rw",
+    ) -> None:
+        self.replicas = [Replica(index, dsn) for index, dsn in enumerate(dsns)]
+        self.strategy = strategy
+        self.ejection_seconds = ejection_seconds
+        self.read_your_writes_seconds = read_your_writes_seconds
+        self.redis = redis
+        self.prefix = prefix
+        self._round_robin = itertools.count()
+        self._recent_writers = (
+            TTLCache(maxsize=100_000, ttl=read_your_writes_seconds) if read_your_writes_seconds > 0 else None
+        )
+        self._health_task: asyncio.Task | None = None
+
+    def _pin_key(self, user_id: int) -> str:
+        return f"{self.prefix}:{user_id}"
+
+    async def note_write(self, user_id: int) -> None:
+        if self._recent_writers is None or not self.replicas:
+            return
+        self._recent_writers[user_id] = True
+        if self.redis is None:
+            return
+        try:
+            await self.redis.set(self._pin_key(user_id), 1, px=int(self.read_your_writes_seconds * 1000))
+        except (RedisError, OSError) as error:
+            metrics.inc("db.read.pin_failed")
+            logger.warning("db.read.pin_failed", user_id=user_id, error=str(error))
+
+    async def _pinned(self, user_id: int) -> bool:
+        if user_id in self._recent_writers:
+            return True
+        if self.redis is None:
+            return False
+        try:
+            return bool(await self.redis.exists(self._pin_key(user_id)))
+        except (RedisError, OSError) as error:
+            metrics.inc("db.read.pin_unknown")
+            logger.warning("db.read.pin_unknown", user_id=user_id, error=str(error))
+            return True
+
+    async def choose(self, user_id: int | None = None) -> Replica | None:
+        if not self.replicas:
+            return None
+        if user_id is not None and self._recent_writers is not None and await self._pinned(user_id):
+            metrics.inc("db.read.primary_read_your_writes")
+            return None
+        healthy = [replica for replica in self.replicas if replica.healthy]
+        if not healthy:
+            return None
+        if self.strategy == "least_connections":
+            return min(healthy, key=lambda replica: replica.in_flight)
+        return healthy[next(self._round_robin) % len(healthy)]
+
+    def eject(self, replica: Replica, error: Exception) -> None:
+        replica.ejected_until = time.monotonic() + self.ejection_seconds
+        metrics.inc("db.replica.ejections")
+        logger.warning("db.replica.ejected", replica=replica.index, error=str(error))
+
+    async def check_health(self) -> None:
+        for replica in self.replicas:
+            try:
+                async with replica.engine.connect() as conn:
+                    await conn.execute(text("SELECT 1"))
+            except (OperationalError, InterfaceError, OSError) as error:
+                self.eject(replica, error)
+            else:
+                if replica.ejected_until:
+                    logger.info("db.replica.readmitted", replica=replica.index)
+                replica.ejected_until = 0.0
+
+    async def _run_health_checks(self, interval_seconds: float) -> None:
+        while True:
+            await asyncio.sleep(interval_seconds)
+            await self.check_health()
+
+    def start(self, interval_seconds: float) -> None:
+        if self.replicas and self._health_task is None:
+            self._health_task = asyncio.create_task(self._run_health_checks(interval_seconds))
+
+    async def stop(self) -> None:
+        if self._health_task is not None:
+            self._health_task.cancel()
+            try:
+                await self._health_task
+            except asyncio.CancelledError:
+                pass
+            self._health_task = None
+        for replica in self.replicas:
+            await replica.engine.dispose()
+
+
+read_router = ReadRouter(
+    settings.postgres_replica_dsns,
+    strategy=settings.replica_strategy,
+    ejection_seconds=settings.replica_ejection_seconds,
+    read_your_writes_seconds=settings.read_your_writes_seconds,
+    redis=redis_client,
+)
+
+
 async def get_db_session() -> AsyncGenerator[AsyncSession, None]:
     async with async_session_factory() as session:
         yield session
 
 
+async def get_read_session(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    user_id = request.query_params.get("user_id")
+    replica = await read_router.choose(int(user_id) if user_id and user_id.isdigit() else None)
+    if replica is None:
+        async with async_session_factory() as session:
+            yield session
+        return
+
+    replica.in_flight += 1
+    try:
+        async with replica.session_factory() as session:
+            yield session
+    except (OperationalError, InterfaceError, OSError) as error:
+        read_router.eject(replica, error)
+        raise
+    finally:
+        replica.in_flight -= 1
+
+
 async def init_db_schema() -> None:
     logger.info("db.schema.init", dsn=settings.postgres_dsn)
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
-
-
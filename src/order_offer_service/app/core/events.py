@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Callable
+
+import orjson
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from order_offer_service.app.config import get_settings
+from order_offer_service.app.core.redis import pubsub_client, redis_client
+from order_offer_service.app.logging_config import get_logger
+
+settings = get_settings()
+logger = get_logger(__name__)
+
+OrderEventListener = Callable[[dict[str, Any]], None]
+
+
+class OrderEventBus:
+    """Cross-worker order events over a Redis pub/sub channel.
+
+    Every worker runs one subscriber task and fans messages out to local
+    listeners; publishing is fire-and-forget and never fails the caller.
+    The subscription uses its own ``subscriber`` client (see
+    ``make_pubsub_client``): with the request client's socket timeout an
+    idle subscription would keep dropping and miss events in between.
+    """
+
+    def __init__(self, redis: Redis, channel: str, subscriber: Redis | None = None) -> None:
+        self.redis = redis
+        self.subscriber = subscriber or redis
+        self.channel = channel
+        self._listeners: list[OrderEventListener] = []
+        self._task: asyncio.Task | None = None
+
+    def add_listener(self, listener: OrderEventListener) -> None:
+        self._listeners.append(listener)
+
+    def dispatch(self, event: dict[str, Any]) -> None:
+        for listener in self._listeners:
+            try:
+                listener(event)
+            except Exception as error:
+                logger.warning("order.events.listener_failed", order_event=event, error=str(error))
+
+    async def publish(self, event: str, order_id: int, **fields: Any) -> None:
+        message = {"event": event, "order_id": order_id, **fields}
+        # Local listeners must not depend on Redis being reachable.
+        self.dispatch(message)
+        try:
+            await self.redis.publish(self.channel, orjson.dumps(message))
+        except (RedisError, OSError) as error:
+            logger.warning("order.events.publish_failed", order_event=event, order_id=order_id, error=str(error))
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                async with self.subscriber.pubsub(ignore_subscribe_messages=True) as pubsub:
+                    await pubsub.subscribe(self.channel)
+                    async for message in pubsub.listen():
+                        if message.get("type") == "message":
+                            self.dispatch(orjson.loads(message["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception as error:
+                logger.warning("order.events.subscriber_failed", error=str(error))
+                await asyncio.sleep(1)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+
+order_events = OrderEventBus(redis_client, settings.order_events_channel, pubsub_client)
@@ -37,3 +37,22 @@ class ExternalServiceError(DomainError):
     message = "external_service_error"
     status_code = status.HTTP_502_BAD_GATEWAY
 
+
+class NearbySearchUnavailable(DomainError):
+    message = "nearby_search_unavailable"
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+
+
+class TooManyStreams(DomainError):
+    message = "too_many_streams"
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+
+
+class IdsUnavailable(DomainError):
+    message = "ids_unavailable"
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+
+
+class UpstreamTimeout(ExternalServiceError):
+    message = "upstream_timeout"
+    status_code = status.HTTP_504_GATEWAY_TIMEOUT
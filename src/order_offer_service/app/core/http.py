@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import httpx
+
+from order_offer_service.app.config import get_settings
+from order_offer_service.app.logging_config import get_logger
+
+settings = get_settings()
+logger = get_logger(__name__)
+
+
+class StubHttpClients:
+    """Long-lived pooled httpx clients, one connection pool per integration segment."""
+
+    def __init__(self) -> None:
+        self._clients: dict[str, httpx.AsyncClient] = {}
+
+    def _build(self, segment: str) -> httpx.AsyncClient:
+        timeout = settings.http_segment_timeouts.get(segment, settings.http_timeout_seconds)
+        max_connections = settings.http_segment_max_connections.get(segment, settings.http_max_connections)
+        limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=min(settings.http_max_keepalive_connections, max_connections),
+            keepalive_expiry=settings.http_keepalive_expiry_seconds,
+        )
+        logger.info(
+            "http.client.open",
+            segment=segment,
+            max_connections=max_connections,
+            timeout=timeout,
+            http2=settings.http2_enabled,
+        )
+        return httpx.AsyncClient(
+            base_url=str(settings.stub_service_base_url).rstrip("/"),
+            timeout=httpx.Timeout(timeout, connect=settings.http_connect_timeout_seconds),
+            limits=limits,
+            http2=settings.http2_enabled,
+        )
+
+    def get(self, segment: str) -> httpx.AsyncClient:
+        client = self._clients.get(segment)
+        if client is None or client.is_closed:
+            client = self._clients[segment] = self._build(segment)
+        return client
+
+    def open(self, segments: list[str]) -> None:
+        for segment in segments:
+            self.get(segment)
+
+    async def close(self) -> None:
+        clients, self._clients = self._clients, {}
+        for segment, client in clients.items():
+            await client.aclose()
+            logger.info("http.client.closed", segment=segment)
+
+
+stub_http_clients = StubHttpClients()
@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+import uuid
+from collections.abc import Callable
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from order_offer_service.app.config import get_settings
+from order_offer_service.app.core.exceptions import IdsUnavailable
+from order_offer_service.app.core.metrics import metrics
+from order_offer_service.app.core.redis import redis_client
+from order_offer_service.app.logging_config import get_logger
+
+settings = get_settings()
+logger = get_logger(__name__)
+
+EPOCH_MS = 1_704_067_200_000  # 2024-01-01T00:00:00Z
+WORKER_BITS = 10
+SEQUENCE_BITS = 12
+MAX_WORKER_ID = (1 << WORKER_BITS) - 1
+MAX_SEQUENCE = (1 << SEQUENCE_BITS) - 1
+MAX_LEAD_MS = 1000
+
+
+class SnowflakeGenerator:
+    """Time-ordered 63-bit ids: 41 bits of milliseconds since 2024, 10 bits of worker, 12 of sequence.
+
+    Ids from one worker are strictly increasing; if the clock steps back the
+    generator keeps issuing from the last timestamp it used. Once a
+    millisecond's 4096 sequence numbers are spent it borrows the next
+    millisecond instead of waiting for the clock, so ``next_id`` never
+    blocks; it raises ``IdsUnavailable`` rather than run more than
+    ``max_lead_ms`` ahead of the clock. Without a worker id, i.e. until a
+    lease is held, it issues nothing, nor once ``valid_until`` (monotonic
+    seconds, set by the lease) has passed.
+    """
+
+    def __init__(
+        self,
+        worker_id: int | None = None,
+        clock: Callable[[], float] = time.time,
+        max_lead_ms: int = MAX_LEAD_MS,
+        monotonic: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.worker_id = worker_id
+        self.max_lead_ms = max_lead_ms
+        self.valid_until: float | None = None
+        self._clock = clock
+        self._monotonic = monotonic
+        self._last_ms = -1
+        self._sequence = 0
+
+    @property
+    def worker_id(self) -> int | None:
+        return self._worker_id
+
+    @worker_id.setter
+    def worker_id(self, value: int | None) -> None:
+        if value is not None and not 0 <= value <= MAX_WORKER_ID:
+            raise ValueError(f"worker id must be within 0..{MAX_WORKER_ID}")
+        self._worker_id = value
+
+    def _now_ms(self) -> int:
+        return int(self._clock() * 1000) - EPOCH_MS
+
+    def next_id(self) -> int:
+        if self._worker_id is None or (self.valid_until is not None and self._monotonic() >= self.valid_until):
+            metrics.inc("ids.no_worker_id")
+            raise IdsUnavailable()
+        clock_ms = self._now_ms()
+        now = max(clock_ms, self._last_ms)
+        sequence = 0
+        if now == self._last_ms:
+            sequence = (self._sequence + 1) & MAX_SEQUENCE
+            if sequence == 0:
+                # 4096 ids in this millisecond already: borrow the next one
+                metrics.inc("ids.sequence_exhausted")
+                now = self._last_ms + 1
+                if now - clock_ms > self.max_lead_ms:
+                    raise IdsUnavailable()
+        self._sequence = sequence
+        self._last_ms = now
+        return (now << (WORKER_BITS + SEQUENCE_BITS)) | (self._worker_id << SEQUENCE_BITS) | self._sequence
+
+    @staticmethod
+    def timestamp_ms(snowflake: int) -> int:
+        return (snowflake >> (WORKER_BITS + SEQUENCE_BITS)) + EPOCH_MS
+
+
+class WorkerIdLease:
+    """Leases a unique worker id for a generator from Redis and keeps renewing it.
+
+    A lease is ``SET ids:worker:<n> <token> NX EX ttl``; renewal only extends
+    a key that still holds this process's token. The generator refuses to
+    issue ids whenever the lease is not known to be held: before the first
+    lease, after losing one, and from ``ttl - safety margin`` after the last
+    SET or EXPIRE that succeeded was *sent*, since the key may expire in
+    Redis from then on. The margin exceeds the renew interval, so a single
+    failed renewal does not interrupt ids. Until a lease is held it is
+    retried every second.
+    """
+
+    _RENEW = "if redis.call('GET', KEYS[1]) == ARGV[1] then return redis.call('EXPIRE', KEYS[1], ARGV[2]) end return 0"
+    _RELEASE = "if redis.call('GET', KEYS[1]) == ARGV[1] then return redis.call('DEL', KEYS[1]) end return 0"
+
+    def __init__(
+        self,
+        redis: Redis,
+        generator: SnowflakeGenerator,
+        ttl_seconds: int,
+        prefix: str = "ids:worker",
+        monotonic: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.redis = redis
+        self.generator = generator
+        self.ttl_seconds = ttl_seconds
+        self.renew_interval = ttl_seconds / 4
+        self.safety_margin = ttl_seconds / 3
+        self.prefix = prefix
+        self.token = uuid.uuid4().hex
+        self.leased: int | None = None
+        self._monotonic = monotonic
+        self._task: asyncio.Task | None = None
+
+    def _key(self, worker_id: int) -> str:
+        return f"{self.prefix}:{worker_id}"
+
+    async def acquire(self) -> int | None:
+        candidates = list(range(MAX_WORKER_ID + 1))
+        random.shuffle(candidates)
+        for worker_id in candidates:
+            sent_at = self._monotonic()
+            if await self.redis.set(self._key(worker_id), self.token, nx=True, ex=self.ttl_seconds):
+                self.leased = worker_id
+                self._extend(sent_at)
+                self.generator.worker_id = worker_id
+                metrics.set("ids.worker_id", worker_id)
+                logger.info("ids.worker.leased", worker_id=worker_id)
+                return worker_id
+        logger.error("ids.worker.exhausted")
+        return None
+
+    def _extend(self, sent_at: float) -> None:
+        # the ttl runs in Redis from when the command got there, which is after sent_at
+        self.generator.valid_until = sent_at + self.ttl_seconds - self.safety_margin
+
+    def _lose(self) -> None:
+        metrics.inc("ids.worker.lease_lost")
+        logger.warning("ids.worker.lease_lost", worker_id=self.leased)
+        self.leased = None
+        self.generator.worker_id = None
+        self.generator.valid_until = None
+
+    async def renew(self) -> None:
+        if self.leased is not None:
+            sent_at = self._monotonic()
+            if await self.redis.eval(self._RENEW, 1, self._key(self.leased), self.token, self.ttl_seconds):
+                self._extend(sent_at)
+                return
+            self._lose()
+        await self.acquire()
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.renew_interval if self.leased is not None else 1)
+            try:
+                await self.renew()
+            except (RedisError, OSError) as error:
+                logger.warning("ids.worker.renew_failed", error=str(error))
+                # the generator already stopped at valid_until; the key may be someone else's soon
+                if self.leased is not None and self._monotonic() >= self.generator.valid_until:
+                    self._lose()
+
+    async def start(self) -> None:
+        try:
+            await self.acquire()
+        except (RedisError, OSError) as error:
+            logger.error("ids.worker.lease_failed", error=str(error))
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self.leased is not None:
+            try:
+                await self.redis.eval(self._RELEASE, 1, self._key(self.leased), self.token)
+            except (RedisError, OSError):
+                pass
+            self.leased = None
+            self.generator.worker_id = None
+            self.generator.valid_until = None
+
+
+id_generator = SnowflakeGenerator()
+worker_lease = WorkerIdLease(redis_client, id_generator, settings.id_worker_lease_seconds)
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from typing import Any
+
+
+class Metrics:
+    """Minimal in-process metrics registry: counters, gauges and summaries."""
+
+    def __init__(self) -> None:
+        self._counters: dict[str, float] = defaultdict(float)
+        self._gauges: dict[str, float] = {}
+        self._summaries: dict[str, list[float]] = {}
+
+    def inc(self, name: str, value: float = 1) -> None:
+        self._counters[name] += value
+
+    def set(self, name: str, value: float) -> None:
+        self._gauges[name] = value
+
+    def observe(self, name: str, value: float) -> None:
+        summary = self._summaries.get(name)
+        if summary is None:
+            self._summaries[name] = [1, value, value]
+            return
+        summary[0] += 1
+        summary[1] += value
+        summary[2] = max(summary[2], value)
+
+    def counter(self, name: str) -> float:
+        return self._counters.get(name, 0)
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "counters": dict(self._counters),
+            "gauges": dict(self._gauges),
+            "summaries": {
+                name: {"count": count, "sum": total, "max": peak, "avg": total / count}
+                for name, (count, total, peak) in self._summaries.items()
+            },
+        }
+
+    def reset(self) -> None:
+        self._counters.clear()
+        self._gauges.clear()
+        self._summaries.clear()
+
+
+metrics = Metrics()
@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import asyncio
+import zlib
+from datetime import date, datetime, timedelta, timezone
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from order_offer_service.app.config import get_settings
+from order_offer_service.app.core import db
+from order_offer_service.app.core.metrics import metrics
+from order_offer_service.app.logging_config import get_logger
+
+settings = get_settings()
+logger = get_logger(__name__)
+
+
+class PartitionManager:
+    """Keeps daily range partitions of a table created ahead of time and drops expired ones.
+
+    Retention is a detach + drop of whole partitions instead of a row-level
+    DELETE, so it writes no WAL per row and leaves nothing for vacuum. Runs
+    are serialised across workers with a transaction-level advisory lock.
+
+    ``retention_days`` is only the floor. A partition past it is still kept
+    while any row is unfinished (``finish_column`` is NULL) or younger than
+    its own retention (``ttl_days_column``); row-level cleanup deals with
+    those rows and a later run drops the partition.
+
+    A table that is not partitioned, as in a database created before the
+    partitioned schema, is logged and left alone; row-level cleanup keeps
+    working on it.
+    """
+
+    def __init__(
+        self,
+        table: str,
+        premake_days: int,
+        retention_days: int,
+        finish_column: str | None = None,
+        ttl_days_column: str | None = None,
+    ) -> None:
+        self.table = table
+        self.premake_days = premake_days
+        self.retention_days = retention_days
+        self.finish_column = finish_column
+        self.ttl_days_column = ttl_days_column
+        self._lock_key = zlib.crc32(f"partitions:{table}".encode())
+        self._task: asyncio.Task | None = None
+
+    def partition_name(self, day: date) -> str:
+        return f"{self.table}_p{day:%Y%m%d}"
+
+    def partition_day(self, name: str) -> date | None:
+        prefix = f"{self.table}_p"
+        if not name.startswith(prefix):
+            return None
+        try:
+            return datetime.strptime(name[len(prefix):], "%Y%m%d").date()
+        except ValueError:
+            return None
+
+    def _create_sql(self, day: date) -> str:
+        start = datetime.combine(day, datetime.min.time(), tzinfo=timezone.utc)
+        end = start + timedelta(days=1)
+        return (
+            f"CREATE TABLE IF NOT EXISTS {self.partition_name(day)} PARTITION OF {self.table} "
+            f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+        )
+
+    async def _is_partitioned(self, conn: AsyncConnection) -> bool:
+        result = await conn.execute(
+            text("SELECT relkind FROM pg_class WHERE oid = to_regclass(:table)"), {"table": self.table}
+        )
+        return result.scalar() == "p"
+
+    async def _partitions(self, conn: AsyncConnection) -> list[str]:
+        result = await conn.execute(
+            text(
+                "SELECT child.relname FROM pg_inherits "
+                "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+                "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+                "WHERE parent.relname = :table"
+            ),
+            {"table": self.table},
+        )
+        return list(result.scalars())
+
+    async def _holds(self, conn: AsyncConnection, name: str, day: date, today: date) -> str | None:
+        """Why the expired partition ``name`` must stay, or None if it can be dropped."""
+        if self.finish_column is None and self.ttl_days_column is None:
+            return None
+        active = f"count(*) FILTER (WHERE {self.finish_column} IS NULL)" if self.finish_column else "0"
+        max_ttl = f"max({self.ttl_days_column})" if self.ttl_days_column else "NULL"
+        result = await conn.execute(text(f"SELECT {active}, {max_ttl} FROM {name}"))
+        active_rows, max_ttl_days = result.one()
+        if active_rows:
+            return "active"
+        if max_ttl_days is not None and day + timedelta(days=max_ttl_days + 1) > today:
+            return "retention"
+        return None
+
+    async def maintain(self, conn: AsyncConnection, today: date | None = None) -> tuple[list[str], list[str]]:
+        """Creates missing partitions through ``today + premake_days`` and drops expired ones."""
+        today = today or datetime.now(timezone.utc).date()
+        await conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": self._lock_key})
+        if not await self._is_partitioned(conn):
+            metrics.inc(f"partitions.{self.table}.not_partitioned")
+            logger.error(
+                "db.partitions.not_partitioned",
+                table=self.table,
+                hint=f"recreate {self.table} with PARTITION BY RANGE to enable partition retention",
+            )
+            return [], []
+
+        await conn.execute(text(f"CREATE TABLE IF NOT EXISTS {self.table}_default PARTITION OF {self.table} DEFAULT"))
+        existing = set(await self._partitions(conn))
+        created = []
+        for offset in range(self.premake_days + 1):
+            day = today + timedelta(days=offset)
+            if self.partition_name(day) not in existing:
+                await conn.execute(text(self._create_sql(day)))
+                created.append(self.partition_name(day))
+
+        # A partition covers [day, day + 1); it expires once that whole range is past retention.
+        cutoff = today - timedelta(days=self.retention_days)
+        dropped = []
+        for name in sorted(existing):
+            day = self.partition_day(name)
+            if day is None or day >= cutoff:
+                continue
+            reason = await self._holds(conn, name, day, today)
+            if reason is not None:
+                metrics.inc(f"partitions.{self.table}.held.{reason}")
+                logger.info("db.partitions.held", table=self.table, partition=name, reason=reason)
+                continue
+            await conn.execute(text(f"ALTER TABLE {self.table} DETACH PARTITION {name}"))
+            await conn.execute(text(f"DROP TABLE {name}"))
+            dropped.append(name)
+
+        metrics.set(f"partitions.{self.table}.count", len(existing) + len(created) - len(dropped))
+        metrics.inc(f"partitions.{self.table}.created", len(created))
+        metrics.inc(f"partitions.{self.table}.dropped", len(dropped))
+        if created or dropped:
+            logger.info("db.partitions.maintained", table=self.table, created=created, dropped=dropped)
+        return created, dropped
+
+    async def run_once(self) -> None:
+        async with db.engine.begin() as conn:
+            await self.maintain(conn)
+
+    async def _run(self, interval_seconds: float) -> None:
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                await self.run_once()
+            except Exception as error:
+                logger.warning("db.partitions.failed", table=self.table, error=str(error))
+
+    async def start(self, interval_seconds: float) -> None:
+        # Today's partition has to exist before the first insert, so the first run is inline.
+        await self.run_once()
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(interval_seconds))
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+
+order_partitions = PartitionManager(
+    "orders",
+    premake_days=settings.orders_partition_premake_days,
+    retention_days=settings.orders_partition_retention_days,
+    finish_column="time_finish",
+    ttl_days_column="ttl",
+)
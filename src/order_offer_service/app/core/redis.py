@@ -1,8 +1,8 @@
 from __future__ import annotations
 
-import json
 from typing import Any
 
+import orjson
 from redis.asyncio import Redis
 
 from order_offer_service.app.config import get_settings
@@ -11,26 +11,60 @@ from order_offer_service.app.logging_config import get_logger
 settings = get_settings()
 logger = get_logger(__name__)
 
-redis_client = Redis.from_url(settings.redis_dsn, decode_responses=True)
+redis_client = Redis.from_url(
+    settings.redis_dsn,
+    decode_responses=True,
+    socket_timeout=settings.redis_socket_timeout_seconds,
+    socket_connect_timeout=settings.redis_socket_timeout_seconds,
+)
+
+
+def make_pubsub_client(dsn: str, health_check_interval: float) -> Redis:
+    """Client for long-lived subscriptions.
+
+    An idle subscription must block on read, so there is no socket timeout;
+    dead connections are found by the periodic health-check PING instead.
+    """
+    return Redis.from_url(
+        dsn,
+        decode_responses=True,
+        socket_timeout=None,
+        socket_connect_timeout=settings.redis_socket_timeout_seconds,
+        socket_keepalive=True,
+        health_check_interval=health_check_interval,
+    )
+
+
+pubsub_client = make_pubsub_client(settings.redis_dsn, settings.redis_pubsub_health_check_seconds)
 
 
 async def get_redis() -> Redis:
     return redis_client
 
 
-async def cached_get(client: Redis, key: str) -> Any | None:
-    raw = await client.get(key)
+def _loads(key: str, raw: str | bytes | None) -> Any | None:
     if raw is None:
         return None
     try:
-        return json.loads(raw)
-    except json.JSONDecodeError:
+        return orjson.loads(raw)
+    except orjson.JSONDecodeError:
         logger.warning("redis.json.decode_failed", key=key)
         return None
 
 
+async def cached_get(client: Redis, key: str) -> Any | None:
+    return _loads(key, await client.get(key))
+
+
+async def cached_mget(client: Redis, keys: list[str]) -> list[Any | None]:
+    if not keys:
+        return []
+    raws = await client.mget(keys)
+    return [_loads(key, raw) for key, raw in zip(keys, raws)]
+
+
 async def cached_set(client: Redis, key: str, value: Any, ttl: int) -> None:
-    serialized = json.dumps(value)
+    serialized = orjson.dumps(value)
     await client.set(key, serialized, ex=ttl)
 
 
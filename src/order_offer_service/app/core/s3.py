@@ -1,36 +1,115 @@
 from __future__ import annotations
 
+import asyncio
 import json
+import time
 import urllib.parse
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import AsyncExitStack, asynccontextmanager
 from datetime import datetime, timezone
 from typing import Any
 
 import aioboto3
+from aiobotocore.config import AioConfig
+from botocore.exceptions import BotoCoreError, ClientError
+from tenacity import AsyncRetrying, retry_if_exception_type, stop_after_attempt, wait_random_exponential
 
 from order_offer_service.app.config import get_settings
+from order_offer_service.app.core.metrics import metrics
 from order_offer_service.app.logging_config import get_logger
 
 settings = get_settings()
 logger = get_logger(__name__)
 
 
+def finished_at(payload: dict[str, Any]) -> datetime:
+    finished = payload.get("time_finish")
+    if isinstance(finished, str):
+        finished = datetime.fromisoformat(finished)
+    if not isinstance(finished, datetime):
+        finished = datetime.now(timezone.utc)
+    return finished.astimezone(timezone.utc)
+
+
+class S3Uploader:
+    """Bounds concurrent S3 writes and retries them with jittered backoff."""
+
+    def __init__(self, concurrency: int, attempts: int) -> None:
+        self._slots = asyncio.Semaphore(concurrency)
+        self.attempts = attempts
+
+    async def run(self, operation: str, call: Callable[[], Awaitable[Any]], size: int = 0) -> Any:
+        retryer = AsyncRetrying(
+            reraise=True,
+            wait=wait_random_exponential(multiplier=0.1, max=2),
+            stop=stop_after_attempt(self.attempts),
+            retry=retry_if_exception_type((BotoCoreError, ClientError, OSError)),
+        )
+        async with self._slots:
+            started = time.perf_counter()
+            try:
+                async for attempt in retryer:
+                    with attempt:
+                        if attempt.retry_state.attempt_number > 1:
+                            metrics.inc("s3.upload.retries")
+                        result = await call()
+            except Exception:
+                metrics.inc("s3.upload.errors")
+                raise
+            metrics.observe(f"s3.{operation}.latency_seconds", time.perf_counter() - started)
+            metrics.inc("s3.upload.bytes", size)
+            return result
+
+
 class S3Storage:
     def __init__(self) -> None:
         self._session = aioboto3.Session()
+        self._shared_client = None
+        self._exit_stack: AsyncExitStack | None = None
+        self.uploader = S3Uploader(settings.s3_upload_concurrency, settings.s3_upload_attempts)
 
         self.ttl_grid = [1]
         while self.ttl_grid[-1] < settings.s3_max_ttl_days:
             self.ttl_grid.append(self.ttl_grid[-1] * 2)
 
-    def _client(self):
+    def _new_client(self):
         return self._session.client(
             "s3",
             endpoint_url=str(settings.s3_endpoint),
             aws_access_key_id=settings.s3_access_key,
             aws_secret_access_key=settings.s3_secret_key,
             region_name=settings.s3_region,
+            config=AioConfig(
+                max_pool_connections=settings.s3_max_pool_connections,
+                connect_timeout=settings.s3_connect_timeout_seconds,
+                read_timeout=settings.s3_read_timeout_seconds,
+                # retries are done by S3Uploader, with jitter and metrics
+                retries={"mode": "standard", "total_max_attempts": 1},
+            ),
         )
 
+    async def start(self) -> None:
+        if self._shared_client is not None:
+            return
+        self._exit_stack = AsyncExitStack()
+        self._shared_client = await self._exit_stack.enter_async_context(self._new_client())
+        logger.info("s3.client.open", max_pool_connections=settings.s3_max_pool_connections)
+
+    async def close(self) -> None:
+        if self._exit_stack is not None:
+            await self._exit_stack.aclose()
+        self._exit_stack = None
+        self._shared_client = None
+
+    @asynccontextmanager
+    async def _client(self) -> AsyncIterator[Any]:
+        if self._shared_client is not None:
+            yield self._shared_client
+            return
+        # not started (tests, scripts): fall back to a short-lived client
+        async with self._new_client() as client:
+            yield client
+
     def _round_zone_ttl(self, ttl_days: int) -> int:
         ttl_idx = max(ttl_days - 1, 0).bit_length()
         return self.ttl_grid[min(ttl_idx, len(self.ttl_grid) - 1)]
@@ -61,20 +140,67 @@ class S3Storage:
                 }
             )
 
+    def archive_key(self, payload: dict[str, Any], ttl_days: int) -> str:
+        """Derived from the finish time, so retrying an archive overwrites the same object."""
+        timestamp = finished_at(payload)
+        return f"orders/year={timestamp.year}/month={timestamp.month}/day={timestamp.day}/{payload['order_id']}.json"
+
     async def store_order(self, payload: dict[str, Any], ttl_days: int) -> str:
-        timestamp = datetime.now(timezone.utc)
-        key = f"orders/year={timestamp.year}/month={timestamp.month}/day={timestamp.day}/{payload['order_id']}.json"
+        key = self.archive_key(payload, ttl_days)
+        body = json.dumps(payload, default=self._datetime_converter).encode("utf-8")
         async with self._client() as client:
-            await client.put_object(
-                Bucket=settings.s3_bucket,
-                Key=key,
-                Body=json.dumps(payload, default=self._datetime_converter).encode("utf-8"),
-                ContentType="application/json",
-                Tagging=urllib.parse.urlencode({"TTL": str(self._round_zone_ttl(ttl_days))})
+            await self.uploader.run(
+                "put_object",
+                lambda: client.put_object(
+                    Bucket=settings.s3_bucket,
+                    Key=key,
+                    Body=body,
+                    ContentType="application/json",
+                    Tagging=urllib.parse.urlencode({"TTL": str(self._round_zone_ttl(ttl_days))})
+                ),
+                size=len(body),
             )
         logger.info("s3.order.archived", key=key)
         return key
 
+    async def upload_segment(self, key: str, body: bytes, content_type: str, ttl_days: int) -> None:
+        """Uploads an archive segment, switching to multipart once it exceeds one part."""
+        tagging = urllib.parse.urlencode({"TTL": str(self._round_zone_ttl(ttl_days))})
+        part_size = settings.archive_multipart_part_bytes
+        async with self._client() as client:
+            if len(body) <= part_size:
+                await self.uploader.run(
+                    "put_object",
+                    lambda: client.put_object(
+                        Bucket=settings.s3_bucket, Key=key, Body=body, ContentType=content_type, Tagging=tagging
+                    ),
+                    size=len(body),
+                )
+                return
+
+            upload = await client.create_multipart_upload(
+                Bucket=settings.s3_bucket, Key=key, ContentType=content_type, Tagging=tagging
+            )
+            upload_id = upload["UploadId"]
+            try:
+                parts = []
+                for number, offset in enumerate(range(0, len(body), part_size), start=1):
+                    chunk = body[offset:offset + part_size]
+                    part = await self.uploader.run(
+                        "upload_part",
+                        lambda: client.upload_part(
+                            Bucket=settings.s3_bucket, Key=key, UploadId=upload_id, PartNumber=number, Body=chunk
+                        ),
+                        size=len(chunk),
+                    )
+                    parts.append({"PartNumber": number, "ETag": part["ETag"]})
+                await client.complete_multipart_upload(
+                    Bucket=settings.s3_bucket, Key=key, UploadId=upload_id, MultipartUpload={"Parts": parts}
+                )
+            except Exception:
+                await client.abort_multipart_upload(Bucket=settings.s3_bucket, Key=key, UploadId=upload_id)
+                raise
+
 
 s3_storage = S3Storage()
 
@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import asyncio
+import time
+import zlib
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from order_offer_service.app.core import db
+from order_offer_service.app.core.metrics import metrics
+from order_offer_service.app.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+CleanupStep = Callable[[AsyncSession, int], Awaitable[int]]
+
+
+@dataclass
+class CleanupJob:
+    """A cleanup that deletes one batch per call of ``step`` and returns the rows removed."""
+
+    name: str
+    step: CleanupStep
+    interval_seconds: float
+
+    @property
+    def lock_key(self) -> int:
+        return zlib.crc32(f"cleanup:{self.name}".encode())
+
+
+class CleanupScheduler:
+    """Runs cleanup jobs in small committed batches on one host at a time.
+
+    Each run holds a session-level ``pg_try_advisory_lock`` on a dedicated
+    connection, so other hosts skip the job until it finishes. Batches are
+    separate transactions with a pause in between, keeping locks short and
+    letting autovacuum keep up.
+    """
+
+    def __init__(self, jobs: list[CleanupJob], batch_size: int, pause_seconds: float, max_batches: int) -> None:
+        self.jobs = jobs
+        self.batch_size = batch_size
+        self.pause_seconds = pause_seconds
+        self.max_batches = max_batches
+        self._drained_at: dict[str, float] = {}
+        self._tasks: list[asyncio.Task] = []
+
+    async def drain(self, job: CleanupJob, session: AsyncSession) -> tuple[int, bool]:
+        """Deletes batches until one comes back short or ``max_batches`` is hit; returns (rows, caught_up)."""
+        deleted = 0
+        for batch in range(self.max_batches):
+            if batch:
+                await asyncio.sleep(self.pause_seconds)
+            rows = await job.step(session, self.batch_size)
+            await session.commit()
+            deleted += rows
+            if rows < self.batch_size:
+                return deleted, True
+        return deleted, False
+
+    async def run_job(self, job: CleanupJob) -> int:
+        started = time.monotonic()
+        async with db.engine.connect() as conn:
+            locked = (await conn.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": job.lock_key})).scalar()
+            await conn.commit()
+            if not locked:
+                metrics.inc(f"cleanup.{job.name}.skipped")
+                return 0
+            try:
+                async with AsyncSession(bind=conn, expire_on_commit=False) as session:
+                    deleted, caught_up = await self.drain(job, session)
+            finally:
+                await conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": job.lock_key})
+                await conn.commit()
+
+        now = time.monotonic()
+        if caught_up:
+            self._drained_at[job.name] = now
+        metrics.inc(f"cleanup.{job.name}.deleted", deleted)
+        metrics.observe(f"cleanup.{job.name}.duration_seconds", now - started)
+        # how long the job has had a backlog; 0 right after a run that caught up
+        metrics.set(f"cleanup.{job.name}.lag_seconds", now - self._drained_at.get(job.name, started))
+        logger.info("cleanup.job.done", job=job.name, deleted=deleted, caught_up=caught_up)
+        return deleted
+
+    async def _run(self, job: CleanupJob) -> None:
+        while True:
+            try:
+                await self.run_job(job)
+            except Exception as error:
+                metrics.inc(f"cleanup.{job.name}.failed")
+                logger.warning("cleanup.job.failed", job=job.name, error=str(error))
+            await asyncio.sleep(job.interval_seconds)
+
+    def start(self) -> None:
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._run(job)) for job in self.jobs]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
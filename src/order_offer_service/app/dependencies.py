@@ -1,4 +1,19 @@
-from order_offer_service.app.repositories import OfferRepository, OrderRepository
+from order_offer_service.app.cache.orders import ActiveOrderCache
+from order_offer_service.app.cache.refresher import CacheRefresher
+from order_offer_service.app.config import get_settings
+from order_offer_service.app.core.events import order_events
+from order_offer_service.app.core.ids import id_generator
+from order_offer_service.app.core.scheduler import CleanupJob, CleanupScheduler
+from order_offer_service.app.core.redis import redis_client
+from order_offer_service.app.repositories import (
+    BatchingOfferRepository,
+    OfferRepository,
+    OfferTokenCodec,
+    OrderRepository,
+    OutboxRepository,
+    RedisOfferRepository,
+    SignedOfferRepository,
+)
 from order_offer_service.app.services import (
     OfferService,
     OrderService,
@@ -8,17 +23,137 @@ from order_offer_service.app.services import (
     ScooterClient,
     PaymentClient,
 )
+from order_offer_service.app.services.fleet import FleetSnapshot, FleetSync
+from order_offer_service.app.services.order_streams import OrderStreamHub
+from order_offer_service.app.services.outbox import OutboxDispatcher
+from order_offer_service.app.services.pricing import PriceTable, PricingEngine
+from order_offer_service.app.services.spatial import SpatialIndex
+
+settings = get_settings()
+ids = id_generator if settings.id_strategy == "snowflake" else None
 
-offer_repository = OfferRepository()
-order_repository = OrderRepository()
-config_client = ConfigClient()
-zone_client = ZoneClient()
-user_client = UserClient()
-scooter_client = ScooterClient()
+if settings.offer_storage == "signed":
+    offer_repository = SignedOfferRepository(OfferTokenCodec(settings.offer_signing_secret), redis_client)
+elif settings.offer_storage == "redis":
+    offer_repository = RedisOfferRepository(redis_client, ids=ids)
+elif settings.offer_batching_enabled and ids is not None:
+    # batching needs ids known before the insert, so it only applies with snowflake ids
+    offer_repository = BatchingOfferRepository(
+        OfferRepository(ids),
+        ids,
+        window_seconds=settings.offer_batch_window_ms / 1000,
+        max_rows=settings.offer_batch_max_rows,
+    )
+else:
+    offer_repository = OfferRepository(ids)
+order_repository = OrderRepository(ids)
+outbox_repository = OutboxRepository() if settings.order_outbox_enabled else None
+config_client = ConfigClient(
+    settings.config_cache_ttl_seconds,
+    stale_ttl=settings.cache_stale_while_revalidate_seconds,
+    stale_if_error_ttl=settings.cache_stale_if_error_seconds,
+    redis=redis_client if settings.cache_l2_enabled else None,
+)
+zone_client = ZoneClient(
+    settings.zone_cache_ttl_seconds,
+    stale_ttl=settings.cache_stale_while_revalidate_seconds,
+    stale_if_error_ttl=settings.cache_stale_if_error_seconds,
+    redis=redis_client if settings.cache_l2_enabled else None,
+)
+user_client = UserClient(batching=settings.stub_batching_enabled)
+scooter_client = ScooterClient(batching=settings.stub_batching_enabled)
 payment_client = PaymentClient()
+cache_refresher = CacheRefresher([config_client, zone_client], settings.cache_refresh_interval_seconds)
 
-offer_service = OfferService(offer_repository, config_client, zone_client, scooter_client, user_client)
-order_service = OrderService(order_repository, offer_service, payment_client, scooter_client)
+order_cache = (
+    ActiveOrderCache(
+        redis_client,
+        order_events,
+        maxsize=settings.order_cache_maxsize,
+        l1_ttl=settings.order_cache_l1_ttl_seconds,
+        redis_ttl=settings.order_cache_redis_ttl_seconds,
+        tombstone_ttl=settings.order_cache_tombstone_seconds,
+    )
+    if settings.order_cache_enabled
+    else None
+)
+
+order_stream_hub = OrderStreamHub(order_events, settings.order_stream_max_connections)
+
+fleet_snapshot = (
+    FleetSnapshot(settings.fleet_max_staleness_seconds, settings.fleet_max_scooter_id)
+    if settings.fleet_snapshot_enabled
+    else None
+)
+# The spatial index is fed by the fleet change feed, so it needs the snapshot enabled too.
+spatial_index = (
+    SpatialIndex(settings.spatial_cell_degrees, settings.spatial_max_radius_meters, settings.fleet_max_scooter_id)
+    if settings.spatial_index_enabled and fleet_snapshot is not None
+    else None
+)
+fleet_sync = (
+    FleetSync(
+        fleet_snapshot,
+        scooter_client,
+        settings.fleet_sync_interval_seconds,
+        settings.fleet_sync_page_size,
+        spatial_index,
+    )
+    if fleet_snapshot is not None
+    else None
+)
+
+pricing_engine = PricingEngine(settings.low_charge_threshold)
+price_table = PriceTable(pricing_engine) if settings.price_table_enabled else None
+if price_table is not None:
+    config_client.cache.add_listener(price_table.on_config_update)
+    zone_client.cache.add_listener(price_table.on_zone_update)
+
+offer_service = OfferService(
+    offer_repository,
+    config_client,
+    zone_client,
+    scooter_client,
+    user_client,
+    fleet_snapshot,
+    pricing_engine,
+    price_table,
+    spatial_index,
+)
+order_service = OrderService(
+    order_repository,
+    offer_service,
+    payment_client,
+    scooter_client,
+    order_cache,
+    order_stream_hub,
+    outbox_repository,
+    single_statement_start=settings.order_single_statement_start and settings.offer_storage == "postgres",
+)
+outbox_dispatcher = OutboxDispatcher(
+    OutboxRepository(),
+    order_service.outbox_handlers(),
+    workers=settings.outbox_workers,
+    batch_size=settings.outbox_batch_size,
+    poll_interval=settings.outbox_poll_interval_seconds,
+    max_backoff=settings.outbox_max_backoff_seconds,
+    lease_seconds=settings.outbox_lease_seconds,
+)
+
+cleanup_jobs = [
+    CleanupJob("orders_expired", order_repository.delete_expired, settings.cleanup_orders_interval_seconds)
+]
+if settings.offer_storage == "postgres":
+    # Redis and signed offers expire on their own.
+    cleanup_jobs.append(
+        CleanupJob("offers_expired", offer_repository.delete_expired, settings.cleanup_offers_interval_seconds)
+    )
+cleanup_scheduler = CleanupScheduler(
+    cleanup_jobs,
+    batch_size=settings.cleanup_batch_size,
+    pause_seconds=settings.cleanup_batch_pause_seconds,
+    max_batches=settings.cleanup_max_batches_per_run,
+)
 
 
 def get_offer_service() -> OfferService:
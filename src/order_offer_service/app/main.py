@@ -1,34 +1,90 @@
 from __future__ import annotations
 
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Request
 from fastapi.responses import JSONResponse
 
 from order_offer_service.app.api.v1 import api_router
 from order_offer_service.app.config import get_settings
-from order_offer_service.app.core.db import init_db_schema
+from order_offer_service.app.core.archive import archive_writer
+from order_offer_service.app.core.db import init_db_schema, read_router
+from order_offer_service.app.core.events import order_events
 from order_offer_service.app.core.exceptions import DomainError
+from order_offer_service.app.core.http import stub_http_clients
+from order_offer_service.app.core.ids import worker_lease
+from order_offer_service.app.core.metrics import metrics
+from order_offer_service.app.core.partitions import order_partitions
 from order_offer_service.app.core.s3 import s3_storage
+from order_offer_service.app.dependencies import (
+    cache_refresher,
+    cleanup_scheduler,
+    fleet_sync,
+    offer_repository,
+    outbox_dispatcher,
+)
+from order_offer_service.app.repositories import BatchingOfferRepository
 from order_offer_service.app.logging_config import configure_logging, get_logger
 
 settings = get_settings()
 configure_logging(settings.log_level)
 logger = get_logger(__name__)
 
+STUB_SEGMENTS = ["configs", "zones", "users", "scooters", "payments"]
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    logger.info("app.startup", environment=settings.environment)
+    if settings.id_strategy == "snowflake":
+        await worker_lease.start()
+    await init_db_schema()
+    await order_partitions.start(settings.partition_maintenance_interval_seconds)
+    await s3_storage.start()
+    await s3_storage.ensure_bucket()
+    stub_http_clients.open(STUB_SEGMENTS)
+    read_router.start(settings.replica_health_check_interval_seconds)
+    order_events.start()
+    if settings.archive_mode == "segment":
+        await archive_writer.start(settings.archive_flush_interval_seconds)
+    if settings.cache_refresh_enabled:
+        cache_refresher.start()
+    if settings.order_outbox_enabled:
+        outbox_dispatcher.start()
+    if settings.cleanup_enabled:
+        cleanup_scheduler.start()
+    if fleet_sync is not None:
+        fleet_sync.start()
+    try:
+        yield
+    finally:
+        logger.info("app.shutdown")
+        if fleet_sync is not None:
+            await fleet_sync.stop()
+        await cleanup_scheduler.stop()
+        if isinstance(offer_repository, BatchingOfferRepository):
+            await offer_repository.close()
+        await outbox_dispatcher.stop()
+        await cache_refresher.stop()
+        await order_partitions.stop()
+        await read_router.stop()
+        await order_events.stop()
+        if settings.archive_mode == "segment":
+            await archive_writer.stop()
+        await s3_storage.close()
+        await stub_http_clients.close()
+        await worker_lease.stop()
+
+
 app = FastAPI(
     title=settings.app_name,
     version="1.0.0",
     default_response_class=JSONResponse,
+    lifespan=lifespan,
 )
 app.include_router(api_router)
 
 
-@app.on_event("startup")
-async def startup_event() -> None:
-    logger.info("app.startup", environment=settings.environment)
-    await init_db_schema()
-    await s3_storage.ensure_bucket()
-
-
 @app.exception_handler(DomainError)
 async def domain_exception_handler(_: Request, exc: DomainError) -> JSONResponse:
     return JSONResponse(status_code=exc.status_code, content={"detail": exc.message})
@@ -38,3 +94,7 @@ async def domain_exception_handler(_: Request, exc: DomainError) -> JSONResponse
 async def health() -> dict[str, str]:
     return {"status": "ok"}
 
+
+@app.get("/metrics", tags=["service"])
+async def get_metrics() -> dict:
+    return metrics.snapshot()
@@ -1,5 +1,7 @@
 from order_offer_service.app.models.offer import Offer
 from order_offer_service.app.models.order import Order
+from order_offer_service.app.models.outbox import OutboxEntry
+from order_offer_service.app.models.records import OfferRecord, OrderRecord
 
-__all__ = ["Offer", "Order"]
+__all__ = ["Offer", "Order", "OutboxEntry", "OfferRecord", "OrderRecord"]
 
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from datetime import datetime
 
-from sqlalchemy import Integer, DateTime
+from sqlalchemy import BigInteger, Integer, DateTime
 from sqlalchemy.orm import Mapped, mapped_column
 
 from order_offer_service.app.models.base import Base
@@ -10,14 +10,20 @@ from order_offer_service.app.models.base import Base
 
 class Order(Base):
     __tablename__ = "orders"
+    # Range-partitioned by day on time_start (see core/partitions.py). Postgres requires the
+    # partition key in the primary key; the mapper keeps identifying rows by order_id alone.
+    __table_args__ = {"postgresql_partition_by": "RANGE (time_start)"}
 
-    order_id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    order_id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
     user_id: Mapped[int] = mapped_column(Integer, index=True, nullable=False)
     scooter_id: Mapped[int] = mapped_column(Integer, nullable=False)
-    time_start: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, default=datetime.utcnow)
+    time_start: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), primary_key=True, nullable=False, default=datetime.utcnow
+    )
     time_finish: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
     price_per_minute: Mapped[int] = mapped_column(Integer, nullable=False)
     price_unlock: Mapped[int] = mapped_column(Integer, nullable=False)
     deposit: Mapped[int] = mapped_column(Integer, nullable=False)
     ttl: Mapped[int] = mapped_column(Integer, nullable=False)
 
+    __mapper_args__ = {"primary_key": [order_id]}
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Any
+
+
+@dataclass(slots=True)
+class OfferRecord:
+    """Plain offer row used by storage backends that bypass the ORM."""
+
+    offer_id: int | str
+    user_id: int
+    scooter_id: int
+    time_offer_creation: datetime
+    price_per_minute: int
+    price_unlock: int
+    deposit: int
+    ttl: int
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+@dataclass(slots=True)
+class OrderRecord:
+    """Plain order row used by caches and ORM-free read paths."""
+
+    order_id: int
+    user_id: int
+    scooter_id: int
+    time_start: datetime
+    time_finish: datetime | None
+    price_per_minute: int
+    price_unlock: int
+    deposit: int
+    ttl: int
+
+    @classmethod
+    def from_order(cls, order: Any) -> OrderRecord:
+        return cls(
+            order_id=order.order_id,
+            user_id=order.user_id,
+            scooter_id=order.scooter_id,
+            time_start=order.time_start,
+            time_finish=order.time_finish,
+            price_per_minute=order.price_per_minute,
+            price_unlock=order.price_unlock,
+            deposit=order.deposit,
+            ttl=order.ttl,
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
@@ -1,5 +1,17 @@
+from order_offer_service.app.repositories.batching_offers import BatchingOfferRepository
 from order_offer_service.app.repositories.offers import OfferRepository
 from order_offer_service.app.repositories.orders import OrderRepository
+from order_offer_service.app.repositories.outbox import OutboxRepository
+from order_offer_service.app.repositories.redis_offers import RedisOfferRepository
+from order_offer_service.app.repositories.signed_offers import OfferTokenCodec, SignedOfferRepository
 
-__all__ = ["OfferRepository", "OrderRepository"]
+__all__ = [
+    "BatchingOfferRepository",
+    "OfferRepository",
+    "OrderRepository",
+    "OutboxRepository",
+    "OfferTokenCodec",
+    "RedisOfferRepository",
+    "SignedOfferRepository",
+]
 
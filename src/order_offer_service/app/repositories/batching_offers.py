@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from datetime import datetime, timezone
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from order_offer_service.app.core import db
+from order_offer_service.app.core.ids import SnowflakeGenerator
+from order_offer_service.app.core.metrics import metrics
+from order_offer_service.app.logging_config import get_logger
+from order_offer_service.app.models import Offer, OfferRecord
+from order_offer_service.app.repositories.offers import OfferRepository
+
+logger = get_logger(__name__)
+
+
+class BatchingOfferRepository:
+    """Group-commits offer inserts from concurrent requests.
+
+    ``create`` queues the row and waits; the queue is written as one
+    multi-row INSERT in its own transaction once ``window_seconds`` has
+    passed since the first queued row or ``max_rows`` rows are waiting, and
+    every caller then gets its own record back (or the batch's error). Ids
+    come from the snowflake generator, so no RETURNING is needed to match
+    rows to callers. Reads and deletes go straight to ``inner``.
+    """
+
+    def __init__(
+        self,
+        inner: OfferRepository,
+        ids: SnowflakeGenerator,
+        window_seconds: float,
+        max_rows: int,
+        session_factory=None,
+    ) -> None:
+        self.inner = inner
+        self.ids = ids
+        self.window_seconds = window_seconds
+        self.max_rows = max_rows
+        self._session_factory = session_factory
+        self._pending: list[tuple[OfferRecord, asyncio.Future, float]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._flushes: set[asyncio.Task] = set()
+
+    def _session(self) -> AsyncSession:
+        return (self._session_factory or db.async_session_factory)()
+
+    async def create(
+        self,
+        session: AsyncSession,
+        *,
+        user_id: int,
+        scooter_id: int,
+        price_per_minute: int,
+        price_unlock: int,
+        deposit: int,
+        ttl: int,
+    ) -> OfferRecord:
+        record = OfferRecord(
+            offer_id=self.ids.next_id(),
+            user_id=user_id,
+            scooter_id=scooter_id,
+            time_offer_creation=datetime.now(timezone.utc),
+            price_per_minute=price_per_minute,
+            price_unlock=price_unlock,
+            deposit=deposit,
+            ttl=ttl,
+        )
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((record, future, time.perf_counter()))
+        if len(self._pending) >= self.max_rows:
+            self._flush_now()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.window_seconds, self._flush_now)
+        return await future
+
+    def _flush_now(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.create_task(self._write(batch))
+            self._flushes.add(task)
+            task.add_done_callback(self._flushes.discard)
+
+    async def _write(self, batch: list[tuple[OfferRecord, asyncio.Future, float]]) -> None:
+        metrics.observe("offers.batch.size", len(batch))
+        try:
+            async with self._session() as session:
+                await session.execute(insert(Offer), [record.to_dict() for record, _, _ in batch])
+                await session.commit()
+        except Exception as error:
+            metrics.inc("offers.batch.failed")
+            logger.warning("offers.batch.failed", rows=len(batch), error=str(error))
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(error)
+            return
+
+        done = time.perf_counter()
+        for record, future, queued_at in batch:
+            metrics.observe("offers.batch.added_latency_seconds", done - queued_at)
+            if not future.done():
+                future.set_result(record)
+
+    async def close(self) -> None:
+        self._flush_now()
+        if self._flushes:
+            await asyncio.gather(*self._flushes, return_exceptions=True)
+
+    async def get(self, session: AsyncSession, offer_id: int | str) -> OfferRecord | None:
+        return await self.inner.get(session, offer_id)
+
+    async def remove(self, session: AsyncSession, offer_id: int | str) -> None:
+        await self.inner.remove(session, offer_id)
+
+    async def delete_expired(self, session: AsyncSession, batch_size: int = 1000) -> int:
+        return await self.inner.delete_expired(session, batch_size)
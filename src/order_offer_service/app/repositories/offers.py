@@ -2,13 +2,27 @@ from __future__ import annotations
 
 from datetime import datetime, timezone
 
-from sqlalchemy import select, delete, func
+from sqlalchemy import bindparam, select, delete, text
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from order_offer_service.app.models import Offer
+from order_offer_service.app.core import exceptions
+from order_offer_service.app.core.ids import SnowflakeGenerator
+from order_offer_service.app.models import Offer, OfferRecord
+
+_RECORD_COLUMNS = tuple(Offer.__table__.c[name] for name in OfferRecord.__slots__)
+_GET_RECORD = select(*_RECORD_COLUMNS).where(Offer.offer_id == bindparam("offer_id"))
+_DELETE_EXPIRED = text(
+    "DELETE FROM offers WHERE ctid IN ("
+    "SELECT ctid FROM offers WHERE time_offer_creation + ttl * interval '1 second' < now() "
+    "LIMIT :batch_size)"
+)
 
 
 class OfferRepository:
+    def __init__(self, ids: SnowflakeGenerator | None = None) -> None:
+        # without a generator the SERIAL sequence assigns ids at flush
+        self.ids = ids
+
     async def create(
         self,
         session: AsyncSession,
@@ -21,6 +35,7 @@ class OfferRepository:
         ttl: int,
     ) -> Offer:
         offer = Offer(
+            offer_id=self.ids.next_id() if self.ids is not None else None,
             user_id=user_id,
             scooter_id=scooter_id,
             price_per_minute=price_per_minute,
@@ -33,18 +48,24 @@ class OfferRepository:
         await session.flush()
         return offer
 
-    async def get(self, session: AsyncSession, offer_id: int) -> Offer | None:
-        stmt = select(Offer).where(Offer.offer_id == offer_id)
-        result = await session.execute(stmt)
-        return result.scalar_one_or_none()
+    async def get(self, session: AsyncSession, offer_id: int | str) -> OfferRecord | None:
+        if not isinstance(offer_id, int):
+            return None
+        connection = await session.connection()
+        result = await connection.execute(_GET_RECORD, {"offer_id": offer_id})
+        row = result.one_or_none()
+        return None if row is None else OfferRecord(*row)
 
-    async def remove(self, session: AsyncSession, offer_id: int) -> None:
-        await session.execute(delete(Offer).where(Offer.offer_id == offer_id))
+    async def remove(self, session: AsyncSession, offer_id: int | str) -> None:
+        if not isinstance(offer_id, int):
+            raise exceptions.OfferNotFound()
+        result = await session.execute(delete(Offer).where(Offer.offer_id == offer_id))
+        # a concurrent start already deleted the row: the offer is used up
+        if result.rowcount == 0:
+            raise exceptions.OfferNotFound()
 
-    async def delete_expired(self, session: AsyncSession) -> int:
-        stmt = delete(Offer).where(
-            Offer.time_offer_creation + func.make_interval(secs=Offer.ttl) < func.now()
-        )
-        result = await session.execute(stmt)
+    async def delete_expired(self, session: AsyncSession, batch_size: int = 1000) -> int:
+        """Deletes at most ``batch_size`` expired offers, addressed by ctid to keep each batch short."""
+        result = await session.execute(_DELETE_EXPIRED, {"batch_size": batch_size})
         return result.rowcount or 0
 
@@ -2,17 +2,45 @@ from __future__ import annotations
 
 from datetime import datetime, timedelta, timezone
 
-from sqlalchemy import select, delete, update
+from sqlalchemy import BigInteger, bindparam, delete, func, insert, literal_column, select, text, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from order_offer_service.app.models import Order
+from order_offer_service.app.core.ids import SnowflakeGenerator
+from order_offer_service.app.models import Offer, Order, OrderRecord
+
+_OFFER_TERMS = ("user_id", "scooter_id", "price_per_minute", "price_unlock", "deposit", "ttl")
+# Core columns in OrderRecord field order, so a row unpacks straight into a record.
+_RECORD_COLUMNS = tuple(Order.__table__.c[name] for name in OrderRecord.__slots__)
+_GET_RECORD = select(*_RECORD_COLUMNS).where(Order.order_id == bindparam("order_id"))
+# orders is partitioned and a ctid is only unique within one partition, hence (tableoid, ctid).
+_DELETE_OLDER_THAN = text(
+    "DELETE FROM orders WHERE (tableoid, ctid) IN ("
+    "SELECT tableoid, ctid FROM orders WHERE time_start < :older_than LIMIT :batch_size)"
+)
+# A row without time_finish is a ride in progress, however old: it is never expired here.
+_DELETE_EXPIRED = text(
+    "DELETE FROM orders WHERE (tableoid, ctid) IN ("
+    "SELECT tableoid, ctid FROM orders WHERE time_finish IS NOT NULL "
+    "AND time_start + ttl * interval '1 day' < now() LIMIT :batch_size)"
+)
 
 
 class OrderRepository:
+    def __init__(self, ids: SnowflakeGenerator | None = None) -> None:
+        self.ids = ids
+
+    async def allocate_id(self, session: AsyncSession) -> int:
+        """Reserves an order id before the row is inserted: generated locally, or from the sequence."""
+        if self.ids is not None:
+            return self.ids.next_id()
+        result = await session.execute(text("SELECT nextval(pg_get_serial_sequence('orders', 'order_id'))"))
+        return result.scalar_one()
+
     async def create(
         self,
         session: AsyncSession,
         *,
+        order_id: int | None = None,
         user_id: int,
         scooter_id: int,
         price_per_minute: int,
@@ -20,7 +48,10 @@ class OrderRepository:
         deposit: int,
         ttl: int,
     ) -> Order:
+        if order_id is None and self.ids is not None:
+            order_id = self.ids.next_id()
         order = Order(
+            order_id=order_id,
             user_id=user_id,
             scooter_id=scooter_id,
             price_per_minute=price_per_minute,
@@ -33,27 +64,73 @@ class OrderRepository:
         await session.flush()
         return order
 
-    async def get(self, session: AsyncSession, order_id: int) -> Order | None:
-        stmt = select(Order).where(Order.order_id == order_id)
-        result = await session.execute(stmt)
+    async def create_from_offer(self, session: AsyncSession, *, offer_id: int, user_id: int) -> Order | None:
+        """Consumes a valid offer and inserts its order in one statement.
+
+        Returns None, changing nothing, when the offer is missing, expired or
+        belongs to another user, or when the user already has an active order.
+        """
+        active = select(Order.order_id).where(Order.user_id == user_id, Order.time_finish.is_(None))
+        consumed = (
+            delete(Offer)
+            .where(
+                Offer.offer_id == offer_id,
+                Offer.user_id == user_id,
+                Offer.time_offer_creation + Offer.ttl * literal_column("interval '1 second'") >= func.now(),
+                ~active.exists(),
+            )
+            .returning(*(getattr(Offer, name) for name in _OFFER_TERMS))
+            .cte("consumed")
+        )
+        columns = [consumed.c[name] for name in _OFFER_TERMS]
+        targets = [*_OFFER_TERMS, "time_start"]
+        if self.ids is not None:
+            columns.append(literal_column(str(self.ids.next_id()), BigInteger))
+            targets.append("order_id")
+        stmt = (
+            insert(Order)
+            .from_select(targets, select(*columns, func.now()))
+            .add_cte(consumed)
+            .returning(Order)
+        )
+        result = await session.execute(select(Order).from_statement(stmt))
         return result.scalar_one_or_none()
 
+    async def get(self, session: AsyncSession, order_id: int) -> OrderRecord | None:
+        """Core read on the session's connection: no ORM execution, hydration or identity map."""
+        connection = await session.connection()
+        result = await connection.execute(_GET_RECORD, {"order_id": order_id})
+        row = result.one_or_none()
+        return None if row is None else OrderRecord(*row)
+
     async def get_active_by_user(self, session: AsyncSession, user_id: int) -> Order | None:
         stmt = select(Order).where(Order.user_id == user_id, Order.time_finish.is_(None))
         result = await session.execute(stmt)
         return result.scalar_one_or_none()
 
-    async def finish(self, session: AsyncSession, order_id: int) -> None:
-        stmt = update(Order).where(Order.order_id == order_id).values({"time_finish": datetime.now(timezone.utc)})
-        await session.execute(stmt)
+    async def finish(self, session: AsyncSession, order_id: int) -> Order | None:
+        stmt = (
+            update(Order)
+            .where(Order.order_id == order_id)
+            .values({"time_finish": datetime.now(timezone.utc)})
+            .returning(Order)
+        )
+        result = await session.execute(
+            select(Order).from_statement(stmt).execution_options(populate_existing=True)
+        )
+        order = result.scalar_one_or_none()
         await session.commit()
-        return await self.get(session, order_id)
+        return order
 
     async def delete(self, session: AsyncSession, order_id: int) -> None:
         await session.execute(delete(Order).where(Order.order_id == order_id))
 
-    async def delete_older_than(self, session: AsyncSession, older_than: datetime) -> int:
-        stmt = delete(Order).where(Order.time_start < older_than)
-        result = await session.execute(stmt)
+    async def delete_older_than(self, session: AsyncSession, older_than: datetime, batch_size: int = 1000) -> int:
+        result = await session.execute(_DELETE_OLDER_THAN, {"older_than": older_than, "batch_size": batch_size})
+        return result.rowcount or 0
+
+    async def delete_expired(self, session: AsyncSession, batch_size: int = 1000) -> int:
+        """Deletes finished orders past their own retention: ``ttl`` is the zone's retention in days, as in the archive."""
+        result = await session.execute(_DELETE_EXPIRED, {"batch_size": batch_size})
         return result.rowcount or 0
 
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from sqlalchemy import delete, func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from order_offer_service.app.models import OutboxEntry
+
+
+class OutboxRepository:
+    async def add(self, session: AsyncSession, order_id: int, action: str, payload: dict[str, Any]) -> OutboxEntry:
+        now = datetime.now(timezone.utc)
+        entry = OutboxEntry(
+            order_id=order_id,
+            action=action,
+            payload=payload,
+            created_at=now,
+            available_at=now,
+            attempts=0,
+        )
+        session.add(entry)
+        return entry
+
+    async def claim(self, session: AsyncSession, limit: int, lease_seconds: float) -> list[OutboxEntry]:
+        """Leases due entries until ``locked_until``; rows another worker holds a live lease on are skipped.
+
+        The row locks only last for this statement's transaction, so the caller
+        commits before running any handler.
+        """
+        now = datetime.now(timezone.utc)
+        due = (
+            select(OutboxEntry.entry_id)
+            .where(
+                OutboxEntry.available_at <= now,
+                or_(OutboxEntry.locked_until.is_(None), OutboxEntry.locked_until <= now),
+            )
+            .order_by(OutboxEntry.entry_id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        stmt = (
+            update(OutboxEntry)
+            .where(OutboxEntry.entry_id.in_(due.scalar_subquery()))
+            .values(locked_until=now + timedelta(seconds=lease_seconds))
+            .returning(OutboxEntry)
+            .execution_options(synchronize_session=False)
+        )
+        result = await session.execute(stmt)
+        return sorted(result.scalars().all(), key=lambda entry: entry.entry_id)
+
+    async def complete(self, session: AsyncSession, entry: OutboxEntry) -> None:
+        await session.execute(delete(OutboxEntry).where(OutboxEntry.entry_id == entry.entry_id))
+
+    async def reschedule(self, session: AsyncSession, entry: OutboxEntry, error: str, delay_seconds: float) -> None:
+        entry.attempts += 1
+        await session.execute(
+            update(OutboxEntry)
+            .where(OutboxEntry.entry_id == entry.entry_id)
+            .values(
+                attempts=entry.attempts,
+                last_error=error,
+                available_at=datetime.now(timezone.utc) + timedelta(seconds=delay_seconds),
+                locked_until=None,
+            )
+        )
+
+    async def stats(self, session: AsyncSession) -> tuple[int, datetime | None]:
+        result = await session.execute(select(func.count(), func.min(OutboxEntry.created_at)))
+        depth, oldest = result.one()
+        return depth, oldest
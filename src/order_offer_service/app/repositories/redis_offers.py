@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+import orjson
+from redis.asyncio import Redis
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from order_offer_service.app.core import exceptions
+from order_offer_service.app.core.ids import SnowflakeGenerator
+from order_offer_service.app.models.records import OfferRecord
+
+
+class RedisOfferRepository:
+    """Offers stored as orjson blobs whose Redis TTL equals the offer ttl.
+
+    Expired offers disappear on their own; consumption is an atomic GETDEL,
+    so a second consumer of the same offer sees it as missing.
+    """
+
+    def __init__(self, redis: Redis, prefix: str = "offers", ids: SnowflakeGenerator | None = None) -> None:
+        self.redis = redis
+        self.prefix = prefix
+        self.ids = ids
+
+    def _key(self, offer_id: int) -> str:
+        return f"{self.prefix}:{offer_id}"
+
+    @staticmethod
+    def _dumps(record: OfferRecord) -> bytes:
+        return orjson.dumps(
+            [
+                record.user_id,
+                record.scooter_id,
+                int(record.time_offer_creation.timestamp() * 1000),
+                record.price_per_minute,
+                record.price_unlock,
+                record.deposit,
+                record.ttl,
+            ]
+        )
+
+    @staticmethod
+    def _loads(offer_id: int, raw: str | bytes) -> OfferRecord:
+        user_id, scooter_id, created_ms, price_per_minute, price_unlock, deposit, ttl = orjson.loads(raw)
+        return OfferRecord(
+            offer_id=offer_id,
+            user_id=user_id,
+            scooter_id=scooter_id,
+            time_offer_creation=datetime.fromtimestamp(created_ms / 1000, tz=timezone.utc),
+            price_per_minute=price_per_minute,
+            price_unlock=price_unlock,
+            deposit=deposit,
+            ttl=ttl,
+        )
+
+    async def create(
+        self,
+        session: AsyncSession,
+        *,
+        user_id: int,
+        scooter_id: int,
+        price_per_minute: int,
+        price_unlock: int,
+        deposit: int,
+        ttl: int,
+    ) -> OfferRecord:
+        offer_id = self.ids.next_id() if self.ids is not None else await self.redis.incr(f"{self.prefix}:seq")
+        record = OfferRecord(
+            offer_id=offer_id,
+            user_id=user_id,
+            scooter_id=scooter_id,
+            time_offer_creation=datetime.now(timezone.utc),
+            price_per_minute=price_per_minute,
+            price_unlock=price_unlock,
+            deposit=deposit,
+            ttl=ttl,
+        )
+        await self.redis.set(self._key(record.offer_id), self._dumps(record), ex=ttl)
+        return record
+
+    async def get(self, session: AsyncSession, offer_id: int | str) -> OfferRecord | None:
+        if not isinstance(offer_id, int):
+            return None
+        raw = await self.redis.get(self._key(offer_id))
+        return None if raw is None else self._loads(offer_id, raw)
+
+    async def remove(self, session: AsyncSession, offer_id: int | str) -> None:
+        if not isinstance(offer_id, int) or await self.redis.getdel(self._key(offer_id)) is None:
+            raise exceptions.OfferNotFound()
+
+    async def delete_expired(self, session: AsyncSession, batch_size: int = 1000) -> int:
+        # Redis drops offers itself once their EX runs out.
+        return 0
@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import base64
+import binascii
+import hashlib
+import hmac
+import struct
+from datetime import datetime, timezone
+
+from redis.asyncio import Redis
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from order_offer_service.app.core import exceptions
+from order_offer_service.app.models.records import OfferRecord
+
+TOKEN_VERSION = 1
+# version, user_id, scooter_id, price_per_minute, price_unlock, deposit, ttl, created_at (ms)
+_PAYLOAD = struct.Struct(">BqqiiiiQ")
+_MAC_SIZE = 16
+
+
+class OfferTokenCodec:
+    """Packs offer fields into a compact HMAC-SHA256 signed, url-safe token."""
+
+    def __init__(self, secret: str) -> None:
+        self._secret = secret.encode("utf-8")
+
+    def _mac(self, payload: bytes) -> bytes:
+        return hmac.new(self._secret, payload, hashlib.sha256).digest()[:_MAC_SIZE]
+
+    def encode(self, record: OfferRecord) -> str:
+        payload = _PAYLOAD.pack(
+            TOKEN_VERSION,
+            record.user_id,
+            record.scooter_id,
+            record.price_per_minute,
+            record.price_unlock,
+            record.deposit,
+            record.ttl,
+            int(record.time_offer_creation.timestamp() * 1000),
+        )
+        return base64.urlsafe_b64encode(payload + self._mac(payload)).rstrip(b"=").decode("ascii")
+
+    def decode(self, token: str) -> OfferRecord | None:
+        """Returns the offer encoded in ``token`` or None if it is malformed or forged."""
+        try:
+            raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        except (binascii.Error, ValueError):
+            return None
+        if len(raw) != _PAYLOAD.size + _MAC_SIZE:
+            return None
+        payload, mac = raw[:_PAYLOAD.size], raw[_PAYLOAD.size:]
+        if not hmac.compare_digest(mac, self._mac(payload)):
+            return None
+        version, user_id, scooter_id, price_per_minute, price_unlock, deposit, ttl, created_ms = _PAYLOAD.unpack(payload)
+        if version != TOKEN_VERSION:
+            return None
+        return OfferRecord(
+            offer_id=token,
+            user_id=user_id,
+            scooter_id=scooter_id,
+            time_offer_creation=datetime.fromtimestamp(created_ms / 1000, tz=timezone.utc),
+            price_per_minute=price_per_minute,
+            price_unlock=price_unlock,
+            deposit=deposit,
+            ttl=ttl,
+        )
+
+
+class SignedOfferRepository:
+    """Stateless offers: the offer id is a signed token, Postgres is never touched.
+
+    Single use is enforced by a short-lived Redis key per consumed token.
+    """
+
+    def __init__(self, codec: OfferTokenCodec, redis: Redis, prefix: str = "offers:consumed") -> None:
+        self.codec = codec
+        self.redis = redis
+        self.prefix = prefix
+
+    async def create(
+        self,
+        session: AsyncSession,
+        *,
+        user_id: int,
+        scooter_id: int,
+        price_per_minute: int,
+        price_unlock: int,
+        deposit: int,
+        ttl: int,
+    ) -> OfferRecord:
+        record = OfferRecord(
+            offer_id="",
+            user_id=user_id,
+            scooter_id=scooter_id,
+            time_offer_creation=datetime.now(timezone.utc).replace(microsecond=0),
+            price_per_minute=price_per_minute,
+            price_unlock=price_unlock,
+            deposit=deposit,
+            ttl=ttl,
+        )
+        record.offer_id = self.codec.encode(record)
+        return record
+
+    async def get(self, session: AsyncSession, offer_id: int | str) -> OfferRecord | None:
+        if not isinstance(offer_id, str):
+            return None
+        return self.codec.decode(offer_id)
+
+    async def remove(self, session: AsyncSession, offer_id: int | str) -> None:
+        offer = await self.get(session, offer_id)
+        if offer is None:
+            raise exceptions.OfferNotFound()
+        expires_at = offer.time_offer_creation.timestamp() + offer.ttl
+        remaining = max(int(expires_at - datetime.now(timezone.utc).timestamp()) + 1, 1)
+        digest = hashlib.sha256(offer_id.encode("ascii")).hexdigest()[:32]
+        if not await self.redis.set(f"{self.prefix}:{digest}", 1, nx=True, ex=remaining):
+            raise exceptions.OfferNotFound()
+
+    async def delete_expired(self, session: AsyncSession, batch_size: int = 1000) -> int:
+        # Tokens expire by themselves and consumed markers carry a Redis TTL.
+        return 0
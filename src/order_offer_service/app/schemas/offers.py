@@ -1,6 +1,6 @@
 from datetime import datetime, timedelta
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class OfferCreateRequest(BaseModel):
@@ -9,7 +9,7 @@ class OfferCreateRequest(BaseModel):
 
 
 class OfferCreateResponse(BaseModel):
-    offer_id: int
+    offer_id: int | str
     price_per_minute: int
     price_unlock: int
     deposit: int
@@ -17,7 +17,7 @@ class OfferCreateResponse(BaseModel):
     expires_at: datetime
 
     @classmethod
-    def from_offer(cls, offer_id: int, ttl: int, created_at: datetime, **kwargs):
+    def from_offer(cls, offer_id: int | str, ttl: int, created_at: datetime, **kwargs):
         return cls(
             offer_id=offer_id,
             ttl=ttl,
@@ -25,3 +25,29 @@ class OfferCreateResponse(BaseModel):
             **kwargs,
         )
 
+
+class OfferQuoteRequest(BaseModel):
+    user_id: int
+    scooter_ids: list[int] = Field(min_length=1, max_length=500)
+
+
+class ScooterQuote(BaseModel):
+    scooter_id: int
+    zone_id: str
+    price_per_minute: int
+    price_unlock: int
+    deposit: int
+
+
+class OfferQuoteResponse(BaseModel):
+    quotes: list[ScooterQuote]
+    unavailable: list[int]
+
+
+class NearbyScooterQuote(ScooterQuote):
+    distance_meters: float
+
+
+class OfferNearbyResponse(BaseModel):
+    quotes: list[NearbyScooterQuote]
+
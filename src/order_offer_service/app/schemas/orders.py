@@ -1,11 +1,21 @@
 from datetime import datetime
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
+
+from order_offer_service.app.config import get_settings
 
 
 class OrderStartRequest(BaseModel):
     user_id: int
-    offer_id: int
+    offer_id: int | str
+
+    @field_validator("offer_id", mode="before")
+    @classmethod
+    def _offer_id_for_storage(cls, value):
+        # Signed offers are opaque string tokens; every other storage keys offers by integer id.
+        if get_settings().offer_storage != "signed" and isinstance(value, str):
+            return int(value)
+        return value
 
 
 class OrderStartResponse(BaseModel):
@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any
+
+import numpy as np
+
+from order_offer_service.app.core.metrics import metrics
+from order_offer_service.app.logging_config import get_logger
+from order_offer_service.app.services.integrations import ScooterClient
+from order_offer_service.app.services.spatial import SpatialIndex
+
+logger = get_logger(__name__)
+
+KNOWN = 1
+AVAILABLE = 2
+
+# 4 bytes per scooter: 10^6 scooters fit in 4 MB.
+FLEET_DTYPE = np.dtype([("zone", np.uint16), ("charge", np.uint8), ("flags", np.uint8)])
+
+
+class FleetSnapshot:
+    """Array-backed scooter state indexed directly by scooter id.
+
+    Zones are interned into small integer codes. The snapshot as a whole is
+    as fresh as its last successful sync; ``get`` returns None once that is
+    older than ``max_staleness_seconds`` or when the scooter is unknown, and
+    the caller then asks the scooters service directly.
+    """
+
+    def __init__(self, max_staleness_seconds: float, max_scooter_id: int, capacity: int = 1024) -> None:
+        self.max_staleness_seconds = max_staleness_seconds
+        self.max_scooter_id = max_scooter_id
+        self.table = np.zeros(capacity, dtype=FLEET_DTYPE)
+        self.zone_codes: dict[str, int] = {}
+        self.zone_names: list[str] = []
+        self.synced_at: float | None = None
+        self.version = 0
+
+    @property
+    def nbytes(self) -> int:
+        return self.table.nbytes
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self.table["flags"] & KNOWN))
+
+    def _zone_code(self, zone_id: str) -> int:
+        code = self.zone_codes.get(zone_id)
+        if code is None:
+            code = self.zone_codes[zone_id] = len(self.zone_names)
+            self.zone_names.append(zone_id)
+        return code
+
+    def _reserve(self, highest_id: int) -> None:
+        if highest_id < len(self.table):
+            return
+        capacity = len(self.table)
+        while capacity <= highest_id:
+            capacity *= 2
+        grown = np.zeros(min(capacity, self.max_scooter_id + 1), dtype=FLEET_DTYPE)
+        grown[: len(self.table)] = self.table
+        self.table = grown
+
+    def upsert(self, scooters: list[dict[str, Any]]) -> None:
+        scooters = [scooter for scooter in scooters if 0 <= scooter["scooter_id"] <= self.max_scooter_id]
+        if not scooters:
+            return
+        ids = np.fromiter((scooter["scooter_id"] for scooter in scooters), dtype=np.int64, count=len(scooters))
+        self._reserve(int(ids.max()))
+        self.table["zone"][ids] = [self._zone_code(scooter["zone_id"]) for scooter in scooters]
+        self.table["charge"][ids] = [max(0, min(100, int(scooter.get("charge", 100)))) for scooter in scooters]
+        self.table["flags"][ids] = [
+            KNOWN | (AVAILABLE if scooter.get("available", True) else 0) for scooter in scooters
+        ]
+
+    def remove(self, scooter_ids: list[int]) -> None:
+        ids = [scooter_id for scooter_id in scooter_ids if 0 <= scooter_id < len(self.table)]
+        self.table["flags"][ids] = 0
+
+    def mark_synced(self, version: int, started_at: float) -> None:
+        self.version = version
+        self.synced_at = started_at
+
+    def age(self) -> float | None:
+        return None if self.synced_at is None else time.monotonic() - self.synced_at
+
+    def get(self, scooter_id: int) -> dict[str, Any] | None:
+        age = self.age()
+        if age is None or age > self.max_staleness_seconds:
+            metrics.inc("fleet.stale")
+            return None
+        if not 0 <= scooter_id < len(self.table):
+            metrics.inc("fleet.misses")
+            return None
+        zone, charge, flags = self.table[scooter_id].tolist()
+        if not flags & KNOWN:
+            metrics.inc("fleet.misses")
+            return None
+        metrics.inc("fleet.hits")
+        return {
+            "scooter_id": scooter_id,
+            "zone_id": self.zone_names[zone],
+            "charge": charge,
+            "available": bool(flags & AVAILABLE),
+        }
+
+
+class FleetSync:
+    """Keeps a FleetSnapshot current from the scooters service's versioned change feed.
+
+    The first run starts from version 0, which is the full fleet; later runs
+    only fetch scooters changed since the last version seen. An optional
+    SpatialIndex is fed from the same pages.
+    """
+
+    def __init__(
+        self,
+        snapshot: FleetSnapshot,
+        client: ScooterClient,
+        interval: float,
+        page_size: int,
+        index: SpatialIndex | None = None,
+    ) -> None:
+        self.snapshot = snapshot
+        self.client = client
+        self.interval = interval
+        self.page_size = page_size
+        self.index = index
+        self._task: asyncio.Task | None = None
+
+    async def sync_once(self) -> int:
+        started_at = time.monotonic()
+        version = self.snapshot.version
+        changed = 0
+        while True:
+            page = await self.client.obtain_changes(version, self.page_size)
+            self.snapshot.upsert(page.get("items", []))
+            self.snapshot.remove(page.get("removed", []))
+            if self.index is not None:
+                self.index.upsert(page.get("items", []))
+                self.index.remove(page.get("removed", []))
+            changed += len(page.get("items", [])) + len(page.get("removed", []))
+            version = page["version"]
+            if not page.get("more"):
+                break
+        self.snapshot.mark_synced(version, started_at)
+        metrics.inc("fleet.sync.changes", changed)
+        metrics.set("fleet.size", len(self.snapshot))
+        metrics.set("fleet.bytes", self.snapshot.nbytes)
+        if self.index is not None:
+            metrics.set("spatial.size", len(self.index))
+        return changed
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.sync_once()
+            except Exception as error:
+                metrics.inc("fleet.sync.failed")
+                logger.warning("fleet.sync.failed", error=str(error), age=self.snapshot.age())
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
@@ -1,5 +1,8 @@
 from __future__ import annotations
 
+import asyncio
+import time
+from collections.abc import Awaitable, Callable, Hashable
 from typing import Any
 
 import httpx
@@ -9,6 +12,8 @@ from tenacity import AsyncRetrying, retry_if_exception_type, stop_after_attempt,
 from order_offer_service.app.config import get_settings
 from order_offer_service.app.cache.base import ServiceCache
 from order_offer_service.app.core import exceptions
+from order_offer_service.app.core.http import stub_http_clients
+from order_offer_service.app.core.metrics import metrics
 from order_offer_service.app.core.redis import cached_get, cached_set, redis_client
 from order_offer_service.app.logging_config import get_logger
 
@@ -20,20 +25,85 @@ class ExternalServiceUnavailable(exceptions.ExternalServiceError):
     message = "external_service_unavailable"
 
 
+class BatchLoader:
+    """Coalesces lookups of different keys made within a short window into one bulk call.
+
+    ``load_many`` gets the distinct keys of a batch and returns a value or an
+    exception per key, so a missing key only fails its own callers; an error
+    raised by ``load_many`` itself fails the whole batch. A batch is sent
+    ``window_seconds`` after its first key or as soon as it holds ``max_keys``.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        load_many: Callable[[list[Hashable]], Awaitable[dict[Hashable, Any]]],
+        window_seconds: float,
+        max_keys: int,
+    ) -> None:
+        self.name = name
+        self.load_many = load_many
+        self.window_seconds = window_seconds
+        self.max_keys = max_keys
+        self._pending: dict[Hashable, asyncio.Future] = {}
+        self._timer: asyncio.TimerHandle | None = None
+        self._batches: set[asyncio.Task] = set()
+
+    async def load(self, key: Hashable) -> Any:
+        future = self._pending.get(key)
+        if future is None:
+            future = self._pending[key] = asyncio.get_running_loop().create_future()
+            if len(self._pending) >= self.max_keys:
+                self._dispatch()
+            elif self._timer is None:
+                self._timer = asyncio.get_running_loop().call_later(self.window_seconds, self._dispatch)
+        else:
+            metrics.inc(f"loader.{self.name}.deduplicated")
+        # a cancelled caller must not cancel the future other callers share
+        return await asyncio.shield(future)
+
+    def _dispatch(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, {}
+        if batch:
+            task = asyncio.create_task(self._run(batch))
+            self._batches.add(task)
+            task.add_done_callback(self._batches.discard)
+
+    async def _run(self, batch: dict[Hashable, asyncio.Future]) -> None:
+        metrics.observe(f"loader.{self.name}.batch_size", len(batch))
+        started = time.perf_counter()
+        try:
+            results = await self.load_many(list(batch))
+        except Exception as error:
+            results = {key: error for key in batch}
+        metrics.observe(f"loader.{self.name}.latency_seconds", time.perf_counter() - started)
+        for key, future in batch.items():
+            if future.done():
+                continue
+            result = results.get(key, KeyError(key))
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+                # nobody may be left to retrieve it after a cancellation
+                future.exception()
+            else:
+                future.set_result(result)
+
+
 class BaseStubClient:
     def __init__(self, segment: str, critical: bool = False) -> None:
         self.segment = segment
         self.critical = critical
 
     async def _request(self, method: str, path: str, **kwargs) -> Any:
-        base_url = str(settings.stub_service_base_url).rstrip("/")
-        path = path.lstrip("/")
-        url = f"{base_url}/{path}"
+        url = f"/{path.lstrip('/')}"
 
         async def _call() -> Any:
             try:
-                async with httpx.AsyncClient(timeout=5.0) as client:
-                    response = await client.request(method, url, **kwargs)
+                client = stub_http_clients.get(self.segment)
+                response = await client.request(method, url, **kwargs)
             except httpx.RequestError as exc:
                 logger.error("stub.connection.error", segment=self.segment, error=str(exc))
                 raise ExternalServiceUnavailable(str(exc)) from exc
@@ -62,9 +132,9 @@ class BaseStubClient:
 
 
 class ConfigClient(BaseStubClient):
-    def __init__(self, cache_ttl: int = 60) -> None:
+    def __init__(self, cache_ttl: int = 60, **cache_options: Any) -> None:
         super().__init__("configs")
-        self.cache = ServiceCache(cache_ttl)
+        self.cache = ServiceCache(cache_ttl, name="configs", **cache_options)
 
     async def obtain_price_coeff_settings(self) -> dict[str, Any]:
         return await self._request("GET", "/configs/price_coeff_settings")
@@ -72,11 +142,14 @@ class ConfigClient(BaseStubClient):
     async def get_price_coeff_settings(self) -> dict[str, Any]:
         return await self.cache.get_or_set("configs", self.obtain_price_coeff_settings)
 
+    async def refresh(self) -> None:
+        await self.cache.refresh("configs", self.obtain_price_coeff_settings)
+
 
 class ZoneClient(BaseStubClient):
-    def __init__(self, cache_ttl: int = 600) -> None:
+    def __init__(self, cache_ttl: int = 600, **cache_options: Any) -> None:
         super().__init__("zones")
-        self.cache = ServiceCache(cache_ttl)
+        self.cache = ServiceCache(cache_ttl, name="zones", **cache_options)
 
     async def obtain_zone(self, zone_id: str) -> dict[str, Any]:
         return await self._request("GET", f"/zones/{zone_id}")
@@ -84,13 +157,51 @@ class ZoneClient(BaseStubClient):
     async def get_zone(self, zone_id: str) -> dict[str, Any]:
         return await self.cache.get_or_set(f"zones:{zone_id}", self.obtain_zone, zone_id)
 
+    async def get_zones(self, zone_ids: list[str]) -> dict[str, dict[str, Any]]:
+        zones = await self.cache.get_many([f"zones:{zone_id}" for zone_id in zone_ids], self._obtain_by_key)
+        return {key.removeprefix("zones:"): zone for key, zone in zones.items()}
+
+    async def _obtain_by_key(self, key: str) -> dict[str, Any]:
+        return await self.obtain_zone(key.removeprefix("zones:"))
+
+    def known_zones(self) -> list[str]:
+        return [key.removeprefix("zones:") for key in self.cache.keys()]
+
+    async def refresh(self) -> None:
+        for zone_id in self.known_zones():
+            await self.cache.refresh(f"zones:{zone_id}", self.obtain_zone, zone_id)
+
+
+def _bulk_results(payload: dict[str, Any], id_field: str, ids: list[int], missing: str) -> dict[int, Any]:
+    """Maps a ``{"items": [...], "missing": [...]}`` bulk response back to the requested ids."""
+    results: dict[int, Any] = {item[id_field]: item for item in payload.get("items", [])}
+    for item_id in ids:
+        results.setdefault(item_id, ExternalServiceUnavailable(missing))
+    return results
+
 
 class UserClient(BaseStubClient):
-    def __init__(self) -> None:
+    def __init__(self, batching: bool = False) -> None:
         super().__init__("users")
+        self.loader = (
+            BatchLoader(
+                "users",
+                self.obtain_users,
+                settings.stub_batch_window_ms / 1000,
+                settings.stub_batch_max_keys,
+            )
+            if batching
+            else None
+        )
+
+    async def obtain_users(self, user_ids: list[int]) -> dict[int, Any]:
+        payload = await self._request("GET", "/users", params={"ids": ",".join(map(str, user_ids))})
+        return _bulk_results(payload, "user_id", user_ids, "user_not_found")
 
     async def get_user(self, user_id: int) -> dict[str, Any]:
         try:
+            if self.loader is not None:
+                return await self.loader.load(user_id)
             return await self._request("GET", f"/users/{user_id}")
         except ExternalServiceUnavailable:
             logger.warning("users.fallback", user_id=user_id)
@@ -98,8 +209,26 @@ class UserClient(BaseStubClient):
 
 
 class ScooterClient(BaseStubClient):
-    def __init__(self) -> None:
+    def __init__(self, batching: bool = False) -> None:
         super().__init__("scooters", critical=True)
+        self.loader = (
+            BatchLoader(
+                "scooters",
+                self.obtain_scooters,
+                settings.stub_batch_window_ms / 1000,
+                settings.stub_batch_max_keys,
+            )
+            if batching
+            else None
+        )
+
+    async def obtain_scooters(self, scooter_ids: list[int]) -> dict[int, Any]:
+        payload = await self._request("GET", "/scooters", params={"ids": ",".join(map(str, scooter_ids))})
+        return _bulk_results(payload, "scooter_id", scooter_ids, "scooter_not_found")
+
+    async def obtain_changes(self, since: int, limit: int) -> dict[str, Any]:
+        """One page of the fleet change feed: scooters changed after version ``since``."""
+        return await self._request("GET", "/scooters/changes", params={"since": since, "limit": limit})
 
     async def _scooter_action(self, scooter_id: int, action: str) -> None:
         payload = await self._request("PUT", f"/scooters/{scooter_id}/{action}")
@@ -107,7 +236,10 @@ class ScooterClient(BaseStubClient):
             raise exceptions.ScooterUnavailable()
 
     async def get_scooter(self, scooter_id: int, require_available: bool = True) -> dict[str, Any]:
-        payload = await self._request("GET", f"/scooters/{scooter_id}")
+        if self.loader is not None:
+            payload = await self.loader.load(scooter_id)
+        else:
+            payload = await self._request("GET", f"/scooters/{scooter_id}")
         if require_available and not payload.get("available", True):
             raise exceptions.ScooterUnavailable()
         return payload
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import asyncio
 from datetime import datetime, timezone, timedelta
 
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -8,51 +9,127 @@ from order_offer_service.app.config import get_settings
 from order_offer_service.app.core import exceptions
 from order_offer_service.app.logging_config import get_logger
 from order_offer_service.app.repositories import OfferRepository
-from order_offer_service.app.schemas.offers import OfferCreateRequest
+from order_offer_service.app.schemas.offers import OfferCreateRequest, OfferQuoteRequest
+from order_offer_service.app.services.fleet import FleetSnapshot
+from order_offer_service.app.services.integrations import ExternalServiceUnavailable
+from order_offer_service.app.services.pricing import PriceQuote, PriceTable, PricingEngine
+from order_offer_service.app.services.spatial import SpatialIndex
 
 settings = get_settings()
 logger = get_logger(__name__)
 
 
 class OfferService:
-    def __init__(self, offer_repo: OfferRepository, config_client, zone_client, scooter_client, user_client):
+    def __init__(
+        self,
+        offer_repo: OfferRepository,
+        config_client,
+        zone_client,
+        scooter_client,
+        user_client,
+        fleet: FleetSnapshot | None = None,
+        pricing: PricingEngine | None = None,
+        price_table: PriceTable | None = None,
+        spatial: SpatialIndex | None = None,
+    ):
         self.offer_repo = offer_repo
         self.config_client = config_client
         self.zone_client = zone_client
         self.scooter_client = scooter_client
         self.user_client = user_client
+        self.fleet = fleet
+        self.pricing = pricing or PricingEngine(settings.low_charge_threshold)
+        self.price_table = price_table
+        self.spatial = spatial
 
-    async def create_offer(self, session: AsyncSession, req: OfferCreateRequest):
-        scooter = await self.scooter_client.get_scooter(req.scooter_id)
-        zone_id = scooter["zone_id"]
-        zone = await self.zone_client.get_zone(zone_id)
-        user = await self.user_client.get_user(req.user_id)
-        price_coeff_settings = await self.config_client.get_price_coeff_settings()
-        
-        actual_price_per_min = zone.get("price_multiplier", 15)
-        
-        if price_coeff_settings:
-            surge = price_coeff_settings.get("surge", 1.0)
-            actual_price_per_min = int(actual_price_per_min * float(surge))
-            scooter_charge = scooter.get("charge", 100)
-            if scooter_charge < settings.low_charge_threshold:
-                low_charge_discount = price_coeff_settings.get("low_charge_discount", 1.0)
-                actual_price_per_min = int(actual_price_per_min * float(low_charge_discount))
+    async def _get_scooter(self, scooter_id: int):
+        scooter = self.fleet.get(scooter_id) if self.fleet is not None else None
+        if scooter is None:
+            return await self.scooter_client.get_scooter(scooter_id)
+        if not scooter["available"]:
+            raise exceptions.ScooterUnavailable()
+        return scooter
+
+    @staticmethod
+    async def _within(seconds: float, awaitable, deadline_at: float | None = None):
+        """Awaits under a cap of ``seconds``, cut short by an absolute ``deadline_at`` of the loop clock."""
+        at = asyncio.get_running_loop().time() + seconds
+        async with asyncio.timeout_at(at if deadline_at is None else min(at, deadline_at)):
+            return await awaitable
+
+    @staticmethod
+    def _deadline_at() -> float:
+        return asyncio.get_running_loop().time() + settings.offer_total_deadline_seconds
+
+    @staticmethod
+    def _upstream_error(error: BaseException, event: str, **fields) -> BaseException:
+        """Turns a blown deadline into UpstreamTimeout; any other error is passed through as is."""
+        if not isinstance(error, TimeoutError):
+            return error
+        logger.warning(event, **fields)
+        timeout = exceptions.UpstreamTimeout()
+        timeout.__cause__ = error
+        return timeout
+
+    async def _scooter_with_zone(self, scooter_id: int, deadline_at: float):
+        scooter = await self._within(
+            settings.offer_scooter_deadline_seconds, self._get_scooter(scooter_id), deadline_at
+        )
+        zone = await self._within(
+            settings.offer_fetch_deadline_seconds, self.zone_client.get_zone(scooter["zone_id"]), deadline_at
+        )
+        return scooter, zone
 
-        actual_price_unlock = 0 if user.get("has_subscribtion", False) else zone.get("price_unlock", 50)
+    async def fetch_pricing_inputs(self, req: OfferCreateRequest):
+        """Fetch scooter->zone, user and config concurrently within ``offer_total_deadline_seconds``.
 
-        deposit = 0 if user.get("trusted", False) else zone.get("default_deposit", 1000)
+        Single calls are also capped: the scooter lookup at
+        ``offer_scooter_deadline_seconds`` so its retries still fit, the rest at
+        ``offer_fetch_deadline_seconds``, and never past the total. The first
+        failure cancels the sibling fetches and is re-raised as is.
+        """
+        deadline = settings.offer_fetch_deadline_seconds
+        deadline_at = self._deadline_at()
+        try:
+            async with asyncio.timeout_at(deadline_at), asyncio.TaskGroup() as group:
+                scooter_task = group.create_task(self._scooter_with_zone(req.scooter_id, deadline_at))
+                user_task = group.create_task(
+                    self._within(deadline, self.user_client.get_user(req.user_id), deadline_at)
+                )
+                config_task = group.create_task(
+                    self._within(deadline, self.config_client.get_price_coeff_settings(), deadline_at)
+                )
+        except TimeoutError as error:
+            raise self._upstream_error(
+                error, "offer.inputs.deadline_exceeded", user_id=req.user_id, scooter_id=req.scooter_id
+            )
+        except BaseExceptionGroup as group_error:
+            raise self._upstream_error(
+                group_error.exceptions[0],
+                "offer.inputs.deadline_exceeded",
+                user_id=req.user_id,
+                scooter_id=req.scooter_id,
+            )
 
-        ttl = zone.get("offer_ttl_seconds", 300)
+        scooter, zone = scooter_task.result()
+        return scooter, zone, user_task.result(), config_task.result()
+
+    async def create_offer(self, session: AsyncSession, req: OfferCreateRequest):
+        scooter, zone, user, price_coeff_settings = await self.fetch_pricing_inputs(req)
+        quote = None
+        if self.price_table is not None:
+            quote = self.price_table.lookup(scooter, zone, user, price_coeff_settings)
+        if quote is None:
+            quote = self.pricing.price_one(scooter, zone, user, price_coeff_settings)
 
         offer = await self.offer_repo.create(
             session,
             user_id=req.user_id,
             scooter_id=req.scooter_id,
-            price_per_minute=actual_price_per_min,
-            price_unlock=actual_price_unlock,
-            deposit=deposit,
-            ttl=ttl,
+            price_per_minute=quote.price_per_minute,
+            price_unlock=quote.price_unlock,
+            deposit=quote.deposit,
+            ttl=quote.ttl,
         )
         await session.commit()
         
@@ -61,14 +138,77 @@ class OfferService:
             offer_id=offer.offer_id,
             user_id=req.user_id,
             scooter_id=req.scooter_id,
-            zone_id=zone_id,
-            price_per_minute=actual_price_per_min,
-            price_unlock=actual_price_unlock,
-            deposit=deposit,
+            zone_id=quote.zone_id,
+            price_per_minute=quote.price_per_minute,
+            price_unlock=quote.price_unlock,
+            deposit=quote.deposit,
         )
         return offer
 
-    async def get_valid_offer(self, session: AsyncSession, offer_id: int, user_id: int):
+    async def _quotable_scooters(self, scooter_ids: list[int]) -> tuple[list[dict], list[int]]:
+        results = await asyncio.gather(
+            *(self._get_scooter(scooter_id) for scooter_id in scooter_ids), return_exceptions=True
+        )
+        scooters, unavailable = [], []
+        for scooter_id, result in zip(scooter_ids, results):
+            if isinstance(result, (exceptions.ScooterUnavailable, ExternalServiceUnavailable)):
+                unavailable.append(scooter_id)
+            elif isinstance(result, BaseException):
+                raise result
+            else:
+                scooters.append(result)
+        return scooters, unavailable
+
+    async def quote(self, req: OfferQuoteRequest) -> tuple[list[PriceQuote], list[int]]:
+        """Prices every requested scooter for one user without creating offers.
+
+        Scooters that are unavailable or unknown are returned separately
+        instead of failing the whole quote.
+        """
+        scooter_ids = list(dict.fromkeys(req.scooter_ids))
+        deadline = settings.offer_fetch_deadline_seconds
+        deadline_at = self._deadline_at()
+        fields = {"user_id": req.user_id, "scooters": len(scooter_ids)}
+        try:
+            async with asyncio.timeout_at(deadline_at), asyncio.TaskGroup() as group:
+                scooters_task = group.create_task(
+                    self._within(
+                        settings.offer_scooter_deadline_seconds, self._quotable_scooters(scooter_ids), deadline_at
+                    )
+                )
+                user_task = group.create_task(
+                    self._within(deadline, self.user_client.get_user(req.user_id), deadline_at)
+                )
+                config_task = group.create_task(
+                    self._within(deadline, self.config_client.get_price_coeff_settings(), deadline_at)
+                )
+        except TimeoutError as error:
+            raise self._upstream_error(error, "offer.quote.deadline_exceeded", **fields)
+        except BaseExceptionGroup as group_error:
+            raise self._upstream_error(group_error.exceptions[0], "offer.quote.deadline_exceeded", **fields)
+
+        scooters, unavailable = scooters_task.result()
+        try:
+            zones = await self._within(
+                deadline, self.zone_client.get_zones(list({scooter["zone_id"] for scooter in scooters})), deadline_at
+            )
+        except TimeoutError as error:
+            raise self._upstream_error(error, "offer.quote.deadline_exceeded", **fields)
+
+        quotes = self.pricing.price_many(scooters, zones, user_task.result(), config_task.result())
+        return quotes, unavailable
+
+    async def nearby(self, user_id: int, lat: float, lon: float, k: int) -> list[tuple[PriceQuote, float]]:
+        """Quotes for the ``k`` nearest available scooters, paired with their distance in metres."""
+        if self.spatial is None:
+            raise exceptions.NearbySearchUnavailable()
+        distances = dict(self.spatial.nearest(lat, lon, k))
+        if not distances:
+            return []
+        quotes, _ = await self.quote(OfferQuoteRequest(user_id=user_id, scooter_ids=list(distances)))
+        return [(quote, distances[quote.scooter_id]) for quote in quotes]
+
+    async def get_valid_offer(self, session: AsyncSession, offer_id: int | str, user_id: int):
         offer = await self.offer_repo.get(session, offer_id)
         if offer is None or offer.user_id != user_id:
             raise exceptions.OfferNotFound()
@@ -78,6 +218,6 @@ class OfferService:
             raise exceptions.OfferExpired()
         return offer
 
-    async def consume_offer(self, session: AsyncSession, offer_id: int):
+    async def consume_offer(self, session: AsyncSession, offer_id: int | str):
         await self.offer_repo.remove(session, offer_id)
 
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import asyncio
+from collections import defaultdict
+from typing import Any
+
+from order_offer_service.app.core import exceptions
+from order_offer_service.app.core.events import OrderEventBus
+from order_offer_service.app.core.metrics import metrics
+from order_offer_service.app.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class OrderStream:
+    def __init__(self, order_id: int) -> None:
+        self.order_id = order_id
+        self.stopped = asyncio.Event()
+        self.final_price: int | None = None
+
+
+class OrderStreamHub:
+    """Tracks this worker's open order streams and wakes them when an order stops."""
+
+    def __init__(self, events: OrderEventBus, max_streams: int) -> None:
+        self.max_streams = max_streams
+        self._streams: dict[int, set[OrderStream]] = defaultdict(set)
+        self._open = 0
+        events.add_listener(self._on_event)
+
+    @property
+    def open_streams(self) -> int:
+        return self._open
+
+    def open(self, order_id: int) -> OrderStream:
+        if self._open >= self.max_streams:
+            metrics.inc("orders.stream.rejected")
+            raise exceptions.TooManyStreams()
+        self._open += 1
+        metrics.set("orders.stream.open", self._open)
+        stream = OrderStream(order_id)
+        self._streams[order_id].add(stream)
+        return stream
+
+    def close(self, stream: OrderStream) -> None:
+        streams = self._streams.get(stream.order_id)
+        if streams is None or stream not in streams:
+            return
+        streams.discard(stream)
+        if not streams:
+            del self._streams[stream.order_id]
+        self._open -= 1
+        metrics.set("orders.stream.open", self._open)
+
+    def _on_event(self, event: dict[str, Any]) -> None:
+        if event.get("event") != "stopped":
+            return
+        for stream in self._streams.get(event.get("order_id"), ()):
+            stream.final_price = event.get("total_price")
+            stream.stopped.set()
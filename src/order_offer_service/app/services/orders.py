@@ -1,14 +1,25 @@
 from __future__ import annotations
 
+import asyncio
+import time
+from collections.abc import AsyncIterator
 from datetime import datetime, timezone
 
+import orjson
+
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from order_offer_service.app.cache.orders import ActiveOrderCache
 from order_offer_service.app.config import get_settings
-from order_offer_service.app.core import exceptions
-from order_offer_service.app.core.s3 import s3_storage
+from order_offer_service.app.core import db, exceptions
+from order_offer_service.app.core.db import read_router
+from order_offer_service.app.core.events import order_events
+from order_offer_service.app.core.metrics import metrics
+from order_offer_service.app.core.archive import order_archiver
 from order_offer_service.app.logging_config import get_logger
-from order_offer_service.app.repositories import OrderRepository
+from order_offer_service.app.repositories import OrderRepository, OutboxRepository
+from order_offer_service.app.services.order_streams import OrderStream, OrderStreamHub
+from order_offer_service.app.services.saga import Saga, SagaStep
 from order_offer_service.app.services.integrations import PaymentClient
 from order_offer_service.app.schemas.orders import OrderStartRequest, OrderStopRequest
 
@@ -23,38 +34,104 @@ class OrderService:
         offer_service,
         payment_client: PaymentClient,
         scooter_client,
+        order_cache: ActiveOrderCache | None = None,
+        stream_hub: OrderStreamHub | None = None,
+        outbox_repo: OutboxRepository | None = None,
+        single_statement_start: bool = False,
+        session_factory=None,
     ) -> None:
         self.order_repo = order_repo
         self.offer_service = offer_service
         self.payment_client = payment_client
         self.scooter_client = scooter_client
+        self.order_cache = order_cache
+        self.stream_hub = stream_hub
+        self.outbox_repo = outbox_repo
+        self.single_statement_start = single_statement_start
+        self._session_factory = session_factory
+
+    @staticmethod
+    def total_price(order, time_end: datetime | None = None) -> int:
+        time_end = time_end or order.time_finish or datetime.now(timezone.utc)
+        order_duration = int((time_end - order.time_start).total_seconds())
+        if order_duration < settings.order_minimal_duration_seconds:
+            return 0
+        return (order_duration * order.price_per_minute) // 60 + order.price_unlock
 
     async def start_order(self, session: AsyncSession, req: OrderStartRequest):
         user_id = req.user_id
         offer_id = req.offer_id
 
-        existing = await self.order_repo.get_active_by_user(session, user_id)
-        if existing:
-            return existing
-
-        offer = await self.offer_service.get_valid_offer(session, offer_id, user_id)
+        saga = Saga("order_start")
+        order = None
+        if self.single_statement_start and isinstance(offer_id, int):
+            # One statement consumes the offer and inserts the order; it yields nothing if the
+            # offer is gone, expired or foreign, or the user already rides, and the regular
+            # path below then produces the matching response.
+            order = await saga.run(
+                SagaStep(
+                    "consume_and_insert",
+                    lambda: self.order_repo.create_from_offer(session, offer_id=offer_id, user_id=user_id),
+                )
+            )
 
-        await self.scooter_client.lock_scooter(offer.scooter_id)
+        if order is None:
+            existing = await self.order_repo.get_active_by_user(session, user_id)
+            if existing:
+                return existing
 
-        order = await self.order_repo.create(
-            session,
-            user_id=user_id,
-            scooter_id=offer.scooter_id,
-            price_per_minute=offer.price_per_minute,
-            price_unlock=offer.price_unlock,
-            deposit=offer.deposit,
-            ttl=offer.ttl,
-        )
-        await session.flush()
+            offer = await saga.run(
+                SagaStep("validate_offer", lambda: self.offer_service.get_valid_offer(session, offer_id, user_id))
+            )
+            # The id is reserved up front so the payment hold can run alongside the scooter lock.
+            order_id = await saga.run(SagaStep("allocate_id", lambda: self.order_repo.allocate_id(session)))
+        else:
+            offer, order_id = order, order.order_id
 
-        await self.payment_client.hold_money(user_id, order.order_id, offer.deposit)
-
-        await session.commit()
+        try:
+            await saga.run_concurrently(
+                SagaStep(
+                    "lock_scooter",
+                    lambda: self.scooter_client.lock_scooter(offer.scooter_id),
+                    lambda: self.scooter_client.unlock_scooter(offer.scooter_id),
+                ),
+                SagaStep(
+                    "hold_money",
+                    lambda: self.payment_client.hold_money(user_id, order_id, offer.deposit),
+                    # clearing with a zero amount returns the whole hold
+                    lambda: self.payment_client.clear_money(user_id, order_id, 0),
+                ),
+            )
+            if order is None:
+                # Consumed only once the lock and hold are in place: in the redis and signed
+                # modes this cannot be rolled back, so a failed start must not burn the offer.
+                await saga.run(SagaStep("consume_offer", lambda: self.offer_service.consume_offer(session, offer_id)))
+                order = await saga.run(
+                    SagaStep(
+                        "insert_order",
+                        lambda: self.order_repo.create(
+                            session,
+                            order_id=order_id,
+                            user_id=user_id,
+                            scooter_id=offer.scooter_id,
+                            price_per_minute=offer.price_per_minute,
+                            price_unlock=offer.price_unlock,
+                            deposit=offer.deposit,
+                            ttl=offer.ttl,
+                        ),
+                    )
+                )
+            await saga.run(SagaStep("commit", session.commit))
+        except Exception as error:
+            logger.warning(
+                "order.start.failed", user_id=user_id, order_id=order_id, error=str(error), timings=saga.timings
+            )
+            await session.rollback()
+            await saga.compensate()
+            raise
+        await read_router.note_write(user_id)
+        if self.order_cache is not None:
+            await self.order_cache.put(order)
 
         logger.info(
             "order.created",
@@ -66,6 +143,7 @@ class OrderService:
             price_unlock=order.price_unlock,
             deposit=order.deposit,
             ttl=order.ttl,
+            timings=saga.timings,
         )
 
         return order
@@ -77,16 +155,77 @@ class OrderService:
         return order
 
     async def describe_order(self, session: AsyncSession, order_id: int, user_id: int):
-        order = await self.get_order(session, order_id, user_id)
-        
-        time_end = order.time_finish if order.time_finish else datetime.now(timezone.utc)
-        order_duration = int((time_end - order.time_start).total_seconds())
-        
-        total_price = 0
-        if order_duration >= settings.order_minimal_duration_seconds:
-            total_price = (order_duration * order.price_per_minute) // 60 + order.price_unlock
-        
-        return order, total_price
+        order = None
+        if self.order_cache is not None:
+            order = await self.order_cache.get(order_id)
+        if order is None:
+            order = await self.get_order(session, order_id, user_id)
+            if self.order_cache is not None and order.time_finish is None:
+                await self.order_cache.put(order, if_absent=True)
+        elif order.user_id != user_id:
+            raise exceptions.OrderNotFound()
+
+        return order, self.total_price(order)
+
+    def open_stream(self, order) -> OrderStream:
+        if self.stream_hub is None:
+            raise exceptions.TooManyStreams()
+        return self.stream_hub.open(order.order_id)
+
+    def close_stream(self, stream: OrderStream) -> None:
+        if self.stream_hub is not None:
+            self.stream_hub.close(stream)
+
+    async def _recheck_stopped(self, order, stream: OrderStream) -> None:
+        """Reads the order from the primary in case its "stopped" event never reached this worker."""
+        try:
+            async with (self._session_factory or db.async_session_factory)() as session:
+                current = await self.order_repo.get(session, order.order_id)
+        except Exception as error:
+            logger.warning("order.stream.recheck_failed", order_id=order.order_id, error=str(error))
+            return
+        if current is None or current.time_finish is not None:
+            # stopped orders are deleted; without the row the price up to now is the best estimate
+            metrics.inc("orders.stream.missed_stop")
+            stream.final_price = self.total_price(current or order)
+            stream.stopped.set()
+
+    async def stream_prices(self, order, stream: OrderStream) -> AsyncIterator[str]:
+        """Server-sent events with the trip price: sent on change, a heartbeat comment otherwise."""
+        last_price = None
+        last_sent = 0.0
+        last_checked = time.monotonic()
+        if order.time_finish is not None:
+            stream.final_price = self.total_price(order)
+            stream.stopped.set()
+        try:
+            while True:
+                recheck_due = time.monotonic() - last_checked >= settings.order_stream_recheck_seconds
+                if recheck_due and not stream.stopped.is_set():
+                    await self._recheck_stopped(order, stream)
+                    last_checked = time.monotonic()
+                if stream.stopped.is_set():
+                    final_price = stream.final_price if stream.final_price is not None else self.total_price(order)
+                    payload = orjson.dumps({"order_id": order.order_id, "total_price": final_price}).decode()
+                    yield f"event: stopped\ndata: {payload}\n\n"
+                    return
+
+                price = self.total_price(order)
+                now = time.monotonic()
+                if price != last_price:
+                    payload = orjson.dumps({"order_id": order.order_id, "total_price": price}).decode()
+                    yield f"event: price\ndata: {payload}\n\n"
+                    last_price, last_sent = price, now
+                elif now - last_sent >= settings.order_stream_heartbeat_seconds:
+                    yield ": heartbeat\n\n"
+                    last_sent = now
+
+                try:
+                    await asyncio.wait_for(stream.stopped.wait(), settings.order_stream_interval_seconds)
+                except TimeoutError:
+                    pass
+        finally:
+            self.close_stream(stream)
 
     async def stop_order(self, session: AsyncSession, req: OrderStopRequest):
         order_id = req.order_id
@@ -95,21 +234,65 @@ class OrderService:
         if order is None or order.user_id != user_id:
             raise exceptions.OrderNotFound()
 
+        if self.outbox_repo is not None:
+            total_amount, archive_key = await self._stop_via_outbox(session, order)
+            await self._after_stop(order, total_amount)
+            return total_amount, archive_key
+
         if order.time_finish is None:
             order = await self.order_repo.finish(session, order_id)
 
-        total_amount = 0
-        order_duration = int((order.time_finish - order.time_start).total_seconds())
-        if order_duration >= settings.order_minimal_duration_seconds:
-            total_amount = (order_duration * order.price_per_minute) // 60 + order.price_unlock
+        total_amount = self.total_price(order)
 
         await self.payment_client.clear_money(user_id, order_id, total_amount)
         await self.scooter_client.unlock_scooter(order.scooter_id)
 
         order_data = order.to_dict()
         order_data["total_amount"] = total_amount
-        archive_key = await s3_storage.store_order(order_data, order.ttl)
+        archive_key = await order_archiver.store_order(order_data, order.ttl)
 
         await self.order_repo.delete(session, order_id)
         await session.commit()
+        await self._after_stop(order, total_amount)
         return total_amount, archive_key
+
+    async def _stop_via_outbox(self, session: AsyncSession, order) -> tuple[int, str]:
+        """Finishes the order and queues its side effects in one transaction."""
+        time_finish = order.time_finish or datetime.now(timezone.utc)
+        total_amount = self.total_price(order, time_finish)
+        order_data = orjson.loads(
+            orjson.dumps({**order.to_dict(), "time_finish": time_finish, "total_amount": total_amount})
+        )
+        archive_key = order_archiver.archive_key(order_data, order.ttl)
+
+        await self.outbox_repo.add(
+            session,
+            order.order_id,
+            "clear_money",
+            {"user_id": order.user_id, "order_id": order.order_id, "amount": total_amount},
+        )
+        await self.outbox_repo.add(session, order.order_id, "unlock_scooter", {"scooter_id": order.scooter_id})
+        await self.outbox_repo.add(session, order.order_id, "archive", {"order": order_data, "ttl": order.ttl})
+        await self.order_repo.delete(session, order.order_id)
+        await session.commit()
+        return total_amount, archive_key
+
+    async def _after_stop(self, order, total_amount: int) -> None:
+        await read_router.note_write(order.user_id)
+        if self.order_cache is not None:
+            await self.order_cache.retire(order.order_id)
+        await order_events.publish("stopped", order.order_id, total_price=total_amount)
+
+    def outbox_handlers(self) -> dict:
+        """Side effects of ``stop_order`` keyed by outbox action; each is safe to repeat."""
+
+        async def clear_money(payload: dict) -> None:
+            await self.payment_client.clear_money(payload["user_id"], payload["order_id"], payload["amount"])
+
+        async def unlock_scooter(payload: dict) -> None:
+            await self.scooter_client.unlock_scooter(payload["scooter_id"])
+
+        async def archive(payload: dict) -> None:
+            await order_archiver.store_order(payload["order"], payload["ttl"])
+
+        return {"clear_money": clear_money, "unlock_scooter": unlock_scooter, "archive": archive}
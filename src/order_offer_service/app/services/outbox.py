@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import asyncio
+import random
+from collections.abc import Awaitable, Callable
+from datetime import datetime, timezone
+from typing import Any
+
+from order_offer_service.app.core import db
+from order_offer_service.app.core.metrics import metrics
+from order_offer_service.app.logging_config import get_logger
+from order_offer_service.app.repositories import OutboxRepository
+
+logger = get_logger(__name__)
+
+OutboxHandler = Callable[[dict[str, Any]], Awaitable[Any]]
+
+
+class OutboxDispatcher:
+    """Drains the order outbox with a pool of workers.
+
+    Each worker leases a batch in a short transaction (``FOR UPDATE SKIP
+    LOCKED`` plus a ``locked_until`` deadline), runs the handler registered
+    for every entry's action with no transaction open, then deletes the
+    successes and reschedules the failures, with jittered exponential
+    backoff, in a second short transaction. Handlers must be idempotent: an
+    entry runs again if its lease expires or the final commit is lost.
+    """
+
+    def __init__(
+        self,
+        repo: OutboxRepository,
+        handlers: dict[str, OutboxHandler],
+        workers: int = 4,
+        batch_size: int = 20,
+        poll_interval: float = 0.5,
+        max_backoff: float = 300,
+        lease_seconds: float = 60,
+        session_factory=None,
+    ) -> None:
+        self.repo = repo
+        self.handlers = handlers
+        self.workers = workers
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.max_backoff = max_backoff
+        self.lease_seconds = lease_seconds
+        self._session_factory = session_factory
+        self._tasks: list[asyncio.Task] = []
+
+    def _session(self):
+        return (self._session_factory or db.async_session_factory)()
+
+    def _backoff(self, attempts: int) -> float:
+        return random.uniform(0, min(self.max_backoff, 2 ** attempts))
+
+    async def drain_once(self) -> int:
+        """Processes one batch and returns how many entries were claimed."""
+        async with self._session() as session:
+            entries = await self.repo.claim(session, self.batch_size, self.lease_seconds)
+            await session.commit()
+        if not entries:
+            return 0
+
+        # no transaction is open here: slow upstreams must not pin row locks or a connection
+        errors: list[Exception | None] = []
+        for entry in entries:
+            handler = self.handlers.get(entry.action)
+            try:
+                if handler is None:
+                    raise LookupError(f"no outbox handler for {entry.action!r}")
+                await handler(entry.payload)
+            except Exception as error:
+                errors.append(error)
+            else:
+                errors.append(None)
+
+        async with self._session() as session:
+            for entry, error in zip(entries, errors):
+                if error is not None:
+                    metrics.inc(f"outbox.{entry.action}.failed")
+                    logger.warning(
+                        "outbox.entry.failed",
+                        entry_id=entry.entry_id,
+                        order_id=entry.order_id,
+                        action=entry.action,
+                        attempts=entry.attempts + 1,
+                        error=str(error),
+                    )
+                    await self.repo.reschedule(session, entry, str(error), self._backoff(entry.attempts + 1))
+                    continue
+                await self.repo.complete(session, entry)
+                metrics.inc(f"outbox.{entry.action}.done")
+                metrics.observe(
+                    "outbox.delivery_lag_seconds",
+                    (datetime.now(timezone.utc) - entry.created_at).total_seconds(),
+                )
+            await session.commit()
+        return len(entries)
+
+    async def report(self) -> None:
+        async with self._session() as session:
+            depth, oldest = await self.repo.stats(session)
+        lag = (datetime.now(timezone.utc) - oldest).total_seconds() if oldest is not None else 0.0
+        metrics.set("outbox.depth", depth)
+        metrics.set("outbox.lag_seconds", lag)
+
+    async def _work(self, index: int) -> None:
+        while True:
+            try:
+                claimed = await self.drain_once()
+                if index == 0:
+                    await self.report()
+            except asyncio.CancelledError:
+                raise
+            except Exception as error:
+                logger.warning("outbox.worker.failed", worker=index, error=str(error))
+                claimed = 0
+            if claimed < self.batch_size:
+                await asyncio.sleep(self.poll_interval)
+
+    def start(self) -> None:
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._work(index)) for index in range(self.workers)]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
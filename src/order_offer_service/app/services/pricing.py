@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+
+from order_offer_service.app.core.metrics import metrics
+from order_offer_service.app.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_PRICE_MULTIPLIER = 15
+DEFAULT_PRICE_UNLOCK = 50
+DEFAULT_DEPOSIT = 1000
+DEFAULT_OFFER_TTL_SECONDS = 300
+
+
+@dataclass(slots=True)
+class PriceQuote:
+    scooter_id: int
+    zone_id: str
+    price_per_minute: int
+    price_unlock: int
+    deposit: int
+    ttl: int
+
+
+class PricingEngine:
+    """Offer pricing: zone multiplier, surge, low-charge discount, subscription and trust waivers.
+
+    ``price_one`` is the scalar rule set; ``price_many`` prices any number of
+    scooters for one user in a single NumPy pass and yields exactly the same
+    integers, since both truncate the same float64 products.
+    """
+
+    def __init__(self, low_charge_threshold: int) -> None:
+        self.low_charge_threshold = low_charge_threshold
+
+    def price_one(
+        self, scooter: dict[str, Any], zone: dict[str, Any], user: dict[str, Any], coeff: dict[str, Any] | None
+    ) -> PriceQuote:
+        price_per_minute = zone.get("price_multiplier", DEFAULT_PRICE_MULTIPLIER)
+        if coeff:
+            surge = coeff.get("surge", 1.0)
+            price_per_minute = int(price_per_minute * float(surge))
+            if scooter.get("charge", 100) < self.low_charge_threshold:
+                low_charge_discount = coeff.get("low_charge_discount", 1.0)
+                price_per_minute = int(price_per_minute * float(low_charge_discount))
+
+        return PriceQuote(
+            scooter_id=scooter["scooter_id"],
+            zone_id=scooter["zone_id"],
+            price_per_minute=price_per_minute,
+            price_unlock=0 if user.get("has_subscribtion", False) else zone.get("price_unlock", DEFAULT_PRICE_UNLOCK),
+            deposit=0 if user.get("trusted", False) else zone.get("default_deposit", DEFAULT_DEPOSIT),
+            ttl=zone.get("offer_ttl_seconds", DEFAULT_OFFER_TTL_SECONDS),
+        )
+
+    def price_many(
+        self,
+        scooters: list[dict[str, Any]],
+        zones: dict[str, dict[str, Any]],
+        user: dict[str, Any],
+        coeff: dict[str, Any] | None,
+    ) -> list[PriceQuote]:
+        if not scooters:
+            return []
+        # Per-zone terms are gathered once and fanned out to scooters by index.
+        zone_ids = list(dict.fromkeys(scooter["zone_id"] for scooter in scooters))
+        zone_index = {zone_id: index for index, zone_id in enumerate(zone_ids)}
+        index = np.fromiter((zone_index[s["zone_id"]] for s in scooters), dtype=np.intp, count=len(scooters))
+
+        def zone_terms(field: str, default: int, dtype: Any = np.int64) -> np.ndarray:
+            return np.array([zones[zone_id].get(field, default) for zone_id in zone_ids], dtype=dtype)[index]
+
+        # Kept as given, e.g. 12.5: price_one only truncates once surge has been applied.
+        multiplier = zone_terms("price_multiplier", DEFAULT_PRICE_MULTIPLIER, dtype=object)
+        if coeff:
+            price = np.trunc(multiplier.astype(np.float64) * float(coeff.get("surge", 1.0)))
+            charge = np.fromiter((s.get("charge", 100) for s in scooters), dtype=np.float64, count=len(scooters))
+            low_charge = charge < self.low_charge_threshold
+            if low_charge.any():
+                discounted = np.trunc(price * float(coeff.get("low_charge_discount", 1.0)))
+                price = np.where(low_charge, discounted, price)
+            price_per_minute = price.astype(np.int64)
+        else:
+            price_per_minute = multiplier
+
+        if user.get("has_subscribtion", False):
+            price_unlock = np.zeros(len(scooters), dtype=np.int64)
+        else:
+            price_unlock = zone_terms("price_unlock", DEFAULT_PRICE_UNLOCK)
+        if user.get("trusted", False):
+            deposit = np.zeros(len(scooters), dtype=np.int64)
+        else:
+            deposit = zone_terms("default_deposit", DEFAULT_DEPOSIT)
+        ttl = zone_terms("offer_ttl_seconds", DEFAULT_OFFER_TTL_SECONDS)
+
+        return [
+            PriceQuote(scooter["scooter_id"], scooter["zone_id"], *terms)
+            for scooter, terms in zip(
+                scooters, zip(price_per_minute.tolist(), price_unlock.tolist(), deposit.tolist(), ttl.tolist())
+            )
+        ]
+
+
+_UNSET: Any = object()
+
+# (zone_id, low charge, has subscription, trusted)
+PriceKey = tuple[str, bool, bool, bool]
+
+
+class PriceTable:
+    """Precomputed offer prices for every zone, charge bucket and user class.
+
+    The table is rebuilt from the zone and config caches' update hooks and
+    swapped in whole, so readers always see one consistent version. Each
+    entry remembers the zone dict it was priced from; ``lookup`` only answers
+    when the request's zone and config are the very objects the table was
+    built from and returns None otherwise, leaving the caller to price the
+    offer itself.
+    """
+
+    def __init__(self, engine: PricingEngine) -> None:
+        self.engine = engine
+        self.version = 0
+        self.rebuilds = 0
+        self._coeff: Any = _UNSET
+        self._zones: dict[str, dict[str, Any]] = {}
+        self._entries: dict[PriceKey, tuple[dict[str, Any], tuple[int, int, int, int]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _price_zone(self, zone_id: str, zone: dict[str, Any]) -> dict[PriceKey, tuple]:
+        threshold = self.engine.low_charge_threshold
+        entries = {}
+        for low_charge in (False, True):
+            scooter = {"scooter_id": 0, "zone_id": zone_id, "charge": threshold - 1 if low_charge else threshold}
+            for subscribed in (False, True):
+                for trusted in (False, True):
+                    user = {"has_subscribtion": subscribed, "trusted": trusted}
+                    quote = self.engine.price_one(scooter, zone, user, self._coeff)
+                    entries[(zone_id, low_charge, subscribed, trusted)] = (
+                        zone,
+                        (quote.price_per_minute, quote.price_unlock, quote.deposit, quote.ttl),
+                    )
+        return entries
+
+    def _swap(self, entries: dict[PriceKey, tuple], reason: str) -> None:
+        self._entries = entries
+        self.version += 1
+        self.rebuilds += 1
+        metrics.inc("pricing.table.rebuilds")
+        metrics.set("pricing.table.version", self.version)
+        metrics.set("pricing.table.entries", len(entries))
+        logger.info("pricing.table.rebuilt", reason=reason, version=self.version, entries=len(entries))
+
+    def on_config_update(self, key: str, coeff: Any) -> None:
+        self._coeff = coeff
+        entries: dict[PriceKey, tuple] = {}
+        for zone_id, zone in self._zones.items():
+            entries.update(self._price_zone(zone_id, zone))
+        self._swap(entries, "config")
+
+    def on_zone_update(self, key: str, zone: Any) -> None:
+        zone_id = key.removeprefix("zones:")
+        self._zones[zone_id] = zone
+        if self._coeff is _UNSET:
+            return
+        entries = {entry_key: entry for entry_key, entry in self._entries.items() if entry_key[0] != zone_id}
+        entries.update(self._price_zone(zone_id, zone))
+        self._swap(entries, "zone")
+
+    def lookup(
+        self, scooter: dict[str, Any], zone: dict[str, Any], user: dict[str, Any], coeff: dict[str, Any] | None
+    ) -> PriceQuote | None:
+        entry = None
+        if coeff is self._coeff:
+            entry = self._entries.get(
+                (
+                    scooter["zone_id"],
+                    scooter.get("charge", 100) < self.engine.low_charge_threshold,
+                    bool(user.get("has_subscribtion", False)),
+                    bool(user.get("trusted", False)),
+                )
+            )
+        if entry is None or entry[0] is not zone:
+            metrics.inc("pricing.table.misses")
+            return None
+        metrics.inc("pricing.table.hits")
+        return PriceQuote(scooter["scooter_id"], scooter["zone_id"], *entry[1])
+
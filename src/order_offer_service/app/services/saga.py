@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from order_offer_service.app.core.metrics import metrics
+from order_offer_service.app.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+Action = Callable[[], Awaitable[Any]]
+
+
+class SagaStep:
+    def __init__(self, name: str, action: Action, compensation: Action | None = None) -> None:
+        self.name = name
+        self.action = action
+        self.compensation = compensation
+
+
+class Saga:
+    """Runs timed steps and undoes the completed ones, newest first, when a later step fails."""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.timings: dict[str, float] = {}
+        self._completed: list[SagaStep] = []
+
+    async def _timed(self, step: SagaStep) -> Any:
+        started = time.perf_counter()
+        try:
+            return await step.action()
+        finally:
+            elapsed = time.perf_counter() - started
+            self.timings[step.name] = elapsed
+            metrics.observe(f"saga.{self.name}.{step.name}.seconds", elapsed)
+
+    async def run(self, step: SagaStep) -> Any:
+        result = await self._timed(step)
+        self._completed.append(step)
+        return result
+
+    async def run_concurrently(self, *steps: SagaStep) -> list[Any]:
+        """Runs independent steps together.
+
+        Every step is allowed to finish, so the ones that did succeed are known
+        and can be compensated; the first failure is then re-raised.
+        """
+        results = await asyncio.gather(*(self._timed(step) for step in steps), return_exceptions=True)
+        failure = None
+        for step, result in zip(steps, results):
+            if isinstance(result, BaseException):
+                failure = failure or result
+            else:
+                self._completed.append(step)
+        if failure is not None:
+            raise failure
+        return results
+
+    async def compensate(self) -> None:
+        metrics.inc(f"saga.{self.name}.compensated")
+        while self._completed:
+            step = self._completed.pop()
+            if step.compensation is None:
+                continue
+            try:
+                await step.compensation()
+            except Exception as error:
+                metrics.inc(f"saga.{self.name}.compensation_failed")
+                logger.error("saga.compensation.failed", saga=self.name, step=step.name, error=str(error))
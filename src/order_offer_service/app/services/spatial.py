@@ -0,0 +1,275 @@
+from __future__ import annotations
+
+import math
+from collections.abc import Callable, Iterator
+from typing import Any
+
+import numpy as np
+
+from order_offer_service.app.core.metrics import metrics
+
+METERS_PER_DEGREE = 111_320.0
+NOT_INDEXED = -1
+
+
+class SpatialIndex:
+    """Uniform lat/lon grid over available scooters for k-nearest lookups.
+
+    Coordinates live in arrays indexed by scooter id and each grid cell keeps
+    the set of scooter ids inside it, so an update only moves one id between
+    two sets. ``nearest`` scans rings of cells around the query point until
+    the k-th candidate is closer than anything an outer ring could hold.
+    Distances are equirectangular, which is accurate to well under a metre at
+    city scale.
+
+    Cells are grouped into blocks of ``block_cells`` x ``block_cells`` and
+    each block keeps the set of scooter ids inside it too, plus an array copy
+    of it made on first read after a change. Past one block of fine rings,
+    or straight away if the query's own block is empty, the scan goes on
+    ring by ring of blocks, nearest block first, and skips any block farther
+    than the k-th best distance found so far. A sparse or empty area so costs
+    a few block lookups and array reads instead of one lookup per cell.
+    """
+
+    def __init__(
+        self,
+        cell_degrees: float,
+        max_radius_meters: float,
+        max_scooter_id: int,
+        capacity: int = 1024,
+        block_cells: int = 16,
+    ):
+        self.cell_degrees = cell_degrees
+        self.max_radius_meters = max_radius_meters
+        self.max_scooter_id = max_scooter_id
+        self.columns = math.ceil(360 / cell_degrees)
+        self.block_cells = block_cells
+        self.block_columns = math.ceil(self.columns / block_cells)
+        self.lat = np.zeros(capacity, dtype=np.float64)
+        self.lon = np.zeros(capacity, dtype=np.float64)
+        self.cell = np.full(capacity, NOT_INDEXED, dtype=np.int64)
+        self.cells: dict[int, set[int]] = {}
+        self.blocks: dict[int, set[int]] = {}
+        self._block_ids: dict[int, np.ndarray] = {}
+        self.size = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def _cell_of(self, lat: float, lon: float) -> tuple[int, int]:
+        return int((lat + 90) // self.cell_degrees), int((lon + 180) // self.cell_degrees)
+
+    def _block_of(self, cell: int) -> int:
+        row, column = divmod(cell, self.columns)
+        return (row // self.block_cells) * self.block_columns + column // self.block_cells
+
+    def _reserve(self, highest_id: int) -> None:
+        if highest_id < len(self.cell):
+            return
+        capacity = len(self.cell)
+        while capacity <= highest_id:
+            capacity *= 2
+        capacity = min(capacity, self.max_scooter_id + 1)
+        self.lat = np.resize(self.lat, capacity)
+        self.lon = np.resize(self.lon, capacity)
+        grown = np.full(capacity, NOT_INDEXED, dtype=np.int64)
+        grown[: len(self.cell)] = self.cell
+        self.cell = grown
+
+    def _drop(self, scooter_id: int) -> None:
+        cell = int(self.cell[scooter_id])
+        if cell == NOT_INDEXED:
+            return
+        block = self._block_of(cell)
+        self._block_ids.pop(block, None)
+        for index, key in ((self.cells, cell), (self.blocks, block)):
+            members = index[key]
+            members.discard(scooter_id)
+            if not members:
+                del index[key]
+        self.cell[scooter_id] = NOT_INDEXED
+        self.size -= 1
+
+    def upsert(self, scooters: list[dict[str, Any]]) -> None:
+        """Places available scooters that have coordinates; any other scooter is taken out of the index."""
+        scooters = [scooter for scooter in scooters if 0 <= scooter["scooter_id"] <= self.max_scooter_id]
+        if not scooters:
+            return
+        self._reserve(max(scooter["scooter_id"] for scooter in scooters))
+        for scooter in scooters:
+            scooter_id = scooter["scooter_id"]
+            lat, lon = scooter.get("lat"), scooter.get("lon")
+            if lat is None or lon is None or not scooter.get("available", True):
+                self._drop(scooter_id)
+                continue
+            row, column = self._cell_of(lat, lon)
+            cell = row * self.columns + column
+            if self.cell[scooter_id] != cell:
+                self._drop(scooter_id)
+                block = self._block_of(cell)
+                self.cells.setdefault(cell, set()).add(scooter_id)
+                self.blocks.setdefault(block, set()).add(scooter_id)
+                self._block_ids.pop(block, None)
+                self.cell[scooter_id] = cell
+                self.size += 1
+            self.lat[scooter_id] = lat
+            self.lon[scooter_id] = lon
+
+    def remove(self, scooter_ids: list[int]) -> None:
+        for scooter_id in scooter_ids:
+            if 0 <= scooter_id < len(self.cell):
+                self._drop(scooter_id)
+
+    @staticmethod
+    def _ring(row: int, column: int, radius: int, columns: int) -> list[int]:
+        """Cells, or blocks, exactly ``radius`` steps away on a grid ``columns`` wide that wraps around."""
+        if radius == 0:
+            return [row * columns + column]
+        cells = []
+        for r in range(row - radius, row + radius + 1):
+            step = 1 if r in (row - radius, row + radius) else 2 * radius
+            for c in range(column - radius, column + radius + 1, step):
+                cells.append(r * columns + c % columns)
+        return cells
+
+    @staticmethod
+    def _block_ring(block_row: int, block_column: int, radius: int) -> list[tuple[int, int]]:
+        """(row, column) of the blocks ``radius`` away; columns are not wrapped, so they stay comparable."""
+        blocks = []
+        for r in range(block_row - radius, block_row + radius + 1):
+            step = 1 if r in (block_row - radius, block_row + radius) else 2 * radius
+            blocks.extend((r, c) for c in range(block_column - radius, block_column + radius + 1, step))
+        return blocks
+
+    def _block_array(self, block: int) -> np.ndarray:
+        ids = self._block_ids.get(block)
+        if ids is None:
+            members = self.blocks[block]
+            ids = self._block_ids[block] = np.fromiter(members, dtype=np.int64, count=len(members))
+        return ids
+
+    def _block_meters(self, block_row: int, block_column: int, lat: float, lon: float, lon_scale: float) -> float:
+        """Lower bound of the distance from (lat, lon) to anything inside the block."""
+        span = self.block_cells * self.cell_degrees
+        south, west = block_row * span - 90, block_column * span - 180
+        dy = max(south - lat, 0.0, lat - south - span) * METERS_PER_DEGREE
+        dx = max(west - lon, 0.0, lon - west - span) * METERS_PER_DEGREE * lon_scale
+        return math.hypot(dx, dy)
+
+    def _scan(
+        self, lat: float, lon: float, lon_scale: float, max_rings: int, bound: Callable[[], float]
+    ) -> Iterator[tuple[list[int] | np.ndarray, int]]:
+        """Yields further scooters with how many whole rings of cells around the query are covered so far.
+
+        Fine rings come one at a time; past them each ring of blocks comes one
+        block at a time, nearest first, and stops at the first block that is
+        farther than ``bound()``, the current k-th best distance.
+        """
+        row, column = self._cell_of(lat, lon)
+        size = self.block_cells
+        block_row, block_column = row // size, column // size
+        # rings of cells a block ring covers beyond whole blocks, from where the query sits in its block
+        margin = min(row % size, size - 1 - row % size, column % size, size - 1 - column % size)
+        if block_row * self.block_columns + block_column in self.blocks:
+            # fine rings out to one block's width: dense areas are done within them
+            fine_rings = min(size, max_rings)
+            for radius in range(fine_rings + 1):
+                members: list[int] = []
+                for cell in self._ring(row, column, radius, self.columns):
+                    found = self.cells.get(cell)
+                    if found:
+                        members.extend(found)
+                yield members, radius
+            if fine_rings == max_rings:
+                return
+        else:
+            # the query's own block is empty: straight on to the blocks around it
+            fine_rings = -1
+            yield [], margin
+        covered = max(fine_rings, margin)
+        for block_radius in range(1, max_rings // size + 2):
+            occupied_blocks = []
+            for r, c in self._block_ring(block_row, block_column, block_radius):
+                block = r * self.block_columns + c % self.block_columns
+                if block in self.blocks:
+                    occupied_blocks.append((self._block_meters(r, c, lat, lon, lon_scale), block))
+            occupied_blocks.sort()
+            for meters, block in occupied_blocks:
+                if meters > bound():
+                    break
+                ids = self._block_array(block)
+                if block_radius == 1 and fine_rings >= 0:
+                    # the nearest block ring overlaps the fine rings already scanned
+                    rows, cols = np.divmod(self.cell[ids], self.columns)
+                    dc = np.abs(cols - column)
+                    ids = ids[np.maximum(np.abs(rows - row), np.minimum(dc, self.columns - dc)) > fine_rings]
+                yield ids, covered
+            covered = block_radius * size + margin
+            yield [], covered
+            if covered >= max_rings:
+                return
+
+    def _distances(
+        self, chunks: list[list[int] | np.ndarray], lat: float, lon: float, lon_scale: float
+    ) -> tuple[np.ndarray, np.ndarray]:
+        ids = np.concatenate([np.asarray(chunk, dtype=np.int64) for chunk in chunks])
+        dy = (self.lat[ids] - lat) * METERS_PER_DEGREE
+        dx = (self.lon[ids] - lon) * (METERS_PER_DEGREE * lon_scale)
+        return ids, np.hypot(dx, dy)
+
+    def nearest(self, lat: float, lon: float, k: int) -> list[tuple[int, float]]:
+        """Up to ``k`` (scooter_id, metres) pairs closest first, within ``max_radius_meters``."""
+        row, column = self._cell_of(lat, lon)
+        lon_scale = max(math.cos(math.radians(lat)), 1e-6)
+        cell_meters = self.cell_degrees * METERS_PER_DEGREE * lon_scale
+        max_rings = math.ceil(self.max_radius_meters / cell_meters) + 1
+        # distance from the query point to the nearest edge of its own cell
+        lat_offset = (lat + 90) - row * self.cell_degrees
+        lon_offset = (lon + 180) - column * self.cell_degrees
+        edge_meters = min(
+            min(lat_offset, self.cell_degrees - lat_offset) * METERS_PER_DEGREE,
+            min(lon_offset, self.cell_degrees - lon_offset) * METERS_PER_DEGREE * lon_scale,
+        )
+
+        # distances are computed once per scooter, for the ones found since the last check
+        pending: list[list[int] | np.ndarray] = []
+        id_chunks: list[np.ndarray] = []
+        distance_chunks: list[np.ndarray] = []
+        best = np.empty(0, dtype=np.float64)
+        found = 0
+
+        def bound() -> float:
+            return best[-1] if found >= k else self.max_radius_meters
+
+        for members, radius in self._scan(lat, lon, lon_scale, max_rings, bound):
+            if len(members):
+                pending.append(members)
+                found += len(members)
+            if found < k:
+                continue
+            if pending:
+                ids, distances = self._distances(pending, lat, lon, lon_scale)
+                id_chunks.append(ids)
+                distance_chunks.append(distances)
+                best = np.partition(np.concatenate((best, distances)), k - 1)[:k]
+                pending = []
+            # anything outside the rings scanned so far is at least this far away
+            if best[-1] <= edge_meters + radius * cell_meters:
+                break
+
+        metrics.observe("spatial.nearest.candidates", found)
+        if pending:
+            ids, distances = self._distances(pending, lat, lon, lon_scale)
+            id_chunks.append(ids)
+            distance_chunks.append(distances)
+        if not found:
+            return []
+        ids = np.concatenate(id_chunks)
+        distances = np.concatenate(distance_chunks)
+        within = distances <= self.max_radius_meters
+        ids, distances = ids[within], distances[within]
+        if len(ids) > k:
+            top = np.argpartition(distances, k - 1)[:k]
+            ids, distances = ids[top], distances[top]
+        order = np.argsort(distances, kind="stable")
+        return list(zip(ids[order].tolist(), distances[order].tolist()))
@@ -0,0 +1,100 @@
+import gzip
+from datetime import datetime, timezone
+
+import orjson
+import pytest
+
+from order_offer_service.app.core.archive import OrderArchiveWriter
+from order_offer_service.app.core.s3 import S3Storage
+
+
+class MockStorage(S3Storage):
+    def __init__(self):
+        super().__init__()
+        self.objects = {}
+
+    async def upload_segment(self, key, body, content_type, ttl_days):
+        self.objects[key] = body
+
+
+def order_payload(order_id):
+    return {
+        "order_id": order_id,
+        "user_id": 1,
+        "time_start": datetime(2026, 5, 1, 10, 0, tzinfo=timezone.utc),
+        "time_finish": datetime(2026, 5, 1, 10, 30, tzinfo=timezone.utc),
+        "total_amount": 100,
+    }
+
+
+@pytest.mark.asyncio
+async def test_archive_writer_batches_orders_into_segment_with_manifest(tmp_path):
+    storage = MockStorage()
+    writer = OrderArchiveWriter(storage, tmp_path, max_bytes=1 << 20, max_age_seconds=300)
+
+    keys = {await writer.store_order(order_payload(order_id), ttl_days=365) for order_id in (1, 2, 3)}
+    assert keys == {"orders/zone=all/ttl=512/date=2026-05-01/hour=10"}
+    assert storage.objects == {}
+    assert len(list(tmp_path.glob("worker-*/*.ndjson"))) == 1
+
+    await writer.seal_due(force=True)
+
+    segment_key = next(key for key in storage.objects if key.endswith(".ndjson.gz"))
+    manifest_key = next(key for key in storage.objects if key.endswith(".manifest.json"))
+    rows = [orjson.loads(line) for line in gzip.decompress(storage.objects[segment_key]).splitlines()]
+    assert [row["order_id"] for row in rows] == [1, 2, 3]
+    assert orjson.loads(storage.objects[manifest_key])["order_ids"] == [1, 2, 3]
+    assert list(tmp_path.rglob("*.ndjson")) == []
+
+
+@pytest.mark.asyncio
+async def test_archive_writer_recovers_spilled_orders_after_crash(tmp_path):
+    crashed = OrderArchiveWriter(MockStorage(), tmp_path, max_bytes=1 << 20, max_age_seconds=300)
+    await crashed.store_order(order_payload(7), ttl_days=30)
+    # the process died: the kernel drops its lock, the spill file stays behind
+    crashed._lock_file.close()
+
+    storage = MockStorage()
+    restarted = OrderArchiveWriter(storage, tmp_path, max_bytes=1 << 20, max_age_seconds=300)
+    restarted.recover()
+    await restarted.flush_sealed()
+
+    manifest_key = next(key for key in storage.objects if key.endswith(".manifest.json"))
+    assert orjson.loads(storage.objects[manifest_key])["order_ids"] == [7]
+    assert list(tmp_path.rglob("*.ndjson")) == []
+
+
+@pytest.mark.asyncio
+async def test_archive_recovery_leaves_live_sibling_workers_alone(tmp_path):
+    sibling = OrderArchiveWriter(MockStorage(), tmp_path, max_bytes=1 << 20, max_age_seconds=300)
+    await sibling.store_order(order_payload(1), ttl_days=30)
+
+    storage = MockStorage()
+    starting = OrderArchiveWriter(storage, tmp_path, max_bytes=1 << 20, max_age_seconds=300)
+    starting.recover()
+    await starting.flush_sealed()
+
+    # the sibling is still appending to its open segment: nothing was uploaded or removed
+    assert storage.objects == {}
+    await sibling.store_order(order_payload(2), ttl_days=30)
+    await sibling.stop()
+    manifest_key = next(key for key in sibling.storage.objects if key.endswith(".manifest.json"))
+    assert orjson.loads(sibling.storage.objects[manifest_key])["order_ids"] == [1, 2]
+    assert [path.name for path in tmp_path.iterdir()] == [starting._own_dir.name]
+
+
+
+def test_parquet_archive_format_needs_pyarrow(monkeypatch):
+    import importlib.util
+
+    from pydantic import ValidationError
+
+    from order_offer_service.app.config import Settings
+
+    real_find_spec = importlib.util.find_spec
+    monkeypatch.setattr(
+        importlib.util, "find_spec", lambda name, *args: None if name == "pyarrow" else real_find_spec(name, *args)
+    )
+    with pytest.raises(ValidationError, match="pyarrow"):
+        Settings(archive_format="parquet")
+    assert Settings(archive_format="ndjson").archive_format == "ndjson"
@@ -0,0 +1,294 @@
+import asyncio
+
+import pytest
+
+from order_offer_service.app.cache.base import ServiceCache
+
+
+@pytest.mark.asyncio
+async def test_get_or_set_coalesces_concurrent_misses():
+    cache = ServiceCache(ttl=60)
+    calls = 0
+
+    async def fetcher():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {"surge": 2}
+
+    results = await asyncio.gather(*(cache.get_or_set("configs", fetcher) for _ in range(10)))
+
+    assert calls == 1
+    assert all(result == {"surge": 2} for result in results)
+    assert cache.coalesced_waiters == 9
+    # served from cache afterwards
+    assert await cache.get_or_set("configs", fetcher) == {"surge": 2}
+    assert calls == 1
+
+
+@pytest.mark.asyncio
+async def test_get_or_set_shares_fetch_error():
+    cache = ServiceCache(ttl=60)
+    calls = 0
+
+    async def fetcher():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        raise RuntimeError("stub down")
+
+    results = await asyncio.gather(
+        *(cache.get_or_set("zones:center", fetcher) for _ in range(5)), return_exceptions=True
+    )
+
+    assert calls == 1
+    assert all(isinstance(result, RuntimeError) for result in results)
+    # the failed fetch is not remembered: the next miss fetches again
+    with pytest.raises(RuntimeError):
+        await cache.get_or_set("zones:center", fetcher)
+    assert calls == 2
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.mark.asyncio
+async def test_stale_value_served_while_refreshing_in_background():
+    clock = FakeClock()
+    cache = ServiceCache(ttl=60, stale_ttl=30, timer=clock)
+    values = iter([1, 2])
+
+    async def fetcher():
+        return next(values)
+
+    assert await cache.get_or_set("configs", fetcher) == 1
+    clock.now = 70
+    # between soft and hard TTL: old value right away, refresh scheduled
+    assert await cache.get_or_set("configs", fetcher) == 1
+    await asyncio.sleep(0)
+    assert await cache.get_or_set("configs", fetcher) == 2
+
+
+@pytest.mark.asyncio
+async def test_stale_if_error_serves_last_good_value_up_to_limit():
+    clock = FakeClock()
+    cache = ServiceCache(ttl=60, stale_ttl=30, stale_if_error_ttl=100, timer=clock)
+    fail = False
+
+    async def fetcher():
+        if fail:
+            raise RuntimeError("stub down")
+        return "zone"
+
+    assert await cache.get_or_set("zones:center", fetcher) == "zone"
+    fail = True
+    clock.now = 150
+    assert await cache.get_or_set("zones:center", fetcher) == "zone"
+    clock.now = 200
+    with pytest.raises(RuntimeError):
+        await cache.get_or_set("zones:center", fetcher)
+
+
+class FakeRedis:
+    def __init__(self):
+        self.storage = {}
+        self.mget_calls = 0
+
+    async def get(self, key):
+        return self.storage.get(key)
+
+    async def mget(self, keys):
+        self.mget_calls += 1
+        return [self.storage.get(key) for key in keys]
+
+    async def set(self, key, value, ex=None, nx=False):
+        if nx and key in self.storage:
+            return None
+        self.storage[key] = value
+        return True
+
+
+@pytest.mark.asyncio
+async def test_listeners_only_see_changed_values():
+    cache = ServiceCache(ttl=60)
+    updates = []
+    cache.add_listener(lambda key, value: updates.append((key, value)))
+    values = iter([{"surge": 2}, {"surge": 2}, {"surge": 3}])
+
+    async def fetcher():
+        return next(values)
+
+    first = await cache.refresh("configs", fetcher)
+    await cache.refresh("configs", fetcher)
+    # an unchanged refresh keeps the cached object and notifies nobody
+    assert cache.get("configs") is first
+    await cache.refresh("configs", fetcher)
+
+    assert cache.get("configs") == {"surge": 3}
+    assert updates == [("configs", {"surge": 2}), ("configs", {"surge": 3})]
+
+
+@pytest.mark.asyncio
+async def test_l2_shared_between_workers_and_batched_with_mget():
+    redis = FakeRedis()
+    worker_a = ServiceCache(ttl=600, name="zones", redis=redis)
+    worker_b = ServiceCache(ttl=600, name="zones", redis=redis)
+    calls = []
+
+    async def fetcher(key):
+        calls.append(key)
+        return {"zone_id": key.removeprefix("zones:")}
+
+    await worker_a.get_or_set("zones:center", fetcher, "zones:center")
+    await worker_a.get_or_set("zones:suburb", fetcher, "zones:suburb")
+    assert calls == ["zones:center", "zones:suburb"]
+
+    zones = await worker_b.get_many(["zones:center", "zones:suburb", "zones:north"], fetcher)
+
+    assert zones["zones:center"] == {"zone_id": "center"}
+    assert zones["zones:north"] == {"zone_id": "north"}
+    assert calls == ["zones:center", "zones:suburb", "zones:north"]
+    assert redis.mget_calls == 1
+    # both tiers now hold the value fetched by worker_b
+    assert worker_b.get("zones:north") == {"zone_id": "north"}
+    assert "cache:zones:north" in redis.storage
+
+
+class FakePubSubRedis(FakeRedis):
+    def __init__(self):
+        super().__init__()
+        self.published = []
+
+    async def delete(self, key):
+        self.storage.pop(key, None)
+
+    async def publish(self, channel, message):
+        self.published.append((channel, message))
+
+
+@pytest.mark.asyncio
+async def test_active_order_cache_write_through_and_cross_worker_invalidation():
+    from datetime import datetime, timezone
+
+    from order_offer_service.app.cache.orders import ActiveOrderCache
+    from order_offer_service.app.core.events import OrderEventBus
+    from order_offer_service.app.models import OrderRecord
+
+    redis = FakePubSubRedis()
+    worker_a = ActiveOrderCache(redis, OrderEventBus(redis, "orders:events"))
+    bus_b = OrderEventBus(redis, "orders:events")
+    worker_b = ActiveOrderCache(redis, bus_b)
+    started = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    record = OrderRecord(7, 1, 101, started, None, 15, 50, 0, 600)
+
+    await worker_a.put(record)
+    assert await worker_b.get(7) == record
+    assert 7 in worker_b.local
+
+    await worker_a.invalidate(7)
+    assert await worker_a.get(7) is None
+    # worker_b receives the broadcast through its own subscriber
+    bus_b.dispatch({"event": "invalidated", "order_id": 7})
+    assert 7 not in worker_b.local
+    assert await worker_b.get(7) is None
+    assert len(redis.published) == 1
+
+
+@pytest.mark.asyncio
+async def test_stopped_order_is_not_recached_from_a_lagging_read():
+    from datetime import datetime, timezone
+
+    from order_offer_service.app.cache.orders import ActiveOrderCache
+    from order_offer_service.app.core.events import OrderEventBus
+    from order_offer_service.app.models import OrderRecord
+
+    redis = FakePubSubRedis()
+    worker_a = ActiveOrderCache(redis, OrderEventBus(redis, "orders:events"))
+    worker_b = ActiveOrderCache(redis, OrderEventBus(redis, "orders:events"))
+    record = OrderRecord(7, 1, 101, datetime(2026, 1, 1, tzinfo=timezone.utc), None, 15, 50, 0, 600)
+
+    await worker_a.put(record)
+    await worker_a.retire(7)
+    # worker_b read the order from a replica that has not applied the stop yet
+    await worker_b.put(record, if_absent=True)
+
+    assert await worker_a.get(7) is None
+    assert await worker_b.get(7) is None
+    assert 7 not in worker_b.local
+
+    await worker_b.put(OrderRecord(8, 1, 102, record.time_start, None, 15, 50, 0, 600), if_absent=True)
+    assert (await worker_a.get(8)).order_id == 8
+
+
+class FakeRespServer:
+    """Just enough of the Redis protocol for one subscriber: replies to commands and pushes messages."""
+
+    def __init__(self):
+        self.commands = []
+        self.subscribed = asyncio.Event()
+        self.writer = None
+
+    @staticmethod
+    def _bulk(value: str) -> bytes:
+        return f"${len(value)}\r\n{value}\r\n".encode()
+
+    async def handle(self, reader, writer):
+        self.writer = writer
+        while True:
+            header = await reader.readline()
+            if not header:
+                return
+            args = []
+            for _ in range(int(header[1:])):
+                length = int((await reader.readline())[1:])
+                args.append((await reader.readexactly(length + 2))[:-2].decode())
+            self.commands.append(args)
+            if args[0].upper() == "SUBSCRIBE":
+                writer.write(b"*3\r\n" + self._bulk("subscribe") + self._bulk(args[1]) + b":1\r\n")
+                self.subscribed.set()
+            elif args[0].upper() == "PING":
+                writer.write(b"*2\r\n" + self._bulk("pong") + self._bulk(args[1] if len(args) > 1 else ""))
+            else:
+                writer.write(b"+OK\r\n")
+            await writer.drain()
+
+    async def push(self, channel: str, data: str):
+        self.writer.write(b"*3\r\n" + self._bulk("message") + self._bulk(channel) + self._bulk(data))
+        await self.writer.drain()
+
+
+@pytest.mark.asyncio
+async def test_event_subscription_survives_idle_periods_longer_than_the_socket_timeout():
+    from order_offer_service.app.core.events import OrderEventBus
+    from order_offer_service.app.core.redis import make_pubsub_client, settings
+
+    fake = FakeRespServer()
+    server = await asyncio.start_server(fake.handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    subscriber = make_pubsub_client(f"redis://127.0.0.1:{port}/0", health_check_interval=30)
+    bus = OrderEventBus(FakePubSubRedis(), "orders:events", subscriber)
+    received = []
+    bus.add_listener(received.append)
+    bus.start()
+    try:
+        await asyncio.wait_for(fake.subscribed.wait(), 2)
+        await asyncio.sleep(settings.redis_socket_timeout_seconds * 2)
+        await fake.push("orders:events", '{"event": "stopped", "order_id": 7}')
+        for _ in range(50):
+            if received:
+                break
+            await asyncio.sleep(0.01)
+    finally:
+        await bus.stop()
+        await subscriber.aclose()
+        server.close()
+
+    assert received == [{"event": "stopped", "order_id": 7}]
+    # the idle subscription was never dropped and re-established
+    assert sum(command[0].upper() == "SUBSCRIBE" for command in fake.commands) == 1
+
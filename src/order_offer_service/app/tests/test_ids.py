@@ -0,0 +1,145 @@
+import pytest
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from order_offer_service.app.core.exceptions import IdsUnavailable
+from order_offer_service.app.core.ids import SnowflakeGenerator, WorkerIdLease
+
+
+class FakeClock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def test_snowflake_ids_are_ordered_and_carry_worker_and_time():
+    clock = FakeClock(1_760_000_000.0)
+    generator = SnowflakeGenerator(worker_id=513, clock=clock)
+
+    first = generator.next_id()
+    second = generator.next_id()
+    clock.now += 0.005
+    third = generator.next_id()
+
+    assert first < second < third
+    assert (first >> 12) & 0x3FF == 513
+    assert second & 0xFFF == 1
+    assert SnowflakeGenerator.timestamp_ms(third) == 1_760_000_000_005
+    assert third.bit_length() <= 63
+
+
+def test_snowflake_survives_clock_going_back():
+    clock = FakeClock(1_760_000_000.0)
+    generator = SnowflakeGenerator(worker_id=1, clock=clock)
+    ids = [generator.next_id()]
+    clock.now -= 2
+    ids += [generator.next_id() for _ in range(3)]
+
+    assert ids == sorted(set(ids))
+
+
+def test_snowflake_borrows_the_next_millisecond_instead_of_waiting():
+    clock = FakeClock(1_760_000_000.0)
+    generator = SnowflakeGenerator(worker_id=1, clock=clock, max_lead_ms=2)
+
+    # the clock never moves: a blocking generator would spin here forever
+    ids = [generator.next_id() for _ in range(3 * 4096)]
+    assert ids == sorted(set(ids))
+    assert SnowflakeGenerator.timestamp_ms(ids[-1]) == 1_760_000_000_002
+
+    with pytest.raises(IdsUnavailable):
+        generator.next_id()
+    clock.now += 0.001
+    assert generator.next_id() > ids[-1]
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+
+    async def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    async def eval(self, script, numkeys, key, token, *args):
+        if self.data.get(key) != token:
+            return 0
+        if "DEL" in script:
+            del self.data[key]
+        return 1
+
+
+@pytest.mark.asyncio
+async def test_worker_leases_are_unique_and_recovered_after_loss():
+    redis = FakeRedis()
+    first = WorkerIdLease(redis, SnowflakeGenerator(), ttl_seconds=30)
+    second = WorkerIdLease(redis, SnowflakeGenerator(), ttl_seconds=30)
+
+    await first.acquire()
+    await second.acquire()
+    assert first.generator.worker_id != second.generator.worker_id
+
+    # the key expired and another process took it over
+    redis.data[first._key(first.leased)] = "someone-else"
+    lost = first.leased
+    await first.renew()
+    assert first.leased is not None and first.leased != lost
+
+    await first.stop()
+    assert first._key(lost) in redis.data
+    assert all(value != first.token for value in redis.data.values())
+
+
+@pytest.mark.asyncio
+async def test_generator_issues_no_ids_without_a_lease():
+    class DownRedis:
+        async def set(self, *args, **kwargs):
+            raise RedisConnectionError("unreachable")
+
+    generator = SnowflakeGenerator()
+    lease = WorkerIdLease(DownRedis(), generator, ttl_seconds=30)
+    await lease.start()
+    try:
+        assert generator.worker_id is None
+        with pytest.raises(IdsUnavailable):
+            generator.next_id()
+    finally:
+        await lease.stop()
+
+    redis = FakeRedis()
+    lease = WorkerIdLease(redis, generator, ttl_seconds=30)
+    await lease.acquire()
+    assert generator.next_id() >> 12 & 0x3FF == lease.leased
+    redis.data.clear()
+    await lease.renew()
+    # the lost lease was replaced by a fresh one, never by a guessed id
+    assert redis.data == {lease._key(lease.leased): lease.token}
+
+
+@pytest.mark.asyncio
+async def test_ids_stop_before_the_lease_key_can_expire_when_renewals_fail():
+    clock = FakeClock(100.0)
+    redis = FakeRedis()
+    generator = SnowflakeGenerator(monotonic=clock)
+    lease = WorkerIdLease(redis, generator, ttl_seconds=30, monotonic=clock)
+    await lease.acquire()
+
+    async def unreachable(*args):
+        raise RedisConnectionError("unreachable")
+
+    redis.eval = unreachable
+    clock.now += lease.renew_interval
+    with pytest.raises(RedisConnectionError):
+        await lease.renew()
+    # one failed renewal leaves ids flowing
+    generator.next_id()
+
+    # the key set at 100 could expire at 130; ids stop well before
+    clock.now = 100.0 + 30 - lease.safety_margin
+    with pytest.raises(IdsUnavailable):
+        generator.next_id()
+    assert clock.now + lease.renew_interval < 130
+
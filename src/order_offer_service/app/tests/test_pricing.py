@@ -0,0 +1,93 @@
+from hypothesis import given, settings, strategies as st
+
+from order_offer_service.app.services.pricing import PricingEngine
+
+ZONE_IDS = ["center", "suburb", "airport"]
+
+zones = st.fixed_dictionaries(
+    {},
+    optional={
+        "price_multiplier": st.integers(0, 10_000) | st.floats(0, 10_000, allow_nan=False),
+        "price_unlock": st.integers(0, 10_000),
+        "default_deposit": st.integers(0, 100_000),
+        "offer_ttl_seconds": st.integers(1, 3_600),
+    },
+)
+scooters = st.lists(
+    st.fixed_dictionaries(
+        {"scooter_id": st.integers(1, 10**9), "zone_id": st.sampled_from(ZONE_IDS)},
+        optional={"charge": st.integers(0, 100)},
+    ),
+    max_size=50,
+)
+users = st.fixed_dictionaries({}, optional={"has_subscribtion": st.booleans(), "trusted": st.booleans()})
+factors = st.floats(0, 5, allow_nan=False) | st.integers(0, 5) | st.sampled_from(["1.25", "0.8"])
+coeffs = st.none() | st.fixed_dictionaries({}, optional={"surge": factors, "low_charge_discount": factors})
+
+
+@settings(max_examples=300, deadline=None)
+@given(
+    scooters=scooters,
+    zones=st.fixed_dictionaries({zone_id: zones for zone_id in ZONE_IDS}),
+    user=users,
+    coeff=coeffs,
+    threshold=st.integers(0, 101),
+)
+def test_price_many_matches_price_one(scooters, zones, user, coeff, threshold):
+    engine = PricingEngine(threshold)
+
+    expected = [engine.price_one(scooter, zones[scooter["zone_id"]], user, coeff) for scooter in scooters]
+
+    assert engine.price_many(scooters, zones, user, coeff) == expected
+
+
+def test_price_many_applies_discount_only_below_threshold():
+    engine = PricingEngine(low_charge_threshold=28)
+    zones = {"center": {"price_multiplier": 10}}
+    scooters = [
+        {"scooter_id": 1, "zone_id": "center", "charge": 27},
+        {"scooter_id": 2, "zone_id": "center", "charge": 28},
+    ]
+
+    quotes = engine.price_many(scooters, zones, {}, {"surge": 1.5, "low_charge_discount": 0.5})
+
+    assert [quote.price_per_minute for quote in quotes] == [7, 15]
+
+
+def test_price_many_applies_surge_to_fractional_multiplier():
+    engine = PricingEngine(low_charge_threshold=28)
+    zones = {"center": {"price_multiplier": 12.5}}
+    scooters = [{"scooter_id": 1, "zone_id": "center"}]
+
+    assert engine.price_many(scooters, zones, {}, {"surge": 2})[0].price_per_minute == 25
+    assert engine.price_many(scooters, zones, {}, None)[0].price_per_minute == 12.5
+
+
+def test_price_table_follows_cache_updates_and_matches_engine():
+    from order_offer_service.app.cache.base import ServiceCache
+    from order_offer_service.app.services.pricing import PriceTable
+
+    engine = PricingEngine(low_charge_threshold=30)
+    table = PriceTable(engine)
+    configs, zones = ServiceCache(60, name="configs"), ServiceCache(600, name="zones")
+    configs.add_listener(table.on_config_update)
+    zones.add_listener(table.on_zone_update)
+
+    zones.set("zones:center", {"price_multiplier": 10, "price_unlock": 40})
+    assert table.version == 0
+    configs.set("configs", {"surge": 1.5, "low_charge_discount": 0.5})
+    zones.set("zones:center", {"price_multiplier": 10, "price_unlock": 40})
+    assert (table.version, len(table)) == (1, 8)
+
+    zone, coeff, user = zones.get("zones:center"), configs.get("configs"), {"trusted": True}
+    for charge in (5, 29, 30, 100):
+        scooter = {"scooter_id": 7, "zone_id": "center", "charge": charge}
+        assert table.lookup(scooter, zone, user, coeff) == engine.price_one(scooter, zone, user, coeff)
+
+    zones.set("zones:center", {"price_multiplier": 20})
+    assert table.version == 2
+    # a request still holding the replaced zone is not answered from the new table
+    assert table.lookup({"scooter_id": 7, "zone_id": "center"}, zone, user, coeff) is None
+    new_zone = zones.get("zones:center")
+    assert table.lookup({"scooter_id": 7, "zone_id": "center"}, new_zone, user, coeff).price_per_minute == 30
+
@@ -162,9 +162,14 @@ class MockOrderRepo:
         self.storage = {}
         self._next_id = 1
 
-    async def create(self, session, **kwargs):
+    async def allocate_id(self, session):
         order_id = self._next_id
         self._next_id += 1
+        return order_id
+
+    async def create(self, session, order_id=None, **kwargs):
+        if order_id is None:
+            order_id = await self.allocate_id(session)
         order = MockOrder(order_id=order_id, **kwargs)
         self.storage[order_id] = order
         return order
@@ -218,6 +223,9 @@ class MockScooterClient:
 class MockSession:
     async def commit(self):
         return None
+
+    async def rollback(self):
+        return None
     
     async def flush(self):
         return None
@@ -242,6 +250,9 @@ async def test_start_order(monkeypatch):
                 'time_created': datetime.now(timezone.utc)
             })()
 
+        async def consume_offer(self, session, offer_id):
+            return None
+
     mock_offer_service = MockOfferService()
 
     monkeypatch.setattr(order_service, "order_repo", order_repo)
@@ -258,6 +269,68 @@ async def test_start_order(monkeypatch):
     assert scooter.locked == [5]
 
 
+@pytest.mark.asyncio
+async def test_start_order_compensates_when_hold_fails(monkeypatch):
+    order_repo = MockOrderRepo()
+    payment = MockPaymentClient()
+    scooter = MockScooterClient()
+
+    class MockOfferService:
+        async def get_valid_offer(self, session, offer_id, user_id):
+            return type("Offer", (), {
+                "scooter_id": 5, "price_per_minute": 10, "price_unlock": 10, "deposit": -1, "ttl": 3600
+            })()
+
+        async def consume_offer(self, session, offer_id):
+            consumed.append(offer_id)
+
+    consumed = []
+    monkeypatch.setattr(order_service, "order_repo", order_repo)
+    monkeypatch.setattr(order_service, "offer_service", MockOfferService())
+    monkeypatch.setattr(order_service, "payment_client", payment)
+    monkeypatch.setattr(order_service, "scooter_client", scooter)
+
+    with pytest.raises(exceptions.PaymentDeclined):
+        await order_service.start_order(MockSession(), OrderStartRequest(user_id=1, offer_id=123))
+
+    # the lock ran alongside the failed hold and was undone; no order was written
+    assert scooter.locked == [5]
+    assert scooter.unlocked == [5]
+    assert payment.cleared == []
+    assert order_repo.storage == {}
+    # the offer is still usable for another attempt
+    assert consumed == []
+
+
+@pytest.mark.asyncio
+async def test_start_order_single_statement(monkeypatch):
+    order_repo = MockOrderRepo()
+    payment = MockPaymentClient()
+    scooter = MockScooterClient()
+
+    async def create_from_offer(session, offer_id, user_id):
+        return await order_repo.create(
+            session, user_id=user_id, scooter_id=7, price_per_minute=10, price_unlock=10, deposit=5, ttl=3600
+        )
+
+    async def unexpected(*args):
+        raise AssertionError("fast path must not fall back")
+
+    monkeypatch.setattr(order_repo, "create_from_offer", create_from_offer, raising=False)
+    monkeypatch.setattr(order_repo, "get_active_by_user", unexpected)
+    monkeypatch.setattr(order_service, "order_repo", order_repo)
+    monkeypatch.setattr(order_service, "offer_service", None)
+    monkeypatch.setattr(order_service, "payment_client", payment)
+    monkeypatch.setattr(order_service, "scooter_client", scooter)
+    monkeypatch.setattr(order_service, "single_statement_start", True)
+
+    order = await order_service.start_order(MockSession(), OrderStartRequest(user_id=1, offer_id=123))
+
+    assert order_repo.storage[order.order_id].user_id == 1
+    assert scooter.locked == [7]
+    assert payment.holds == [(1, order.order_id, 5)]
+
+
 @pytest.mark.asyncio
 async def test_stop_order(monkeypatch):
     order_repo = MockOrderRepo()
@@ -305,3 +378,673 @@ async def test_stop_order(monkeypatch):
     assert scooter.unlocked == [5]
     assert key == "archived"
     assert order.order_id not in order_repo.storage
+
+
+class MockOutboxRepo:
+    def __init__(self):
+        self.entries = []
+        self._next_id = 1
+
+    async def add(self, session, order_id, action, payload):
+        entry = type("Entry", (), {
+            "entry_id": self._next_id,
+            "order_id": order_id,
+            "action": action,
+            "payload": payload,
+            "attempts": 0,
+            "created_at": datetime.now(timezone.utc),
+        })()
+        self._next_id += 1
+        self.entries.append(entry)
+        return entry
+
+    async def claim(self, session, limit, lease_seconds):
+        return [entry for entry in self.entries if entry.attempts == 0][:limit]
+
+    async def complete(self, session, entry):
+        self.entries.remove(entry)
+
+    async def reschedule(self, session, entry, error, delay_seconds):
+        entry.attempts += 1
+
+
+class MockSessionFactory:
+    def __init__(self):
+        self.open = 0
+
+    def __call__(self):
+        return self
+
+    async def __aenter__(self):
+        self.open += 1
+        return MockSession()
+
+    async def __aexit__(self, *exc):
+        self.open -= 1
+        return False
+
+
+@pytest.mark.asyncio
+async def test_stop_order_via_outbox(monkeypatch):
+    from order_offer_service.app.services.outbox import OutboxDispatcher
+
+    order_repo = MockOrderRepo()
+    outbox_repo = MockOutboxRepo()
+    payment = MockPaymentClient()
+    scooter = MockScooterClient()
+    monkeypatch.setattr(order_service, "order_repo", order_repo)
+    monkeypatch.setattr(order_service, "outbox_repo", outbox_repo)
+    monkeypatch.setattr(order_service, "payment_client", payment)
+    monkeypatch.setattr(order_service, "scooter_client", scooter)
+
+    archived = []
+
+    async def mock_store(self, data, ttl):
+        archived.append(data["order_id"])
+        return "archived"
+
+    monkeypatch.setattr("order_offer_service.app.core.s3.S3Storage.store_order", mock_store)
+
+    order = await order_repo.create(
+        None, user_id=1, scooter_id=5, price_per_minute=60, price_unlock=10, deposit=5, ttl=2
+    )
+    order.time_start -= timedelta(seconds=120)
+
+    total, key = await order_service.stop_order(MockSession(), OrderStopRequest(order_id=order.order_id, user_id=1))
+
+    # the client gets the price before any side effect has run
+    assert 130 <= total <= 131
+    assert key.endswith(f"/{order.order_id}.json")
+    assert order.order_id not in order_repo.storage
+    assert [entry.action for entry in outbox_repo.entries] == ["clear_money", "unlock_scooter", "archive"]
+    assert payment.cleared == [] and scooter.unlocked == [] and archived == []
+
+    sessions = MockSessionFactory()
+    sessions_during_handlers = []
+
+    async def failing_unlock(scooter_id):
+        sessions_during_handlers.append(sessions.open)
+        raise exceptions.ScooterUnavailable()
+
+    monkeypatch.setattr(scooter, "unlock_scooter", failing_unlock)
+    dispatcher = OutboxDispatcher(outbox_repo, order_service.outbox_handlers(), session_factory=sessions)
+    assert await dispatcher.drain_once() == 3
+
+    # handlers run between the claim and the settle transactions, never inside one
+    assert sessions_during_handlers == [0]
+
+    assert payment.cleared == [(1, order.order_id, total)]
+    assert archived == [order.order_id]
+    # the failed unlock stays queued for a retry
+    assert [(entry.action, entry.attempts) for entry in outbox_repo.entries] == [("unlock_scooter", 1)]
+
+
+@pytest.mark.asyncio
+async def test_fetch_pricing_inputs_runs_concurrently(monkeypatch):
+    import asyncio
+    from order_offer_service.app.schemas.offers import OfferCreateRequest
+
+    class SlowClient:
+        def __init__(self, delay, result):
+            self.delay = delay
+            self.result = result
+
+        async def _get(self, *args):
+            await asyncio.sleep(self.delay)
+            return self.result
+
+    scooter = SlowClient(0.05, {"zone_id": "center", "charge": 90})
+    zone = SlowClient(0.05, {"price_multiplier": 10})
+    user = SlowClient(0.05, {"trusted": True})
+    config = SlowClient(0.05, {"surge": 1.0})
+    scooter.get_scooter = scooter._get
+    zone.get_zone = zone._get
+    user.get_user = user._get
+    config.get_price_coeff_settings = config._get
+    monkeypatch.setattr(offer_service, "scooter_client", scooter)
+    monkeypatch.setattr(offer_service, "zone_client", zone)
+    monkeypatch.setattr(offer_service, "user_client", user)
+    monkeypatch.setattr(offer_service, "config_client", config)
+
+    started = time.monotonic()
+    result = await offer_service.fetch_pricing_inputs(OfferCreateRequest(user_id=1, scooter_id=2))
+
+    # scooter -> zone is the only chain: ~2 sleeps instead of 4
+    assert time.monotonic() - started < 0.15
+    assert result == (scooter.result, zone.result, user.result, config.result)
+
+
+@pytest.mark.asyncio
+async def test_fetch_pricing_inputs_critical_failure_cancels_siblings(monkeypatch):
+    import asyncio
+    from order_offer_service.app.schemas.offers import OfferCreateRequest
+
+    cancelled = []
+
+    class UnavailableScooter:
+        async def get_scooter(self, scooter_id):
+            raise exceptions.ScooterUnavailable()
+
+    class SlowUser:
+        async def get_user(self, user_id):
+            try:
+                await asyncio.sleep(1)
+            except asyncio.CancelledError:
+                cancelled.append(user_id)
+                raise
+
+    class Config:
+        async def get_price_coeff_settings(self):
+            return {}
+
+    monkeypatch.setattr(offer_service, "scooter_client", UnavailableScooter())
+    monkeypatch.setattr(offer_service, "user_client", SlowUser())
+    monkeypatch.setattr(offer_service, "config_client", Config())
+
+    with pytest.raises(exceptions.ScooterUnavailable):
+        await offer_service.fetch_pricing_inputs(OfferCreateRequest(user_id=1, scooter_id=2))
+    assert cancelled == [1]
+
+
+class MockRedis:
+    def __init__(self):
+        self.storage = {}
+
+    async def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.storage:
+            return None
+        self.storage[key] = value
+        return True
+
+
+@pytest.mark.asyncio
+async def test_signed_offer_roundtrip_and_single_use(monkeypatch):
+    from order_offer_service.app.repositories import OfferTokenCodec, SignedOfferRepository
+
+    repo = SignedOfferRepository(OfferTokenCodec("secret"), MockRedis())
+    monkeypatch.setattr(offer_service, "offer_repo", repo)
+
+    offer = await repo.create(None, user_id=1, scooter_id=2, price_per_minute=3, price_unlock=4, deposit=5, ttl=60)
+    assert isinstance(offer.offer_id, str)
+
+    valid = await offer_service.get_valid_offer(None, offer.offer_id, 1)
+    assert (valid.scooter_id, valid.price_per_minute, valid.price_unlock, valid.deposit, valid.ttl) == (2, 3, 4, 5, 60)
+    with pytest.raises(exceptions.OfferNotFound):
+        await offer_service.get_valid_offer(None, offer.offer_id, 2)
+
+    # tampered or foreign-secret tokens are rejected
+    forged = await SignedOfferRepository(OfferTokenCodec("other"), MockRedis()).create(
+        None, user_id=1, scooter_id=2, price_per_minute=0, price_unlock=0, deposit=0, ttl=60
+    )
+    with pytest.raises(exceptions.OfferNotFound):
+        await offer_service.get_valid_offer(None, forged.offer_id, 1)
+
+    await offer_service.consume_offer(None, offer.offer_id)
+    with pytest.raises(exceptions.OfferNotFound):
+        await offer_service.consume_offer(None, offer.offer_id)
+
+
+class MockRedisStore(MockRedis):
+    async def incr(self, key):
+        self.storage[key] = self.storage.get(key, 0) + 1
+        return self.storage[key]
+
+    async def get(self, key):
+        return self.storage.get(key)
+
+    async def getdel(self, key):
+        return self.storage.pop(key, None)
+
+
+@pytest.mark.asyncio
+async def test_redis_offer_repository_single_use(monkeypatch):
+    from order_offer_service.app.repositories import RedisOfferRepository
+
+    repo = RedisOfferRepository(MockRedisStore())
+    monkeypatch.setattr(offer_service, "offer_repo", repo)
+
+    offer = await repo.create(None, user_id=1, scooter_id=2, price_per_minute=3, price_unlock=4, deposit=5, ttl=60)
+    valid = await offer_service.get_valid_offer(None, offer.offer_id, 1)
+    assert valid.offer_id == offer.offer_id == 1
+    assert valid.deposit == 5
+
+    await offer_service.consume_offer(None, offer.offer_id)
+    with pytest.raises(exceptions.OfferNotFound):
+        await offer_service.consume_offer(None, offer.offer_id)
+    with pytest.raises(exceptions.OfferNotFound):
+        await offer_service.get_valid_offer(None, offer.offer_id, 1)
+
+
+@pytest.mark.asyncio
+async def test_sql_offer_repository_single_use(monkeypatch):
+    from types import SimpleNamespace
+    from order_offer_service.app.repositories import OfferRepository
+
+    rows = {1}
+
+    class DeletingSession:
+        async def execute(self, statement):
+            offer_id = statement.whereclause.right.value
+            deleted = offer_id in rows
+            rows.discard(offer_id)
+            return SimpleNamespace(rowcount=int(deleted))
+
+    monkeypatch.setattr(offer_service, "offer_repo", OfferRepository())
+
+    await offer_service.consume_offer(DeletingSession(), 1)
+    with pytest.raises(exceptions.OfferNotFound):
+        await offer_service.consume_offer(DeletingSession(), 1)
+    with pytest.raises(exceptions.OfferNotFound):
+        await offer_service.consume_offer(DeletingSession(), "1")
+
+
+@pytest.mark.asyncio
+async def test_stream_prices_until_stopped(monkeypatch):
+    import asyncio
+    from order_offer_service.app.core.events import order_events
+    from order_offer_service.app.services.order_streams import OrderStreamHub
+
+    hub = OrderStreamHub(order_events, max_streams=1)
+    monkeypatch.setattr(order_service, "stream_hub", hub)
+    monkeypatch.setattr(order_service.__class__, "total_price", staticmethod(lambda order, time_end=None: 42))
+    order = MockOrder(order_id=9, user_id=1, scooter_id=5, price_per_minute=60, price_unlock=10, deposit=0, ttl=60)
+
+    stream = order_service.open_stream(order)
+    with pytest.raises(exceptions.TooManyStreams):
+        order_service.open_stream(order)
+
+    events = order_service.stream_prices(order, stream)
+    assert await events.__anext__() == 'event: price\ndata: {"order_id":9,"total_price":42}\n\n'
+
+    order_events.dispatch({"event": "stopped", "order_id": 9, "total_price": 130})
+    assert await asyncio.wait_for(events.__anext__(), 1) == 'event: stopped\ndata: {"order_id":9,"total_price":130}\n\n'
+    with pytest.raises(StopAsyncIteration):
+        await events.__anext__()
+    assert hub.open_streams == 0
+
+
+@pytest.mark.asyncio
+async def test_stream_slot_is_released_when_the_body_never_starts(monkeypatch):
+    from order_offer_service.app.api.v1.routes_orders import stream_order
+    from order_offer_service.app.core.events import order_events
+    from order_offer_service.app.services.order_streams import OrderStreamHub
+
+    class ReadSession:
+        async def close(self):
+            pass
+
+    hub = OrderStreamHub(order_events, max_streams=1)
+    order = MockOrder(order_id=9, user_id=1, scooter_id=5, price_per_minute=60, price_unlock=10, deposit=0, ttl=60)
+    order_repo = MockOrderRepo()
+    order_repo.storage[9] = order
+    monkeypatch.setattr(order_service, "stream_hub", hub)
+    monkeypatch.setattr(order_service, "order_cache", None)
+    monkeypatch.setattr(order_service, "order_repo", order_repo)
+
+    response = await stream_order(user_id=1, order_id=9, session=ReadSession(), service=order_service)
+    assert hub.open_streams == 1
+    # the client went away before the body was iterated; Starlette still runs the background task
+    await response.background()
+    assert hub.open_streams == 0
+
+
+@pytest.mark.asyncio
+async def test_stream_notices_a_missed_stop_by_rereading_the_order(monkeypatch):
+    import asyncio
+    from order_offer_service.app.core.events import order_events
+    from order_offer_service.app.services import orders as orders_module
+    from order_offer_service.app.services.order_streams import OrderStreamHub
+
+    hub = OrderStreamHub(order_events, max_streams=1)
+    order = MockOrder(order_id=9, user_id=1, scooter_id=5, price_per_minute=60, price_unlock=10, deposit=0, ttl=60)
+    order_repo = MockOrderRepo()
+    order_repo.storage[9] = order
+    monkeypatch.setattr(order_service, "stream_hub", hub)
+    monkeypatch.setattr(order_service, "order_repo", order_repo)
+    monkeypatch.setattr(order_service, "_session_factory", MockSessionFactory())
+    monkeypatch.setattr(order_service.__class__, "total_price", staticmethod(lambda order, time_end=None: 42))
+    monkeypatch.setattr(orders_module.settings, "order_stream_interval_seconds", 0.01)
+    monkeypatch.setattr(orders_module.settings, "order_stream_recheck_seconds", 0.02)
+
+    events = order_service.stream_prices(order, order_service.open_stream(order))
+    assert (await events.__anext__()).startswith("event: price")
+    # stopped on another worker and the event was lost: only the row is gone
+    del order_repo.storage[9]
+    assert await asyncio.wait_for(events.__anext__(), 1) == 'event: stopped\ndata: {"order_id":9,"total_price":42}\n\n'
+    with pytest.raises(StopAsyncIteration):
+        await events.__anext__()
+    assert hub.open_streams == 0
+
+
+@pytest.mark.asyncio
+async def test_batching_offer_repository_group_commits():
+    import asyncio
+    from order_offer_service.app.core.ids import SnowflakeGenerator
+    from order_offer_service.app.repositories import BatchingOfferRepository
+
+    batches = []
+
+    class RecordingSession:
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+        async def execute(self, statement, rows):
+            batches.append([row["offer_id"] for row in rows])
+
+        async def commit(self):
+            return None
+
+    repo = BatchingOfferRepository(
+        None, SnowflakeGenerator(7), window_seconds=0.01, max_rows=3, session_factory=RecordingSession
+    )
+    terms = dict(scooter_id=5, price_per_minute=10, price_unlock=10, deposit=5, ttl=60)
+
+    offers = await asyncio.gather(*(repo.create(None, user_id=user_id, **terms) for user_id in range(5)))
+
+    # three rows fill a batch at once, the remaining two go out when the window closes
+    assert [len(batch) for batch in batches] == [3, 2]
+    assert [offer.user_id for offer in offers] == [0, 1, 2, 3, 4]
+    assert [offer.offer_id for offer in offers] == batches[0] + batches[1]
+
+
+@pytest.mark.asyncio
+async def test_scooter_lookups_are_batched_with_isolated_errors(monkeypatch):
+    import asyncio
+    from order_offer_service.app.services.integrations import ExternalServiceUnavailable, ScooterClient
+
+    client = ScooterClient(batching=True)
+    requests = []
+
+    async def fake_request(method, path, **kwargs):
+        requests.append((path, kwargs["params"]["ids"]))
+        return {"items": [{"scooter_id": 101, "available": True}, {"scooter_id": 102, "available": False}]}
+
+    monkeypatch.setattr(client, "_request", fake_request)
+
+    results = await asyncio.gather(
+        client.get_scooter(101),
+        client.get_scooter(101),
+        client.get_scooter(102),
+        client.get_scooter(999),
+        return_exceptions=True,
+    )
+
+    assert requests == [("/scooters", "101,102,999")]
+    assert results[0] == results[1] == {"scooter_id": 101, "available": True}
+    assert isinstance(results[2], exceptions.ScooterUnavailable)
+    assert isinstance(results[3], ExternalServiceUnavailable)
+
+
+@pytest.mark.asyncio
+async def test_fleet_snapshot_serves_pricing_and_falls_back(monkeypatch):
+    from order_offer_service.app.services.fleet import FleetSnapshot, FleetSync
+
+    class FeedClient:
+        def __init__(self):
+            self.live_calls = []
+
+        async def obtain_changes(self, since, limit):
+            return {
+                "items": [
+                    {"scooter_id": 101, "zone_id": "center", "available": True, "charge": 92},
+                    {"scooter_id": 5000, "zone_id": "suburb", "available": False, "charge": 10},
+                ],
+                "version": 2,
+                "more": False,
+            }
+
+        async def get_scooter(self, scooter_id, require_available=True):
+            self.live_calls.append(scooter_id)
+            return {"scooter_id": scooter_id, "zone_id": "center", "available": True, "charge": 50}
+
+    client = FeedClient()
+    snapshot = FleetSnapshot(max_staleness_seconds=30, max_scooter_id=1_000_000)
+    await FleetSync(snapshot, client, interval=5, page_size=100).sync_once()
+    monkeypatch.setattr(offer_service, "scooter_client", client)
+    monkeypatch.setattr(offer_service, "fleet", snapshot)
+
+    assert await offer_service._get_scooter(101) == {
+        "scooter_id": 101, "zone_id": "center", "charge": 92, "available": True
+    }
+    with pytest.raises(exceptions.ScooterUnavailable):
+        await offer_service._get_scooter(5000)
+    await offer_service._get_scooter(7)
+    assert client.live_calls == [7]
+
+    snapshot.synced_at -= 60
+    await offer_service._get_scooter(101)
+    assert client.live_calls == [7, 101]
+
+
+def test_fleet_snapshot_memory_for_a_million_scooters():
+    from order_offer_service.app.services.fleet import FleetSnapshot
+
+    snapshot = FleetSnapshot(max_staleness_seconds=30, max_scooter_id=1_000_000)
+    snapshot.upsert([{"scooter_id": 999_999, "zone_id": "center", "available": True, "charge": 80}])
+    assert snapshot.nbytes <= 4 * 1024 * 1024 * 2
+    assert len(snapshot) == 1
+
+
+@pytest.mark.asyncio
+async def test_quote_prices_every_scooter_and_reports_unavailable(monkeypatch):
+    from order_offer_service.app.schemas.offers import OfferQuoteRequest
+
+    class Scooters:
+        async def get_scooter(self, scooter_id, require_available=True):
+            if scooter_id == 3:
+                raise exceptions.ScooterUnavailable()
+            return {"scooter_id": scooter_id, "zone_id": "center" if scooter_id == 1 else "suburb", "charge": 90}
+
+    class Zones:
+        async def get_zones(self, zone_ids):
+            return {
+                "center": {"price_multiplier": 10, "price_unlock": 40, "default_deposit": 500},
+                "suburb": {"price_multiplier": 7},
+            }
+
+    class Users:
+        async def get_user(self, user_id):
+            return {"has_subscribtion": True}
+
+    class Config:
+        async def get_price_coeff_settings(self):
+            return {"surge": 1.5}
+
+    monkeypatch.setattr(offer_service, "fleet", None)
+    monkeypatch.setattr(offer_service, "scooter_client", Scooters())
+    monkeypatch.setattr(offer_service, "zone_client", Zones())
+    monkeypatch.setattr(offer_service, "user_client", Users())
+    monkeypatch.setattr(offer_service, "config_client", Config())
+
+    quotes, unavailable = await offer_service.quote(OfferQuoteRequest(user_id=1, scooter_ids=[1, 2, 3, 2]))
+
+    assert unavailable == [3]
+    assert [(q.scooter_id, q.price_per_minute, q.price_unlock, q.deposit) for q in quotes] == [
+        (1, 15, 0, 500),
+        (2, 10, 0, 1000),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_nearby_quotes_closest_scooters_from_the_fleet_index(monkeypatch):
+    from order_offer_service.app.services.fleet import FleetSnapshot, FleetSync
+    from order_offer_service.app.services.spatial import SpatialIndex
+
+    class FeedClient:
+        async def obtain_changes(self, since, limit):
+            items = [
+                {"scooter_id": 1, "zone_id": "center", "available": True, "charge": 90, "lat": 55.7500, "lon": 37.62},
+                {"scooter_id": 2, "zone_id": "center", "available": True, "charge": 90, "lat": 55.7530, "lon": 37.62},
+                {"scooter_id": 3, "zone_id": "center", "available": False, "charge": 90, "lat": 55.7501, "lon": 37.62},
+                {"scooter_id": 4, "zone_id": "center", "available": True, "charge": 90, "lat": 55.7510, "lon": 37.62},
+            ]
+            return {"items": items, "version": 1, "more": False}
+
+    class Zones:
+        async def get_zones(self, zone_ids):
+            return {"center": {"price_multiplier": 10}}
+
+    class Users:
+        async def get_user(self, user_id):
+            return {}
+
+    class Config:
+        async def get_price_coeff_settings(self):
+            return {}
+
+    snapshot = FleetSnapshot(max_staleness_seconds=30, max_scooter_id=1000)
+    index = SpatialIndex(0.001, max_radius_meters=1_000, max_scooter_id=1000)
+    await FleetSync(snapshot, FeedClient(), interval=5, page_size=100, index=index).sync_once()
+    monkeypatch.setattr(offer_service, "fleet", snapshot)
+    monkeypatch.setattr(offer_service, "spatial", index)
+    monkeypatch.setattr(offer_service, "zone_client", Zones())
+    monkeypatch.setattr(offer_service, "user_client", Users())
+    monkeypatch.setattr(offer_service, "config_client", Config())
+
+    nearby = await offer_service.nearby(user_id=1, lat=55.75, lon=37.62, k=2)
+
+    assert [(quote.scooter_id, round(distance)) for quote, distance in nearby] == [(1, 0), (4, 111)]
+    assert all(quote.price_per_minute == 10 for quote, _ in nearby)
+
+
+@pytest.mark.asyncio
+async def test_nearby_requires_spatial_index(monkeypatch):
+    monkeypatch.setattr(offer_service, "spatial", None)
+    with pytest.raises(exceptions.NearbySearchUnavailable):
+        await offer_service.nearby(user_id=1, lat=55.75, lon=37.62, k=2)
+
+
+
+@pytest.mark.asyncio
+async def test_stub_http_clients_reuse_lazy_open_and_close():
+    from order_offer_service.app.core.http import StubHttpClients
+
+    clients = StubHttpClients()
+    assert clients._clients == {}
+
+    zones = clients.get("zones")
+    assert clients.get("zones") is zones
+    assert clients.get("users") is not zones
+
+    clients.open(["zones", "configs"])
+    assert set(clients._clients) == {"zones", "users", "configs"}
+    assert clients.get("zones") is zones
+
+    await clients.close()
+    assert zones.is_closed
+    assert clients._clients == {}
+    # a closed pool is rebuilt on the next use
+    reopened = clients.get("zones")
+    assert reopened is not zones and not reopened.is_closed
+    await clients.close()
+
+
+@pytest.mark.asyncio
+async def test_scooter_fetch_has_its_own_deadline_for_retries(monkeypatch):
+    import asyncio
+    from order_offer_service.app.schemas.offers import OfferCreateRequest
+    from order_offer_service.app.services import offers as offers_module
+
+    class RetryingScooter:
+        async def get_scooter(self, scooter_id):
+            # one failed attempt plus backoff before the retry succeeds
+            await asyncio.sleep(0.1)
+            return {"scooter_id": scooter_id, "zone_id": "center", "charge": 90}
+
+    class Zone:
+        async def get_zone(self, zone_id):
+            return {"price_multiplier": 10}
+
+    class User:
+        def __init__(self, delay):
+            self.delay = delay
+
+        async def get_user(self, user_id):
+            await asyncio.sleep(self.delay)
+            return {}
+
+    class Config:
+        async def get_price_coeff_settings(self):
+            return {}
+
+    monkeypatch.setattr(offers_module.settings, "offer_fetch_deadline_seconds", 0.05)
+    monkeypatch.setattr(offers_module.settings, "offer_scooter_deadline_seconds", 0.5)
+    monkeypatch.setattr(offer_service, "fleet", None)
+    monkeypatch.setattr(offer_service, "scooter_client", RetryingScooter())
+    monkeypatch.setattr(offer_service, "zone_client", Zone())
+    monkeypatch.setattr(offer_service, "user_client", User(0))
+    monkeypatch.setattr(offer_service, "config_client", Config())
+
+    scooter, *_ = await offer_service.fetch_pricing_inputs(OfferCreateRequest(user_id=1, scooter_id=2))
+    assert scooter["scooter_id"] == 2
+
+    monkeypatch.setattr(offer_service, "user_client", User(0.2))
+    with pytest.raises(exceptions.UpstreamTimeout):
+        await offer_service.fetch_pricing_inputs(OfferCreateRequest(user_id=1, scooter_id=2))
+
+
+@pytest.mark.asyncio
+async def test_pricing_inputs_share_one_total_deadline(monkeypatch):
+    import asyncio
+    import time
+    from order_offer_service.app.schemas.offers import OfferCreateRequest
+    from order_offer_service.app.services import offers as offers_module
+
+    class SlowScooter:
+        async def get_scooter(self, scooter_id):
+            await asyncio.sleep(0.2)
+            return {"scooter_id": scooter_id, "zone_id": "center", "charge": 90}
+
+    class SlowZone:
+        async def get_zone(self, zone_id):
+            await asyncio.sleep(0.15)
+            return {"price_multiplier": 10}
+
+    class Instant:
+        async def get_user(self, user_id):
+            return {}
+
+        async def get_price_coeff_settings(self):
+            return {}
+
+    # each call fits its own cap, but scooter then zone does not fit the total
+    monkeypatch.setattr(offers_module.settings, "offer_total_deadline_seconds", 0.3)
+    monkeypatch.setattr(offers_module.settings, "offer_scooter_deadline_seconds", 0.25)
+    monkeypatch.setattr(offers_module.settings, "offer_fetch_deadline_seconds", 0.2)
+    monkeypatch.setattr(offer_service, "fleet", None)
+    monkeypatch.setattr(offer_service, "scooter_client", SlowScooter())
+    monkeypatch.setattr(offer_service, "zone_client", SlowZone())
+    monkeypatch.setattr(offer_service, "user_client", Instant())
+    monkeypatch.setattr(offer_service, "config_client", Instant())
+
+    started = time.monotonic()
+    with pytest.raises(exceptions.UpstreamTimeout):
+        await offer_service.fetch_pricing_inputs(OfferCreateRequest(user_id=1, scooter_id=2))
+    assert time.monotonic() - started < 0.34
+
+
+def test_signed_offer_storage_requires_a_real_secret():
+    from pydantic import ValidationError
+    from order_offer_service.app.config import Settings
+
+    for secret in ("change-me", "", "short"):
+        with pytest.raises(ValidationError):
+            Settings(OFFER_STORAGE="signed", OFFER_SIGNING_SECRET=secret)
+    assert Settings(OFFER_STORAGE="signed", OFFER_SIGNING_SECRET="s" * 32).offer_storage == "signed"
+    assert Settings(OFFER_STORAGE="postgres").offer_signing_secret == "change-me"
+
+
+def test_start_request_offer_id_follows_offer_storage(monkeypatch):
+    from pydantic import ValidationError
+    from order_offer_service.app.schemas import orders as orders_schema
+
+    assert OrderStartRequest(user_id=1, offer_id="123").offer_id == 123
+    with pytest.raises(ValidationError):
+        OrderStartRequest(user_id=1, offer_id="not-a-number")
+
+    monkeypatch.setattr(orders_schema.get_settings(), "offer_storage", "signed")
+    assert OrderStartRequest(user_id=1, offer_id="123").offer_id == "123"
+
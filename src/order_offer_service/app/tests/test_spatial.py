@@ -0,0 +1,91 @@
+import math
+import random
+
+import pytest
+
+from order_offer_service.app.services.spatial import METERS_PER_DEGREE, SpatialIndex
+
+
+def _brute_force(scooters, lat, lon, k, max_radius):
+    scale = math.cos(math.radians(lat))
+    distances = sorted(
+        (
+            math.hypot((s["lon"] - lon) * METERS_PER_DEGREE * scale, (s["lat"] - lat) * METERS_PER_DEGREE),
+            s["scooter_id"],
+        )
+        for s in scooters
+        if s["available"]
+    )
+    return [(scooter_id, distance) for distance, scooter_id in distances if distance <= max_radius][:k]
+
+
+@pytest.mark.parametrize("cell_degrees", [0.0005, 0.002, 0.01])
+def test_nearest_matches_brute_force(cell_degrees):
+    rng = random.Random(7)
+    scooters = [
+        {
+            "scooter_id": scooter_id,
+            "lat": 55.75 + rng.uniform(-0.05, 0.05),
+            "lon": 37.62 + rng.uniform(-0.08, 0.08),
+            "available": rng.random() < 0.8,
+        }
+        for scooter_id in range(1, 3001)
+    ]
+    index = SpatialIndex(cell_degrees, max_radius_meters=2_000, max_scooter_id=10_000)
+    index.upsert(scooters)
+
+    for _ in range(50):
+        lat, lon = 55.75 + rng.uniform(-0.06, 0.06), 37.62 + rng.uniform(-0.1, 0.1)
+        k = rng.choice([1, 5, 20])
+        found = index.nearest(lat, lon, k)
+        expected = _brute_force(scooters, lat, lon, k, 2_000)
+        assert [scooter_id for scooter_id, _ in found] == [scooter_id for scooter_id, _ in expected]
+        assert [distance for _, distance in found] == pytest.approx([distance for _, distance in expected])
+
+
+def test_updates_move_and_drop_scooters():
+    index = SpatialIndex(0.001, max_radius_meters=1_000, max_scooter_id=100)
+    index.upsert([
+        {"scooter_id": 1, "lat": 55.7500, "lon": 37.6200, "available": True},
+        {"scooter_id": 2, "lat": 55.7510, "lon": 37.6200, "available": True},
+        {"scooter_id": 3, "lat": 55.7520, "lon": 37.6200},
+    ])
+    assert [scooter_id for scooter_id, _ in index.nearest(55.75, 37.62, 5)] == [1, 2, 3]
+
+    index.upsert([
+        {"scooter_id": 1, "lat": 55.7600, "lon": 37.6200, "available": True},
+        {"scooter_id": 2, "lat": 55.7510, "lon": 37.6200, "available": False},
+    ])
+    index.remove([3])
+
+    assert len(index) == 1
+    assert sum(map(len, index.blocks.values())) == 1
+    assert index.nearest(55.75, 37.62, 5) == []
+    assert [scooter_id for scooter_id, _ in index.nearest(55.76, 37.62, 5)] == [1]
+
+
+@pytest.mark.parametrize("block_cells", [3, 16])
+@pytest.mark.parametrize("center_lon", [37.62, 179.99])
+def test_nearest_in_sparse_areas_is_unchanged_by_block_skipping(block_cells, center_lon):
+    rng = random.Random(11)
+    # a few small clusters far apart; centred on 179.99 one straddles the antimeridian,
+    # next to the last block column, which is narrower than the others on this grid
+    clusters = [(55.75 + rng.uniform(-0.03, 0.03), center_lon + rng.uniform(-0.03, 0.03)) for _ in range(4)]
+    scooters = []
+    for scooter_id in range(1, 201):
+        lat, lon = rng.choice(clusters)
+        lat, lon = lat + rng.uniform(-0.001, 0.001), (lon + rng.uniform(-0.002, 0.002) + 180) % 360 - 180
+        scooters.append({"scooter_id": scooter_id, "lat": lat, "lon": lon, "available": True})
+    blocked = SpatialIndex(0.0007, max_radius_meters=3_000, max_scooter_id=1_000, block_cells=block_cells)
+    unblocked = SpatialIndex(0.0007, max_radius_meters=3_000, max_scooter_id=1_000, block_cells=1)
+    blocked.upsert(scooters)
+    unblocked.upsert(scooters)
+
+    for _ in range(40):
+        lat, lon = 55.75 + rng.uniform(-0.05, 0.05), (center_lon + rng.uniform(-0.05, 0.05) + 180) % 360 - 180
+        k = rng.choice([1, 5, 20])
+        found = blocked.nearest(lat, lon, k)
+        assert found == unblocked.nearest(lat, lon, k)
+        if center_lon == 37.62:
+            expected = _brute_force(scooters, lat, lon, k, 3_000)
+            assert [scooter_id for scooter_id, _ in found] == [scooter_id for scooter_id, _ in expected]
@@ -0,0 +1,84 @@
+"""k-nearest-scooter lookups against a synthetic fleet in the spatial index.
+
+Scatters the fleet uniformly over a 30 x 30 km city, indexes the available
+ones and times ``nearest`` for random points inside the city, in a sparse
+band 1-4 km outside it and in an empty area 20 km away::
+
+    python -m order_offer_service.benchmarks.nearby --scooters 1000000 --k 10
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import time
+
+import numpy as np
+
+from order_offer_service.app.services.spatial import SpatialIndex
+
+CITY_LAT, CITY_LON = 55.75, 37.62
+CITY_SPAN_DEGREES = 0.27  # about 30 km north-south
+KM_DEGREES = 0.009  # one km north-south
+
+
+def _fleet(scooters: int, available_share: float, seed: int) -> list[dict]:
+    rng = np.random.default_rng(seed)
+    lat = CITY_LAT + rng.uniform(-CITY_SPAN_DEGREES / 2, CITY_SPAN_DEGREES / 2, scooters)
+    lon = CITY_LON + rng.uniform(-CITY_SPAN_DEGREES, CITY_SPAN_DEGREES, scooters)
+    available = rng.random(scooters) < available_share
+    return [
+        {"scooter_id": scooter_id, "lat": la, "lon": lo, "available": av}
+        for scooter_id, (la, lo, av) in enumerate(zip(lat.tolist(), lon.tolist(), available.tolist()), start=1)
+    ]
+
+
+def _points(case: str, queries: int) -> list[tuple[float, float]]:
+    half = CITY_SPAN_DEGREES / 2
+    if case == "city":
+        return [(CITY_LAT + random.uniform(-0.1, 0.1), CITY_LON + random.uniform(-0.2, 0.2)) for _ in range(queries)]
+    # north of the city: a band where the nearest scooters are kilometres away, or an area with none in range
+    low, high = (1 * KM_DEGREES, 4 * KM_DEGREES) if case == "sparse" else (20 * KM_DEGREES, 21 * KM_DEGREES)
+    return [
+        (CITY_LAT + half + random.uniform(low, high), CITY_LON + random.uniform(-2 * half, 2 * half))
+        for _ in range(queries)
+    ]
+
+
+def _measure(index: SpatialIndex, points: list[tuple[float, float]], k: int) -> tuple[float, float, float]:
+    for lat, lon in points[:500]:
+        index.nearest(lat, lon, k)
+    latencies = []
+    started = time.perf_counter()
+    for lat, lon in points:
+        query_started = time.perf_counter()
+        index.nearest(lat, lon, k)
+        latencies.append(time.perf_counter() - query_started)
+    elapsed = time.perf_counter() - started
+    p50, p99 = np.percentile(latencies, [50, 99]) * 1e6
+    return len(points) / elapsed, p50, p99
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scooters", type=int, default=1_000_000)
+    parser.add_argument("--available", type=float, default=0.7)
+    parser.add_argument("--queries", type=int, default=20_000)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--cell-degrees", type=float, default=0.001)
+    args = parser.parse_args()
+
+    fleet = _fleet(args.scooters, args.available, seed=1)
+    index = SpatialIndex(args.cell_degrees, max_radius_meters=5_000, max_scooter_id=args.scooters)
+    started = time.perf_counter()
+    for offset in range(0, len(fleet), 10_000):
+        index.upsert(fleet[offset : offset + 10_000])
+    build = time.perf_counter() - started
+
+    print(f"indexed  {len(index):,} of {args.scooters:,} scooters in {build:.1f} s")
+    for case in ("city", "sparse", "empty"):
+        rate, p50, p99 = _measure(index, _points(case, args.queries), args.k)
+        print(f"{case:<7}  {rate:10,.0f} queries/s on one core   p50 {p50:7.1f} us   p99 {p99:7.1f} us")
+
+
+if __name__ == "__main__":
+    main()
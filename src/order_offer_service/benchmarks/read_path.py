@@ -0,0 +1,100 @@
+"""CPU cost of one order read: ORM hydration versus the Core record path.
+
+Runs against in-memory SQLite with the sync engine so only Python-side work
+is measured (statement compilation, row processing, object construction)::
+
+    python -m order_offer_service.benchmarks.read_path --reads 20000
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from datetime import datetime, timezone
+
+from sqlalchemy import create_engine, select, text
+from sqlalchemy.orm import Session
+
+from order_offer_service.app.models import Order, OrderRecord
+from order_offer_service.app.repositories.orders import _GET_RECORD
+
+
+# SQLite has no partitioning and no autoincrement on the composite key, so the table is plain here.
+_SCHEMA = """
+CREATE TABLE orders (
+    order_id INTEGER PRIMARY KEY,
+    user_id INTEGER NOT NULL,
+    scooter_id INTEGER NOT NULL,
+    time_start TIMESTAMP NOT NULL,
+    time_finish TIMESTAMP NULL,
+    price_per_minute INTEGER NOT NULL,
+    price_unlock INTEGER NOT NULL,
+    deposit INTEGER NOT NULL,
+    ttl INTEGER NOT NULL
+)
+"""
+
+
+def _seed(engine, rows: int) -> None:
+    now = datetime.now(timezone.utc)
+    with engine.begin() as conn:
+        conn.execute(text(_SCHEMA))
+    with Session(engine) as session:
+        session.add_all(
+            Order(
+                order_id=order_id,
+                user_id=order_id % 1000,
+                scooter_id=order_id,
+                time_start=now,
+                price_per_minute=10,
+                price_unlock=50,
+                deposit=100,
+                ttl=86400,
+            )
+            for order_id in range(1, rows + 1)
+        )
+        session.commit()
+
+
+def _orm_read(session: Session, order_id: int) -> dict:
+    order = session.execute(select(Order).where(Order.order_id == order_id)).scalar_one_or_none()
+    payload = order.to_dict()
+    # every request gets its own session in the service; emulate that cheaply
+    session.expunge_all()
+    return payload
+
+
+def _core_read(session: Session, order_id: int) -> OrderRecord:
+    row = session.connection().execute(_GET_RECORD, {"order_id": order_id}).one_or_none()
+    return OrderRecord(*row)
+
+
+def _measure(engine, read, ids: list[int]) -> float:
+    with Session(engine) as session:
+        for order_id in ids[:500]:
+            read(session, order_id)
+        started = time.process_time()
+        for order_id in ids:
+            read(session, order_id)
+        return (time.process_time() - started) / len(ids)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--reads", type=int, default=20_000)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://")
+    _seed(engine, args.rows)
+    ids = [random.randint(1, args.rows) for _ in range(args.reads)]
+
+    orm = _measure(engine, _orm_read, ids)
+    core = _measure(engine, _core_read, ids)
+    print(f"orm   {orm * 1e6:8.1f} us cpu/read")
+    print(f"core  {core * 1e6:8.1f} us cpu/read")
+    print(f"saved {(orm - core) * 1e6:8.1f} us cpu/read ({(1 - core / orm) * 100:.0f}%)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,5 @@
 CREATE TABLE IF NOT EXISTS offers (
-    offer_id SERIAL PRIMARY KEY,
+    offer_id BIGSERIAL PRIMARY KEY,
     user_id INTEGER NOT NULL,
     scooter_id INTEGER NOT NULL,
     time_offer_creation TIMESTAMPTZ NOT NULL DEFAULT NOW(),
@@ -11,8 +11,9 @@ CREATE TABLE IF NOT EXISTS offers (
 
 CREATE INDEX IF NOT EXISTS idx_offers_user ON offers (user_id);
 
+-- Daily partitions are created ahead and dropped after retention by the service.
 CREATE TABLE IF NOT EXISTS orders (
-    order_id SERIAL PRIMARY KEY,
+    order_id BIGSERIAL,
     user_id INTEGER NOT NULL,
     scooter_id INTEGER NOT NULL,
     time_start TIMESTAMPTZ NOT NULL DEFAULT NOW(),
@@ -20,8 +21,26 @@ CREATE TABLE IF NOT EXISTS orders (
     price_per_minute INTEGER NOT NULL,
     price_unlock INTEGER NOT NULL,
     deposit INTEGER NOT NULL,
-    ttl INTEGER NOT NULL
-);
+    ttl INTEGER NOT NULL,
+    PRIMARY KEY (order_id, time_start)
+) PARTITION BY RANGE (time_start);
+
+CREATE TABLE IF NOT EXISTS orders_default PARTITION OF orders DEFAULT;
 
 CREATE INDEX IF NOT EXISTS idx_orders_user ON orders (user_id);
 
+
+CREATE TABLE IF NOT EXISTS order_outbox (
+    entry_id BIGSERIAL PRIMARY KEY,
+    order_id BIGINT NOT NULL,
+    action VARCHAR(32) NOT NULL,
+    payload JSON NOT NULL,
+    created_at TIMESTAMPTZ NOT NULL,
+    available_at TIMESTAMPTZ NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT NULL,
+    locked_until TIMESTAMPTZ NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_order_outbox_order ON order_outbox (order_id);
+CREATE INDEX IF NOT EXISTS idx_order_outbox_available ON order_outbox (available_at);
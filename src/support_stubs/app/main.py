@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query
 
 app = FastAPI(title="SupportStubsService", version="1.0.0")
 
@@ -33,10 +33,20 @@ USERS = {
 }
 
 SCOOTERS = {
-    101: {"scooter_id": 101, "zone_id": "center", "available": True, "charge": 92},
-    102: {"scooter_id": 102, "zone_id": "suburb", "available": True, "charge": 55},
+    101: {"scooter_id": 101, "zone_id": "center", "available": True, "charge": 92, "lat": 55.7558, "lon": 37.6173},
+    102: {"scooter_id": 102, "zone_id": "suburb", "available": True, "charge": 55, "lat": 55.8512, "lon": 37.4475},
 }
 
+# Change feed for fleet snapshots: every scooter carries the version of its last change.
+SCOOTER_VERSIONS = {scooter_id: version for version, scooter_id in enumerate(SCOOTERS, start=1)}
+FLEET_VERSION = {"current": len(SCOOTERS)}
+
+
+def _touch_scooter(scooter_id: int) -> None:
+    FLEET_VERSION["current"] += 1
+    SCOOTER_VERSIONS[scooter_id] = FLEET_VERSION["current"]
+
+
 CONFIG = {
     "price_coeff_settings": {"surge": 2, "low_charge_discount": 0.75}
 }
@@ -55,6 +65,26 @@ async def get_zone(zone_id: str):
     return zone
 
 
+def _parse_ids(ids: str) -> list[int]:
+    try:
+        return [int(item) for item in ids.split(",") if item]
+    except ValueError:
+        raise HTTPException(status_code=422, detail="ids_must_be_integers")
+
+
+def _bulk(storage: dict, ids: str) -> dict:
+    requested = _parse_ids(ids)
+    return {
+        "items": [storage[item_id] for item_id in requested if item_id in storage],
+        "missing": [item_id for item_id in requested if item_id not in storage],
+    }
+
+
+@app.get("/users")
+async def get_users(ids: str = Query(...)):
+    return _bulk(USERS, ids)
+
+
 @app.get("/users/{user_id}")
 async def get_user(user_id: int):
     user = USERS.get(user_id)
@@ -63,6 +93,24 @@ async def get_user(user_id: int):
     return user
 
 
+@app.get("/scooters")
+async def get_scooters(ids: str = Query(...)):
+    return _bulk(SCOOTERS, ids)
+
+
+@app.get("/scooters/changes")
+async def get_scooter_changes(since: int = Query(0, ge=0), limit: int = Query(10_000, ge=1)):
+    changed = sorted(
+        (version, scooter_id) for scooter_id, version in SCOOTER_VERSIONS.items() if version > since
+    )
+    page = changed[:limit]
+    return {
+        "items": [SCOOTERS[scooter_id] for _, scooter_id in page],
+        "version": page[-1][0] if len(changed) > limit else FLEET_VERSION["current"],
+        "more": len(changed) > limit,
+    }
+
+
 @app.get("/scooters/{scooter_id}")
 async def get_scooter(scooter_id: int):
     scooter = SCOOTERS.get(scooter_id)
@@ -78,6 +126,7 @@ async def lock_scooter(scooter_id: int):
         raise HTTPException(status_code=404, detail="scooter_not_found")
 
     scooter["available"] = False
+    _touch_scooter(scooter_id)
     return {"success": True}
 
 
@@ -88,6 +137,7 @@ async def unlock_scooter(scooter_id: int):
         raise HTTPException(status_code=404, detail="scooter_not_found")
 
     scooter["available"] = True
+    _touch_scooter(scooter_id)
     return {"success": True}
 
 
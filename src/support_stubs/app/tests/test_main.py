@@ -89,3 +89,37 @@ async def test_health():
         response = await ac.get("/health")
     assert response.status_code == 200
     assert response.json() == {"status": "ok"}
+
+
+@pytest.mark.asyncio
+async def test_get_scooters_bulk():
+    async with AsyncClient(transport=ASGITransport(app), base_url="http://test") as ac:
+        response = await ac.get("/scooters", params={"ids": "101,999,102"})
+    assert response.status_code == 200
+    body = response.json()
+    assert [scooter["scooter_id"] for scooter in body["items"]] == [101, 102]
+    assert body["missing"] == [999]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("ids, expected_status", [("1,2", 200), ("1,x", 422)])
+async def test_get_users_bulk(ids, expected_status):
+    async with AsyncClient(transport=ASGITransport(app), base_url="http://test") as ac:
+        response = await ac.get("/users", params={"ids": ids})
+    assert response.status_code == expected_status
+
+
+@pytest.mark.asyncio
+async def test_scooter_change_feed_pages_and_reports_locks():
+    async with AsyncClient(transport=ASGITransport(app), base_url="http://test") as ac:
+        first = (await ac.get("/scooters/changes", params={"since": 0, "limit": 1})).json()
+        rest = (await ac.get("/scooters/changes", params={"since": first["version"]})).json()
+        await ac.put("/scooters/101/lock")
+        delta = (await ac.get("/scooters/changes", params={"since": rest["version"]})).json()
+        await ac.put("/scooters/101/unlock")
+
+    assert first["more"] and len(first["items"]) == 1
+    assert not rest["more"]
+    assert {s["scooter_id"] for s in first["items"] + rest["items"]} >= {101, 102}
+    assert [s["scooter_id"] for s in delta["items"]] == [101]
+    assert delta["items"][0]["available"] is False